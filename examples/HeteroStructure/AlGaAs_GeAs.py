@@ -1,14 +1,16 @@
 from pame.HeteroStructure.Calculation import *
+from pame.Semiconductors.alloy import alloy
 
 if __name__ == '__main__':
     # creating components of a heterostructure
     # Lattice constant in cm
     # Energy gap in eV
-    AlGaAs = SemiCond(name='AlGaAs',
-                      lattice=(5.6533 - 0.0078 * 0.4) * 10**-8,
-                      epsilon=12.9 - 2.84 * 0.4,
-                      spin_orbital_splitting=0.34 - 0.04 * 0.4,
-                      E_g=1.424 + 1.247 * 0.4)
+    # Al_x Ga_{1-x} As with x = 0.4 between GaAs (x = 0) and AlAs (x = 1)
+    AlGaAs = alloy(a=SemiCond(name='GaAs', lattice=5.6533e-8, epsilon=12.9, E_g=1.424,
+                              spin_orbital_splitting=0.34),
+                   b=SemiCond(name='AlAs', lattice=(5.6533 - 0.0078) * 10**-8, epsilon=12.9 - 2.84,
+                              E_g=1.424 + 1.247, spin_orbital_splitting=0.34 - 0.04),
+                   x=0.4, name='AlGaAs').semicond(0)
 
     GaAs = SemiCond(name='GaAs',
                     lattice=5.6532e-8,
@@ -8,7 +8,7 @@ if __name__ == '__main__':
                   E_g=1.12, epsilon=11.7,
                   spin_orbital_splitting=0.044)
 
-    Ge = SemiCond(name='Si', lattice=5.6532e-8,
+    Ge = SemiCond(name='Ge', lattice=5.6532e-8,
                   E_g=0.65, epsilon=12.9,
                   spin_orbital_splitting=0.29)
 
@@ -16,3 +16,8 @@ if __name__ == '__main__':
     delta_e_c, delta_e_v = process_heterostructure(wide_band=Si,
                                                    slim_band=Ge,
                                                    path=path)
+
+    # все пары сразу: строка Si / столбец Ge совпадает с process_heterostructure, хотя epsilon у них разные
+    table = offset_table([Si, Ge])
+    print(f'offset_table: {table.pair("Si", "Ge")}, process_heterostructure: {(delta_e_c, delta_e_v)}')
+    assert np.allclose(table.pair('Si', 'Ge'), (delta_e_c, delta_e_v))
@@ -0,0 +1,24 @@
+from pame.HeteroStructure.Calculation import *
+from pame.KronigPenney.model import Model
+from pame.KronigPenney.schrodinger import layers_profile, solve_schrodinger
+from pame.KronigPenney.transfer_matrix import Layer
+
+
+if __name__ == '__main__':
+    AlGaAs = SemiCond(name='AlGaAs', E_g=1.424 + 1.247 * 0.4, epsilon=12.9 - 2.84 * 0.4,
+                      lattice=(5.6533 + 0.0078 * 0.4) * 10**-8, spin_orbital_splitting=0.34 - 0.04 * 0.4)
+    GaAs = SemiCond(name='GaAs', E_g=1.424, epsilon=12.9, lattice=5.6532e-8, spin_orbital_splitting=0.34)
+    delta_u_cond, _ = process_heterostructure(wide_band=AlGaAs, slim_band=GaAs)
+
+    # AlGaAs 20 нм / GaAs 10 нм / AlGaAs 20 нм, энергия от дна зоны проводимости AlGaAs
+    m_e = 0.063
+    layers = [Layer(20e-9, 0., m_e), Layer(10e-9, -delta_u_cond, m_e), Layer(20e-9, 0., m_e)]
+    x, u, m = layers_profile(layers, nodes_per_layer=10000)
+    result = solve_schrodinger(x, u, m, states=2)
+    print(f'finite difference: {result.energy}')
+
+    # яма, отделенная толстыми барьерами, - одиночная яма в модели Кронига-Пенни
+    model = Model(m=m_e, u0=delta_u_cond, a=40e-9, b=10e-9)
+    # отрезок по умолчанию - нижняя смена знака в яме, от конечных разностей не зависит
+    ground = model.calculate_energy_levels(method='shch')
+    print(f'difference: {result.energy[0] - ground}')
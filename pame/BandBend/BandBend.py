@@ -1,5 +1,9 @@
 import numpy as np
-from pame.exceptions import CantMatchMethod, CantRunDichotomyMethod, CatchZeroDelta
+from pame.exceptions import CantMatchMethod, CantRunDichotomyMethod, CatchZeroDelta, CantReachTolerance, \
+    CantFindSignChange
+from pame.solvers import RootResult, VectorRootResult, dichotomy, newton, fixed_point, secant, brent, \
+    vectorized_newton
+from pame.BandBend.SurfaceStates import SurfaceStates
 
 
 def _bend_function(epsilon: float, phi: float, Nd: float, Nas: float, Eas: float,
@@ -52,7 +56,7 @@ def _diff_funcrtion(epsilon: float, phi: float, Nd: float, Nas: float, Eas: floa
 
 
 def _dichotomy_method(epsilon: float, phi0: float, phi1: float, nd: float, n_as: float, e_as: float, e_f: float,
-                      t: float, e_out: float, counter: int, tolerance=1e-7) -> tuple:
+                      t: float, e_out: float, tolerance=1e-7, max_iter=1000) -> RootResult:
     """
 
     :param epsilon: dielectric constant
@@ -64,31 +68,22 @@ def _dichotomy_method(epsilon: float, phi0: float, phi1: float, nd: float, n_as:
     :param e_f: Fermi level in eV
     :param t: temperature in Kelvin
     :param e_out: External field value in V/m
-    :param counter: counts iteration amount needed to calculate a solution
     :param tolerance: tolerant error
-    :return: band bend value in eV and iterations steps amount
+    :param max_iter: iterations limit
+    :return: band bend value in eV, iterations and evaluations amount, final residual and convergence flag
     """
-    counter += 1
-    f_a = _bend_function(epsilon=epsilon, phi=phi0, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)
-    phi_i = (phi0 + phi1) / 2
-    f_i = _bend_function(epsilon=epsilon, phi=phi_i, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)
+    def f(phi):
+        return _bend_function(epsilon=epsilon, phi=phi, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)
 
-    if np.abs(f_i) < tolerance:  # достигли точность
-        return phi_i, counter
-    elif f_a * f_i > 0:  # нет нулей
-        return _dichotomy_method(epsilon=epsilon, phi0=phi_i, phi1=phi1, nd=nd, n_as=n_as, e_as=e_as, e_f=e_f, t=t,
-                                 e_out=e_out, counter=counter, tolerance=tolerance)
-    else:
-        return _dichotomy_method(epsilon=epsilon, phi0=phi0, phi1=phi_i, nd=nd, n_as=n_as, e_as=e_as, e_f=e_f, t=t,
-                                 e_out=e_out, counter=counter, tolerance=tolerance)
+    return dichotomy(f=f, a=phi0, b=phi1, tolerance=tolerance, max_iter=max_iter)
 
 
-def _fixed_point_method(epsilon: float, phi: float, phi_fixed: float, nd: float, n_as: float, e_as: float, e_f: float, t: float,
-                        e_out: float, count: int,  tolerance=1e-7):
+def _fixed_point_method(epsilon: float, phi: float, phi_fixed: float, nd: float, n_as: float, e_as: float, e_f: float,
+                        t: float, e_out: float, tolerance=1e-7, max_iter=1000) -> RootResult:
     """
     :math: $\phi(x)=f(x)+x$ : $x_{n+1}=x_n - \frac{f(x_n)}{f'(\ksi)}$
     :param epsilon: dielectric constant
-    :param phi: current bend value in eV
+    :param phi: starter bend value in eV
     :param phi_fixed: ksi - fixed starter value for a band bend in eV
     :param nd: donors' concentration
     :param n_as: surface acceptors' concentration
@@ -96,23 +91,21 @@ def _fixed_point_method(epsilon: float, phi: float, phi_fixed: float, nd: float,
     :param e_f: Fermi level in eV
     :param t: temperature in Kelvin
     :param e_out: external field value in V/m
-    :param count: counts iteration amount needed to calculate a solution
     :param tolerance: tolerant error
-    :return: band bend value in eV and iterations steps amount
+    :param max_iter: iterations limit
+    :return: band bend value in eV, iterations and evaluations amount, final residual and convergence flag
     """
+    def f(x):
+        return _bend_function(epsilon=epsilon, phi=x, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)
 
-    if np.abs(_bend_function(epsilon=epsilon, phi=phi, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)) <= tolerance:
-        return phi, count
-    else:
-        diff = _diff_funcrtion(epsilon=epsilon, phi=phi_fixed, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t)
-        _lambda = 1 / diff
-        phi_i = -_lambda * _bend_function(epsilon=epsilon, phi=phi, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)
-        return _fixed_point_method(epsilon=epsilon, phi=phi+phi_i, phi_fixed=phi_fixed, nd=nd, n_as=n_as, e_as=e_as,
-                                   e_f=e_f, t=t, e_out=e_out, count=count+1, tolerance=tolerance)
+    def df(x):
+        return _diff_funcrtion(epsilon=epsilon, phi=x, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t)
+
+    return fixed_point(f=f, df=df, x0=phi, x_fixed=phi_fixed, tolerance=tolerance, max_iter=max_iter)
 
 
 def _newtown_method(epsilon: float, phi: float, nd: float, n_as: float, e_as: float, e_f: float, t: float,
-                    e_out: float, count: int, tolerance=1e-7):
+                    e_out: float, tolerance=1e-7, max_iter=1000) -> RootResult:
     """
     :math: $x_{n+1} = x_n - \frac{f(x_n)}{f'(x_n)}$
     :param epsilon: dielectric constant
@@ -123,82 +116,183 @@ def _newtown_method(epsilon: float, phi: float, nd: float, n_as: float, e_as: fl
     :param e_f: Fermi level in eV
     :param t: temperature in Kelvin
     :param e_out: external field value in V/m
-    :param count: counts iteration amount needed to calculate a solution
     :param tolerance: tolerant error
-    :return: band bend value in eV and iterations steps amount
+    :param max_iter: iterations limit
+    :return: band bend value in eV, iterations and evaluations amount, final residual and convergence flag
     """
-    if np.abs(_bend_function(epsilon=epsilon, phi=phi, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)) <= tolerance:
-        return phi, count
-    else:
-        _lambda = -_bend_function(epsilon=epsilon, phi=phi, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out) / \
-                  _diff_funcrtion(epsilon=epsilon, phi=phi, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t)
-        return _newtown_method(epsilon=epsilon, phi=phi+_lambda, nd=nd, n_as=n_as, e_as=e_as, e_f=e_f, t=t, e_out=e_out,
-                               count=count + 1, tolerance=tolerance)
+    def f(x):
+        return _bend_function(epsilon=epsilon, phi=x, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)
+
+    def df(x):
+        return _diff_funcrtion(epsilon=epsilon, phi=x, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t)
+
+    return newton(f=f, df=df, x0=phi, tolerance=tolerance, max_iter=max_iter)
 
 
 def _secant_method(epsilon: float, phi_0: float, nd: float, n_as: float, e_as: float, e_f: float, t: float,
-                   e_out: float, counter: int, tolerance=1e-7, delta=1e-3, phi_1=None):
+                   e_out: float, tolerance=1e-7, delta=1e-3, phi_1=None, max_iter=1000) -> RootResult:
     """
     Метод секущих требует два последовательных значения, для этого на первом этапе мы задаем delta - стартовая разница
     двух измерений. Далее получаем x_i+1 из x_i и x_{i-1}
 
     :math: $x_{n+1}=x_n - f(x_n)\frac{x_n-x_{n-1}{f(x_n)-f(x_{n-1})}$
     :param epsilon: dielectric constant
-    :param phi_0: band bend value in eV for {n-1}-th iteration
+    :param phi_0: band bend value in eV for n-th iteration
     :param nd: donors' concentration
     :param n_as: surface acceptors' concentration
     :param e_as: field created by surface acceptors
     :param e_f: Fermi level in eV
     :param t: temperature in Kelvin
     :param e_out: external field value in V/m
-    :param counter: counts iteration amount needed to calculate a solution
     :param tolerance: tolerant error
-    :param delta: x_1 - x_0 difference for a first iteration
-    :param phi_1: band bend value in eV for n-th iteration
-    :return: band bend value in eV and iterations steps amount
-    """
-    if phi_1 is not None:
-        if (_bend_function(epsilon=epsilon, phi=phi_1, Nd=nd, Nas=n_as, Eas=e_as,
-                                         Ef=e_f, t=t, Eout=e_out)) < tolerance:
-            return phi_1, counter
-        else:
-            factor = delta / (_bend_function(epsilon=epsilon, phi=phi_1,
-                                             Nd=nd, Nas=n_as, Eas=e_as,
-                                             Ef=e_f, t=t, Eout=e_out) - _bend_function(epsilon=epsilon, phi=phi_0,
-                                                                                       Nd=nd, Nas=n_as, Eas=e_as,
-                                                                                       Ef=e_f, t=t, Eout=e_out))
-            phi_ = phi_1 - _bend_function(epsilon=epsilon,
-                                          phi=phi_1, Nd=nd,
-                                          Nas=n_as, Eas=e_as,
-                                          Ef=e_f, t=t, Eout=e_out) * factor
-            return _secant_method(epsilon=epsilon, phi_0=phi_0, nd=nd, n_as=n_as, e_as=e_as, e_f=e_f, t=t, e_out=e_out,
-                                  counter=counter+1, tolerance=tolerance, phi_1=phi_)
-    else:
-        if delta != 0:
-            factor = delta / (_bend_function(epsilon=epsilon, phi=phi_0,
-                                             Nd=nd, Nas=n_as, Eas=e_as,
-                                             Ef=e_f, t=t, Eout=e_out) - _bend_function(epsilon=epsilon,
-                                                                                       phi=phi_0 - delta, Nd=nd,
-                                                                                       Nas=n_as, Eas=e_as, Ef=e_f,
-                                                                                       t=t, Eout=e_out))
-            phi_ = phi_0 - _bend_function(epsilon=epsilon,
-                                          phi=phi_0, Nd=nd,
-                                          Nas=n_as, Eas=e_as,
-                                          Ef=e_f, t=t, Eout=e_out) * factor
-            return _secant_method(epsilon=epsilon, phi_0=phi_0, nd=nd, n_as=n_as, e_as=e_as, e_f=e_f, t=t, e_out=e_out,
-                                  counter=counter+1, tolerance=tolerance, phi_1=phi_)
-        else:
-            raise CatchZeroDelta
+    :param delta: x_0 - x_1 difference for a first iteration
+    :param phi_1: band bend value in eV for {n-1}-th iteration
+    :param max_iter: iterations limit
+    :return: band bend value in eV, iterations and evaluations amount, final residual and convergence flag
+    """
+    def f(x):
+        return _bend_function(epsilon=epsilon, phi=x, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)
+
+    return secant(f=f, x0=phi_0, x1=phi_1, delta=delta, tolerance=tolerance, max_iter=max_iter)
+
+
+def _brent_method(epsilon: float, phi0: float, phi1: float, nd: float, n_as: float, e_as: float, e_f: float,
+                  t: float, e_out: float, tolerance=1e-7, max_iter=1000) -> RootResult:
+    """
+    Safeguarded Newton method: keeps a sign-change bracket [phi0, phi1] and falls back
+    to the bisection when a Newton step leaves it.
+
+    :param epsilon: dielectric constant
+    :param phi0: lowest bend value in eV
+    :param phi1: highest bend value in eV
+    :param nd: donors' concentration
+    :param n_as: surface acceptors' concentration
+    :param e_as: field created by surface acceptors
+    :param e_f: Fermi level in eV
+    :param t: temperature in Kelvin
+    :param e_out: external field value in V/m
+    :param tolerance: tolerant error
+    :param max_iter: iterations limit
+    :return: band bend value in eV, iterations and evaluations amount, final residual and convergence flag
+    """
+    def f(x):
+        return _bend_function(epsilon=epsilon, phi=x, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t, Eout=e_out)
+
+    def df(x):
+        return _diff_funcrtion(epsilon=epsilon, phi=x, Nd=nd, Nas=n_as, Eas=e_as, Ef=e_f, t=t)
+
+    return brent(f=f, a=phi0, b=phi1, df=df, tolerance=tolerance, max_iter=max_iter)
+
+
+def _depletion_limits(epsilon: float, Nd: float, t: float, Nas: float, Eas: float, Eout: float, Ef: float) -> tuple:
+    """
+    Границы изгиба в приближении обеднения. Левая часть уравнения растет с phi, а заряд поверхностных
+    акцепторов падает, поэтому при заданной заселенности f корень равен
+    :math: $\phi(f) = \frac{2 \pi e^2 (N_{as} f + \frac{E_{out}}{4\pi e})^2}{\epsilon N_d}$
+
+    При phi = 0 заселенность максимальна - получаем верхнюю границу phi_upper = phi(f(0)),
+    при phi_upper минимальна - нижнюю phi(f(phi_upper)), ее берем с запасом в 2 раза.
+
+    :param epsilon: dielectric constant
+    :param Nd: donors' concentration
+    :param t: temperature in Kelvin
+    :param Nas: surface acceptors' concentration
+    :param Eas: field created by surface acceptors
+    :param Eout: External field value in V/m
+    :param Ef: Fermi level in eV
+    :return: bracket [phi_low, phi_upper] in eV
+    """
+    k = 1.381e-16  # Boltzmann constant arg/K
+    e, eV = 1, 1
+
+    def depletion(phi):
+        with np.errstate(over='ignore'):
+            n_as = Nas / (1. + np.exp((Eas + phi - Ef) * eV / (k * 6.24e11 * t))) + \
+                   Eout * 3.3 * 1e-5 / (4 * np.pi * e)
+        return 2 * np.pi * e**2 * n_as ** 2 / (epsilon * Nd * eV)
+
+    phi_upper = depletion(0.)
+    return depletion(phi_upper) / 2, phi_upper
+
+
+def initial_bend(epsilon: float, Nd: float, t: float, Nas: float, Eas: float, Eout: float, Ef: float) -> float:
+    """
+    Начальное приближение изгиба: уровень Ферми закрепляется на поверхностных акцепторах, phi = Ef - Eas,
+    если для этого хватает их заряда, иначе - граница приближения обеднения.
+
+    :param epsilon: dielectric constant
+    :param Nd: donors' concentration
+    :param t: temperature in Kelvin
+    :param Nas: surface acceptors' concentration
+    :param Eas: field created by surface acceptors
+    :param Eout: External field value in V/m
+    :param Ef: Fermi level in eV
+    :return: band bend estimate in eV
+    """
+    phi_low, phi_upper = _depletion_limits(epsilon=epsilon, Nd=Nd, t=t, Nas=Nas, Eas=Eas, Eout=Eout, Ef=Ef)
+    return min(max(Ef - Eas, phi_low), phi_upper)
+
+
+def _grow_bracket(f, guess, lowest, highest, width) -> tuple:
+    """
+    :return: bracket guess +- width inside [lowest, highest], each side is doubled until f changes sign
+    """
+    # работает и для массивов: расширяем отрезок только там, где знаки на концах еще не разные
+    step = width
+    low = np.maximum(guess - step, lowest)
+    grow = (low > lowest) & (f(low) > 0)
+    while np.any(grow):
+        step = np.where(grow, 2 * step, step)
+        low = np.where(grow, np.maximum(guess - step, lowest), low)
+        grow &= (low > lowest) & (f(low) > 0)
+
+    step = width
+    upper = np.minimum(guess + step, highest)
+    grow = (upper < highest) & (f(upper) < 0)
+    while np.any(grow):
+        step = np.where(grow, 2 * step, step)
+        upper = np.where(grow, np.minimum(guess + step, highest), upper)
+        grow &= (upper < highest) & (f(upper) < 0)
+    return low[()], upper[()]
+
+
+def bend_bracket(epsilon: float, Nd: float, t: float, Nas: float, Eas: float, Eout: float, Ef: float,
+                 guess=None, window=3.) -> tuple:
+    """
+    Отрезок guess +- window * kT внутри границ приближения обеднения, который расширяем,
+    пока на его концах функция не будет разного знака.
+
+    :param epsilon: dielectric constant
+    :param Nd: donors' concentration
+    :param t: temperature in Kelvin
+    :param Nas: surface acceptors' concentration
+    :param Eas: field created by surface acceptors
+    :param Eout: External field value in V/m
+    :param Ef: Fermi level in eV
+    :param guess: band bend estimate in eV, if None initial_bend is used
+    :param window: half width of the bracket in kT
+    :return: bracket [phi_low, phi_upper] in eV, arrays if any of the parameters is an array
+    """
+    lowest, highest = _depletion_limits(epsilon=epsilon, Nd=Nd, t=t, Nas=Nas, Eas=Eas, Eout=Eout, Ef=Ef)
+    if guess is None:
+        guess = np.minimum(np.maximum(Ef - Eas, lowest), highest)
+
+    def f(phi):
+        return _bend_function(epsilon=epsilon, phi=phi, Nd=Nd, Nas=Nas, Eas=Eas, Ef=Ef, t=t, Eout=Eout)
+
+    return _grow_bracket(f=f, guess=guess, lowest=lowest, highest=highest,
+                         width=window * 1.381e-16 * 6.24e11 * t)
 
 
 def bend_methods() -> list:
-    return ['dichotomy', 'newtown', 'fixed-point', 'secant']
+    return ['brent', 'dichotomy', 'newtown', 'fixed-point', 'secant']
 
 
 def calculate_band_bend(epsilon: float, Nd: float, t: float, Nas: float, Eas: float, Eout: float,
-                        Ef: float, phi0: float, method='dichotomy', tolerance=1e-7, phi1=None, delta=1e-3) -> tuple:
+                        Ef: float, phi0=None, method='brent', tolerance=1e-7, phi1=None, delta=1e-3,
+                        max_iter=1000, full_output=False) -> tuple:
     """
-    Calculates band bend. On default runs through the dichotomy method
+    Calculates band bend. On default runs through the safeguarded Newton (brent) method
 
     :param epsilon: dielectric constant
     :param Nd: donors concentration
@@ -207,42 +301,178 @@ def calculate_band_bend(epsilon: float, Nd: float, t: float, Nas: float, Eas: fl
     :param Eas: acceptors energy level
     :param Eout: outer electric field
     :param Ef: fermi level
-    :param phi0: bend in eV
+    :param phi0: bend in eV, if None initial_bend is used, 'brent' and 'dichotomy' take bend_bracket,
+    for them phi0 without phi1 is a guess to build the bracket around
     :param method: method to use
     :param tolerance: min error to end calculation
-    :param phi1: bend in eV
+    :param phi1: bend in eV, if None the bracket is taken from bend_bracket
     :param delta: stater bend difference used only for the secant method
+    :param max_iter: iterations limit
+    :param full_output: if True returns RootResult with iterations, evaluations and final residual
     :return: band bend magnitude in eV and iteration number needed to calculate
     """
 
-    methods = ['dichotomy', 'newtown', 'fixed-point', 'secant']
-    bend, counter = None, 0
+    methods = bend_methods()
+    result = None
 
     try:
-        if method == 'dichotomy':
-            if phi1 is not None and phi1 > phi0:
-                bend, counter = _dichotomy_method(epsilon=epsilon, phi0=phi0, phi1=phi1, nd=Nd, t=t, n_as=Nas, e_as=Eas,
-                                                  e_f=Ef, e_out=Eout, tolerance=tolerance, counter=counter)
+        if method in ('brent', 'dichotomy') and (phi0 is None or phi1 is None):
+            phi0, phi1 = bend_bracket(epsilon=epsilon, Nd=Nd, t=t, Nas=Nas, Eas=Eas, Eout=Eout, Ef=Ef, guess=phi0)
+        elif phi0 is None:
+            phi0 = initial_bend(epsilon=epsilon, Nd=Nd, t=t, Nas=Nas, Eas=Eas, Eout=Eout, Ef=Ef)
+
+        if method == 'brent':
+            if phi1 > phi0:
+                result = _brent_method(epsilon=epsilon, phi0=phi0, phi1=phi1, nd=Nd, t=t, n_as=Nas, e_as=Eas,
+                                       e_f=Ef, e_out=Eout, tolerance=tolerance, max_iter=max_iter)
+            else:
+                raise CantRunDichotomyMethod(phi0=phi0, phi1=phi1)
+        elif method == 'dichotomy':
+            if phi1 > phi0:
+                result = _dichotomy_method(epsilon=epsilon, phi0=phi0, phi1=phi1, nd=Nd, t=t, n_as=Nas, e_as=Eas,
+                                           e_f=Ef, e_out=Eout, tolerance=tolerance, max_iter=max_iter)
             else:
                 raise CantRunDichotomyMethod(phi0=phi0, phi1=phi1)
         elif method == 'fixed-point':
-            bend, counter = _fixed_point_method(epsilon=epsilon, phi=phi0, phi_fixed=phi0, nd=Nd, n_as=Nas,
-                                                e_as=Eas, e_f=Ef, e_out=Eout, count=counter, tolerance=tolerance, t=t)
+            result = _fixed_point_method(epsilon=epsilon, phi=phi0, phi_fixed=phi0, nd=Nd, n_as=Nas, e_as=Eas,
+                                         e_f=Ef, e_out=Eout, tolerance=tolerance, t=t, max_iter=max_iter)
         elif method == 'newtown':
-            bend, counter = _newtown_method(epsilon=epsilon, phi=phi0, nd=Nd, n_as=Nas, e_as=Eas, e_f=Ef, t=t,
-                                            e_out=Eout, count=counter, tolerance=tolerance)
+            result = _newtown_method(epsilon=epsilon, phi=phi0, nd=Nd, n_as=Nas, e_as=Eas, e_f=Ef, t=t,
+                                     e_out=Eout, tolerance=tolerance, max_iter=max_iter)
         elif method == 'secant':
-            bend, counter = _secant_method(epsilon=epsilon, phi_0=phi0, nd=Nd, n_as=Nas, e_as=Eas, e_f=Ef, t=t,
-                                           e_out=Eout, counter=counter, tolerance=tolerance, phi_1=phi1, delta=delta)
+            result = _secant_method(epsilon=epsilon, phi_0=phi0, nd=Nd, n_as=Nas, e_as=Eas, e_f=Ef, t=t,
+                                    e_out=Eout, tolerance=tolerance, phi_1=phi1, delta=delta, max_iter=max_iter)
         else:
             raise CantMatchMethod(message=method, methods=methods)
 
-        print(f'method: [{method}]\t bend width = {bend}, \t needed {counter} iterations')
-        return bend, counter
+        if not result.converged:
+            raise CantReachTolerance(max_iter=max_iter, residual=result.residual)
+
+        print(f'method: [{method}]\t bend width = {result.root}, \t needed {result.iterations} iterations')
+        if full_output:
+            return result
+        return result.root, result.iterations
 
     except CantMatchMethod as e:
         print(e.args)
     except CantRunDichotomyMethod as e:
         print(e.args)
+    except CantFindSignChange as e:
+        print(e.args)
     except CatchZeroDelta as e:
         print('Delta equals zero')
+    except CantReachTolerance as e:
+        print(e.args)
+
+
+def calculate_band_bend_batch(epsilon, Nd, t, Nas, Eas, Eout, Ef, phi0=None, phi1=None, tolerance=1e-7,
+                              max_iter=100) -> VectorRootResult:
+    """
+    Calculates band bend for all cells of a grid at once (e.g. Nas x Eas x Eout maps) by the vectorized
+    safeguarded Newton method. All parameters may be numbers or numpy arrays, they are broadcast together.
+    Nothing is printed.
+
+    :param epsilon: dielectric constant
+    :param Nd: donors concentration
+    :param t: temperature
+    :param Nas: acceptors concentration
+    :param Eas: acceptors energy level
+    :param Eout: outer electric field
+    :param Ef: fermi level
+    :param phi0: lower borders of brackets in eV, if None taken from bend_bracket
+    :param phi1: upper borders of brackets in eV, if None taken from bend_bracket
+    :param tolerance: min error to end calculation
+    :param max_iter: iterations limit
+    :return: band bend in eV, per-cell iterations amount and convergence flags
+    """
+    epsilon, Nd, t, Nas, Eas, Eout, Ef = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                                               (epsilon, Nd, t, Nas, Eas, Eout, Ef)])
+    if phi0 is None or phi1 is None:
+        phi_low, phi_upper = bend_bracket(epsilon=epsilon, Nd=Nd, t=t, Nas=Nas, Eas=Eas, Eout=Eout, Ef=Ef)
+        phi0 = phi_low if phi0 is None else phi0
+        phi1 = phi_upper if phi1 is None else phi1
+
+    def f(phi):
+        return _bend_function(epsilon=epsilon, phi=phi, Nd=Nd, Nas=Nas, Eas=Eas, Ef=Ef, t=t, Eout=Eout)
+
+    def df(phi):
+        return _diff_funcrtion(epsilon=epsilon, phi=phi, Nd=Nd, Nas=Nas, Eas=Eas, Ef=Ef, t=t)
+
+    return vectorized_newton(f=f, df=df, a=phi0, b=phi1, x0=Ef - Eas, tolerance=tolerance, max_iter=max_iter)
+
+
+def _states_bend_function(epsilon, phi, Nd, states: SurfaceStates, Ef, t, Eout):
+    """
+    _bend_function for the continuous distribution of surface states: N_as / (1 + exp(...)) is replaced
+    with the quadrature states.charge(phi, Ef, t)
+
+    :param epsilon: dielectric constant
+    :param phi: band bend value in eV
+    :param Nd: donors' concentration
+    :param states: surface states' distribution from pame.BandBend.SurfaceStates
+    :param Ef: Fermi level in eV
+    :param t: temperature in Kelvin
+    :param Eout: External field value in V/m
+    :return: a value of the difference of different formulas for surface charge
+    """
+    e, eV = 1, 1
+    n_as = states.charge(phi=phi, Ef=Ef, t=t) + Eout * 3.3 * 1e-5 / (4 * np.pi * e)
+    w = (epsilon * phi * eV * Nd / (2 * np.pi * e**2)) ** 0.5
+    return w - n_as
+
+
+def _diff_states_function(epsilon, phi, Nd, states: SurfaceStates, Ef, t):
+    """
+    :return: a value of the derivative of _states_bend_function by phi
+    """
+    e, eV = 1, 1
+    diff_w = 0.5 * epsilon * Nd / (2 * np.pi * e**2) / (epsilon * phi * eV * Nd / (2 * np.pi * e**2)) ** 0.5
+    return diff_w - states.diff_charge(phi=phi, Ef=Ef, t=t)
+
+
+def calculate_band_bend_states(epsilon, Nd, t, states: SurfaceStates, Eout, Ef, phi0=None, phi1=None,
+                               window=3., tolerance=1e-7, max_iter=100) -> VectorRootResult:
+    """
+    Calculates band bend for the continuous distribution of surface states by the vectorized safeguarded
+    Newton method. Quadrature nodes of the distribution are computed once, so each step is a few array
+    operations over (cells x nodes). All parameters except states may be numbers or numpy arrays.
+    Nothing is printed.
+
+    :param epsilon: dielectric constant
+    :param Nd: donors concentration
+    :param t: temperature
+    :param states: surface states' distribution from pame.BandBend.SurfaceStates
+    :param Eout: outer electric field
+    :param Ef: fermi level
+    :param phi0: lower borders of brackets in eV, if None - grown around the pinning guess as in bend_bracket
+    :param phi1: upper borders of brackets in eV, if None - grown around the pinning guess as in bend_bracket
+    :param window: half width of the starter bracket in kT
+    :param tolerance: min error to end calculation
+    :param max_iter: iterations limit
+    :return: band bend in eV, per-cell iterations amount and convergence flags
+    """
+    epsilon, Nd, t, Eout, Ef = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                                     (epsilon, Nd, t, Eout, Ef)])
+
+    def depletion(phi):
+        # корень при заселенности, взятой в точке phi, см. _depletion_limits
+        n_as = states.charge(phi=phi, Ef=Ef, t=t) + Eout * 3.3 * 1e-5 / (4 * np.pi)
+        return 2 * np.pi * n_as ** 2 / (epsilon * Nd)
+
+    def f(phi):
+        return _states_bend_function(epsilon=epsilon, phi=phi, Nd=Nd, states=states, Ef=Ef, t=t, Eout=Eout)
+
+    def df(phi):
+        return _diff_states_function(epsilon=epsilon, phi=phi, Nd=Nd, states=states, Ef=Ef, t=t)
+
+    # закрепление уровня Ферми в середине распределения, отрезок вокруг него - как в bend_bracket
+    center = np.sum(states.energies * states.weights) / states.weights.sum()
+    highest = depletion(np.zeros(Ef.shape))
+    lowest = depletion(highest) / 2
+    guess = np.minimum(np.maximum(Ef - center, lowest), highest)
+    if phi0 is None or phi1 is None:
+        phi_low, phi_upper = _grow_bracket(f=f, guess=guess, lowest=lowest, highest=highest,
+                                           width=window * 1.381e-16 * 6.24e11 * t)
+        phi0 = phi_low if phi0 is None else phi0
+        phi1 = phi_upper if phi1 is None else phi1
+    return vectorized_newton(f=f, df=df, a=phi0, b=phi1, x0=guess, tolerance=tolerance, max_iter=max_iter)
@@ -0,0 +1,75 @@
+"""
+Зависимость изгиба зон от внешнего поля phi_s(E_out).
+
+Невязка _states_bend_function(phi) = w(phi) - n_s(phi) - E_out * 3.3e-5 / 4pi монотонно растет по phi:
+w'(phi) > 0, а заполнение состояний акцепторного типа из pame.BandBend.SurfaceStates падает с ростом изгиба
+(diff_charge < 0). Поэтому при любом поле корень не больше одного, ветвей, точек поворота и гистерезиса нет.
+
+Поле входит в невязку линейно, так что для всех полей достаточно одной таблицы
+g(phi) = w(phi) - n_s(phi) на сетке phi:
+1) g возрастает, отрезок с корнем для поля - соседние узлы, между которыми лежит E_out * 3.3e-5 / 4pi,
+   начальная точка - линейная интерполяция обратной функции по таблице;
+2) все поля уточняем одним вызовом vectorized_newton, на поле уходит 1-3 итерации.
+Стоимость таблицы не зависит от количества полей, на каждое поле - несколько вычислений невязки.
+"""
+import numpy as np
+from pame.BandBend.BandBend import _states_bend_function, _diff_states_function
+from pame.BandBend.SurfaceStates import SurfaceStates, DiscreteStates
+from pame.solvers import vectorized_newton, VectorRootResult
+
+Kelvin = float
+eV = float
+
+
+def _field_grid(epsilon, Nd, t, Ef, Eout, states: SurfaceStates, grid_points: int) -> np.ndarray:
+    """
+    Равномерная сетка до Ef - min(E_k) + 20 kT, где меняется заселенность состояний,
+    дальше - геометрическая до границы приближения обеднения при полном заполнении.
+    """
+    span = max(Ef - states.energies.min(), 0.) + 20 * 1.381e-16 * 6.24e11 * t
+    n_as = states.weights[states.weights > 0].sum() + max(np.max(Eout), 0.) * 3.3 * 1e-5 / (4 * np.pi)
+    highest = 2 * np.pi * n_as ** 2 / (epsilon * Nd)
+    grid = np.linspace(0., span, grid_points)
+    if highest > span:
+        grid = np.concatenate([grid, np.geomspace(span, highest, 33)[1:]])
+    return grid
+
+
+def sweep_band_bend_field(epsilon: float, Nd: float, t: Kelvin, Ef: eV, Eout, Nas=0., Eas=0., states=None,
+                          phi_grid=None, grid_points=256, tolerance=1e-7, max_iter=100) -> VectorRootResult:
+    """
+    :param epsilon: dielectric constant
+    :param Nd: donors concentration
+    :param t: temperature
+    :param Ef: fermi level
+    :param Eout: outer electric field values
+    :param Nas: acceptors concentration, used if states is None
+    :param Eas: acceptors energy level, used if states is None
+    :param states: surface states' distribution from pame.BandBend.SurfaceStates
+    :param phi_grid: increasing band bend grid for the table of the residual, if None - see _field_grid
+    :param grid_points: amount of points of the uniform part of the default grid
+    :param tolerance: min error to end calculation
+    :param max_iter: iterations limit
+    :return: band bend for each field, iterations amount and convergence flags;
+             a field without a root on the grid gets NaN and is not converged
+    """
+    if states is None:
+        states = DiscreteStates(Nas=Nas, Eas=Eas)
+    Eout = np.atleast_1d(np.asarray(Eout, dtype=float))
+    if phi_grid is None:
+        phi_grid = _field_grid(epsilon=epsilon, Nd=Nd, t=t, Ef=Ef, Eout=Eout, states=states,
+                               grid_points=grid_points)
+
+    def f(phi):
+        return _states_bend_function(epsilon=epsilon, phi=phi, Nd=Nd, states=states, Ef=Ef, t=t, Eout=Eout)
+
+    def df(phi):
+        return _diff_states_function(epsilon=epsilon, phi=phi, Nd=Nd, states=states, Ef=Ef, t=t)
+
+    # таблица невязки без поля, общая для всех полей
+    table = _states_bend_function(epsilon=epsilon, phi=phi_grid, Nd=Nd, states=states, Ef=Ef, t=t, Eout=0.)
+    field_charge = Eout * 3.3 * 1e-5 / (4 * np.pi)
+    cell = np.clip(np.searchsorted(table, field_charge), 1, len(phi_grid) - 1)
+    # вне таблицы смены знака на отрезке нет - vectorized_newton вернет NaN
+    return vectorized_newton(f=f, df=df, a=phi_grid[cell - 1], b=phi_grid[cell],
+                             x0=np.interp(field_charge, table, phi_grid), tolerance=tolerance, max_iter=max_iter)
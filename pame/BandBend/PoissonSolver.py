@@ -0,0 +1,178 @@
+"""
+Профиль изгиба зон phi(x) у поверхности полупроводника из нелинейного уравнения Пуассона.
+
+phi(x) - изгиб зон в eV (phi > 0 - зоны загнуты вверх): Ec(x) = Ec + phi(x), Ev(x) = Ev + phi(x),
+уровень Ферми Ef постоянный и берется из уравнения электронейтральности в объеме.
+
+    phi'' = e (p - n + Nd^+ - Na^-) / (epsilon epsilon0),   phi(L) = 0
+
+Концентрации считаются по формулам CalculateParticles (Больцман или Ферми-Дирак),
+поэтому решение описывает и обеднение, и обогащение, и инверсию.
+
+На поверхности задается либо изгиб phi(0) = phi_s, либо заряд поверхностных акцепторов и внешнее поле:
+    -epsilon epsilon0 phi'(0) / e = N_as / (1 + exp((E_as + phi_s - Ef)/kT)) + n_s(phi_s) + epsilon0 E_out / e
+где n_s - заряд непрерывного распределения поверхностных состояний (SurfaceStates).
+
+Сетка неравномерная, сгущается к поверхности. Нелинейную систему решаем методом Ньютона
+с логарифмическим демпфированием шага, линейную систему с трехдиагональной матрицей -
+методом циклической редукции (solvers.tridiagonal_solve) за O(N).
+"""
+import numpy as np
+from typing import NamedTuple
+import pame.constants as constants
+from pame.FermiLevelPinning.CalculateParticles import calc_Nc, calc_Nv, fermi_dirac_half_derivative
+from pame.FermiLevelPinning.CompensatedFermiLevel import calculate_fermi_level, _charges
+from pame.solvers import tridiagonal_solve
+
+me_effective = float
+mh_effective = float
+Kelvin = float
+eV = float
+
+
+class PoissonResult(NamedTuple):
+    x: np.ndarray
+    phi: np.ndarray
+    n: np.ndarray
+    p: np.ndarray
+    Ndpl: np.ndarray
+    Naneg: np.ndarray
+    Ef: float
+    surface_charge: float
+    iterations: int
+    converged: bool
+
+
+def surface_mesh(length: float, nodes=10000, stretch=8.) -> np.ndarray:
+    """
+    :math: $x_i = L \frac{exp(\beta s_i) - 1}{exp(\beta) - 1}$, $s_i$ - равномерная сетка на [0, 1]
+
+    :param length: depth of the region in cm
+    :param nodes: amount of nodes
+    :param stretch: beta, 0 for the uniform mesh, the first step is about beta / (exp(beta) - 1) of the uniform one
+    :return: mesh from the surface (x = 0) into the bulk in cm
+    """
+    s = np.linspace(0., 1., nodes)
+    if stretch == 0:
+        return length * s
+    return length * np.expm1(stretch * s) / np.expm1(stretch)
+
+
+def _space_charge(phi, Ef, nc, nv, t, Ec, Ev, donors, acceptors, statistics) -> tuple:
+    """
+    :return: p - n + Nd^+ - Na^- and its derivative by phi in cm^-3 / eV
+    """
+    kt = 1.38e-16 * 6.24e11 * t
+    ef = Ef - phi
+    n, p, ndpl, naneg = _charges(Ef=ef, nc=nc, nv=nv, t=t, Ec=Ec, Ev=Ev, donors=donors, acceptors=acceptors,
+                                 statistics=statistics)
+    if statistics == 'fermi-dirac':
+        dn = nc * fermi_dirac_half_derivative((ef - Ec) / kt) / kt
+        dp = nv * fermi_dirac_half_derivative((Ev - ef) / kt) / kt
+    else:
+        dn, dp = n / kt, p / kt
+    # производные по Ef, d/dphi = -d/dEf
+    dndpl = sum(-nd * 0.5 * np.exp((ef - Ec + jd) / kt) / (1. + 0.5 * np.exp((ef - Ec + jd) / kt)) ** 2 / kt
+                for nd, jd in donors)
+    dnaneg = sum(na * .25 * np.exp((Ev + ja - ef) / kt) / (1. + .25 * np.exp((Ev + ja - ef) / kt)) ** 2 / kt
+                 for na, ja in acceptors)
+    return (p - n + ndpl - naneg), -(-dp - dn + dndpl - dnaneg)
+
+
+def solve_poisson(me: me_effective, mh: mh_effective, t: Kelvin, epsilon: float, Ec: eV, donors=(), acceptors=(),
+                  Ev=0., Ef=None, phi_s=None, Nas=0., Eas=0., Eout=0., states=None, length=None, nodes=10000, stretch=8.,
+                  tolerance=1e-8, max_iter=100, statistics='boltzmann') -> PoissonResult:
+    """
+    :param me: эффективная масса электрона
+    :param mh: эффективная масса дырки
+    :param t: температура
+    :param epsilon: dielectric constant
+    :param Ec: дно зоны проводимости в объеме
+    :param donors: list of (Nd, Jd) pairs, Ed = Ec - Jd
+    :param acceptors: list of (Na, Ja) pairs, Ea = Ev + Ja
+    :param Ev: потолок валентной зоны в объеме
+    :param Ef: уровень Ферми, если не задан - из уравнения электронейтральности в объеме
+    :param phi_s: изгиб зон на поверхности в eV, если не задан - считается из заряда поверхности
+    :param Nas: surface acceptors' concentration in cm^-2
+    :param Eas: surface acceptors' energy level in eV, occupation is 1 / (1 + exp((Eas + phi_s - Ef)/kT))
+    :param Eout: external field in V/cm, it adds epsilon0 Eout / e to the negative surface charge
+    :param states: continuous surface states' distribution from pame.BandBend.SurfaceStates, added to Nas
+    :param length: depth of the region in cm, if None - 3 depletion widths for phi = Eg plus 20 Debye lengths
+    :param nodes: amount of mesh nodes
+    :param stretch: mesh refinement near the surface, see surface_mesh
+    :param tolerance: max Newton correction of phi in eV
+    :param max_iter: iterations limit
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: mesh, phi(x), n(x), p(x), Nd^+(x), Na^-(x), Fermi level, surface charge in e/cm^2 and convergence info
+    """
+    nc, nv = calc_Nc(me, t), calc_Nv(mh, t)
+    kt = 1.38e-16 * 6.24e11 * t
+    c = constants.e / (constants.epsilon0 * epsilon)  # eV cm
+    if Ef is None:
+        Ef = float(calculate_fermi_level(me=me, mh=mh, t=t, Ec=Ec, donors=donors, acceptors=acceptors, Ev=Ev,
+                                         statistics=statistics)['Ef'])
+
+    if length is None:
+        n0, p0, ndpl0, naneg0 = _charges(Ef=Ef, nc=nc, nv=nv, t=t, Ec=Ec, Ev=Ev, donors=donors,
+                                         acceptors=acceptors, statistics=statistics)
+        doping = max(ndpl0 + naneg0, n0 + p0)
+        debye = np.sqrt(kt / (c * (n0 + p0)))
+        depletion = np.sqrt(2 * (Ec - Ev) / (c * doping))
+        length = 3 * depletion + 20 * debye
+
+    x = surface_mesh(length=length, nodes=nodes, stretch=stretch)
+    h = np.diff(x)
+    # phi(L) = 0 - неизвестные phi_0 ... phi_{N-2}
+    h_left, h_right = h[:-1], h[1:]
+    lower = 2. / ((h_left + h_right) * h_left)
+    upper = 2. / ((h_left + h_right) * h_right)
+
+    def surface(phi0):
+        # заряд поверхности в e/cm^2 и его производная по phi_s
+        w = (Eas + phi0 - Ef) / kt
+        f = 1. / (1. + np.exp(w))
+        sigma, dsigma = Nas * f + constants.epsilon0 * Eout / constants.e, -Nas * f * (1. - f) / kt
+        if states is not None:
+            sigma, dsigma = sigma + states.charge(phi0, Ef, t), dsigma + states.diff_charge(phi0, Ef, t)
+        return sigma, dsigma
+
+    phi = np.zeros(nodes)
+    if phi_s is not None:
+        phi[0] = phi_s
+
+    iterations, converged = 0, False
+    with np.errstate(over='ignore'):
+        for iterations in range(1, max_iter + 1):
+            rho, drho = _space_charge(phi[:-1], Ef, nc, nv, t, Ec, Ev, donors, acceptors, statistics)
+
+            residual = np.empty(nodes - 1)
+            diag = np.empty(nodes - 1)
+            sub, sup = np.zeros(nodes - 1), np.zeros(nodes - 1)
+            residual[1:] = lower * phi[:-2] - (lower + upper) * phi[1:-1] + upper * phi[2:] - c * rho[1:]
+            diag[1:] = -(lower + upper) - c * drho[1:]
+            sub[1:] = lower
+            sup[1:-1] = upper[:-1]
+
+            if phi_s is not None:
+                residual[0], diag[0] = 0., 1.
+            else:
+                # половина ячейки у поверхности: (phi_1 - phi_0)/h_0 + c sigma(phi_0) - c rho_0 h_0 / 2 = 0
+                sigma, dsigma = surface(phi[0])
+                residual[0] = (phi[1] - phi[0]) / h[0] + c * sigma - c * rho[0] * h[0] / 2
+                diag[0] = -1. / h[0] + c * dsigma - c * drho[0] * h[0] / 2
+                sup[0] = 1. / h[0]
+
+            delta = tridiagonal_solve(lower=sub, diag=diag, upper=sup, rhs=-residual)
+            # логарифмическое демпфирование: шаги больше kT сжимаются
+            delta = np.sign(delta) * kt * np.log1p(np.abs(delta) / kt)
+            phi[:-1] += delta
+            if np.max(np.abs(delta)) < tolerance:
+                converged = True
+                break
+
+    n, p, ndpl, naneg = _charges(Ef=Ef - phi, nc=nc, nv=nv, t=t, Ec=Ec, Ev=Ev, donors=donors, acceptors=acceptors,
+                                 statistics=statistics)
+    rho = p - n + ndpl - naneg
+    surface_charge = float(np.sum((rho[1:] + rho[:-1]) * h) / 2)
+    return PoissonResult(x=x, phi=phi, n=n, p=p, Ndpl=ndpl, Naneg=naneg, Ef=Ef, surface_charge=surface_charge,
+                         iterations=iterations, converged=converged)
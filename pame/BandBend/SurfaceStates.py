@@ -0,0 +1,142 @@
+"""
+Непрерывное распределение поверхностных состояний акцепторного типа D_it(E) в cm^-2 eV^-1.
+
+Заряд поверхности (в единицах e, со знаком минус) при изгибе зон phi:
+    n_s(phi) = \int D_it(E) / (1 + exp((E + phi - Ef)/kT)) dE
+
+Интеграл заменяем квадратурой с узлами E_k и весами w_k, которые считаются один раз при создании
+распределения:
+    n_s(phi) = \sum_k w_k / (1 + exp((E_k + phi - Ef)/kT))
+
+Гауссово распределение - узлы Гаусса-Эрмита, U-образное - Гаусса-Лежандра на [Ev, Ec] для постоянной части
+и Гаусса-Лагерра для экспоненциальных хвостов у краев зон, табличное - Гаусса-Лежандра на каждом интервале таблицы.
+Одиночный уровень (N_as, E_as) из _bend_function - это один узел с весом N_as.
+
+Квадратура точна, пока расстояние между узлами меньше kT, для низких температур узлов нужно больше.
+"""
+import numpy as np
+from numpy.polynomial.hermite import hermgauss
+from numpy.polynomial.laguerre import laggauss
+from numpy.polynomial.legendre import leggauss
+
+Kelvin = float
+eV = float
+
+
+def _legendre(a, b, nodes: int) -> tuple:
+    """
+    :return: Gauss-Legendre nodes and weights on [a, b] for each pair of borders, flattened
+    """
+    x, w = leggauss(nodes)
+    a, b = np.atleast_1d(a)[:, None], np.atleast_1d(b)[:, None]
+    return ((a + b) / 2 + (b - a) / 2 * x).ravel(), ((b - a) / 2 * w).ravel()
+
+
+class SurfaceStates(object):
+    def __init__(self, energies, weights):
+        """
+        :param energies: quadrature nodes in eV, the same reference as for Eas and Ef
+        :param weights: quadrature weights in cm^-2, D_it(E_k) times the quadrature weight
+        """
+        self.energies = np.asarray(energies, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+
+    @property
+    def density(self) -> float:
+        """
+        :return: total states' concentration in cm^-2
+        """
+        return float(self.weights.sum())
+
+    def _exponent(self, phi, Ef, t):
+        """
+        :return: (E_k + phi - Ef) / kT with the shape (cells..., nodes)
+        """
+        phi, Ef, t = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (phi, Ef, t)])
+        kt = 1.381e-16 * 6.24e11 * t
+        w = np.multiply.outer(1. / kt, self.energies)
+        w += ((phi - Ef) / kt)[..., None]
+        return w
+
+    def charge(self, phi, Ef, t):
+        """
+        :param phi: band bend in eV, number or array
+        :param Ef: Fermi level in eV
+        :param t: temperature in Kelvin
+        :return: occupied (negatively charged) states' concentration in cm^-2
+        """
+        w = self._exponent(phi, Ef, t)
+        # 1 / (1 + exp(w)) через exp(-|w|) - без переполнения и без потери точности в хвостах
+        tail = np.exp(-np.abs(w))
+        occupied = np.where(w > 0, tail, 1.)
+        occupied /= 1. + tail
+        return occupied @ self.weights
+
+    def diff_charge(self, phi, Ef, t):
+        """
+        :return: derivative of charge by phi in cm^-2 eV^-1
+        """
+        kt = 1.381e-16 * 6.24e11 * np.asarray(t, dtype=float)
+        tail = np.exp(-np.abs(self._exponent(phi, Ef, t)))
+        tail /= (1. + tail) ** 2
+        return -(tail @ self.weights) / kt
+
+
+class DiscreteStates(SurfaceStates):
+    def __init__(self, Nas, Eas: eV):
+        """
+        :param Nas: surface acceptors' concentration in cm^-2
+        :param Eas: surface acceptors' energy level in eV
+        """
+        super().__init__(energies=[Eas], weights=[Nas])
+
+
+class GaussianStates(SurfaceStates):
+    def __init__(self, Nt, E0: eV, sigma: eV, nodes=32):
+        """
+        :math: $D_{it}(E) = \frac{N_t}{\sqrt{2\pi}\sigma} exp(-\frac{(E - E_0)^2}{2\sigma^2})$
+
+        :param Nt: total states' concentration in cm^-2
+        :param E0: center of the distribution in eV
+        :param sigma: width of the distribution in eV
+        :param nodes: amount of Gauss-Hermite nodes
+        """
+        x, w = hermgauss(nodes)
+        super().__init__(energies=E0 + np.sqrt(2) * sigma * x, weights=Nt * w / np.sqrt(np.pi))
+
+
+class UShapedStates(SurfaceStates):
+    def __init__(self, D0, Ec: eV, Ev: eV = 0., Dc=0., wc: eV = 0.1, Dv=0., wv: eV = 0.1, nodes=64, tail_nodes=16):
+        """
+        :math: $D_{it}(E) = D_0 + D_c exp(-\frac{E_c - E}{w_c}) + D_v exp(-\frac{E - E_v}{w_v})$, $E_v < E < E_c$
+
+        Хвосты интегрируются до бесконечности, ошибка порядка exp(-Eg / w).
+
+        :param D0: midgap density in cm^-2 eV^-1
+        :param Ec: conduction band energy level in eV
+        :param Ev: valence band energy level in eV
+        :param Dc: density at the conduction band edge in cm^-2 eV^-1
+        :param wc: decay energy of the conduction band tail in eV
+        :param Dv: density at the valence band edge in cm^-2 eV^-1
+        :param wv: decay energy of the valence band tail in eV
+        :param nodes: amount of Gauss-Legendre nodes for the constant part
+        :param tail_nodes: amount of Gauss-Laguerre nodes for each tail
+        """
+        energies, weights = _legendre(Ev, Ec, nodes)
+        x, w = laggauss(tail_nodes)
+        super().__init__(energies=np.concatenate([energies, Ec - wc * x, Ev + wv * x]),
+                         weights=np.concatenate([D0 * weights, Dc * wc * w, Dv * wv * w]))
+
+
+class TabulatedStates(SurfaceStates):
+    def __init__(self, E, Dit, nodes=8):
+        """
+        D_it(E) линейно интерполируется между точками таблицы.
+
+        :param E: energies of the table in eV, increasing
+        :param Dit: density of states in cm^-2 eV^-1 at these energies
+        :param nodes: amount of Gauss-Legendre nodes for each interval of the table
+        """
+        E, Dit = np.asarray(E, dtype=float), np.asarray(Dit, dtype=float)
+        energies, weights = _legendre(E[:-1], E[1:], nodes)
+        super().__init__(energies=energies, weights=weights * np.interp(energies, E, Dit))
@@ -1,37 +1,25 @@
 """
-В данной программе производим рассчет
-заряженных частицы в полупроводнике.
-Точнее считаем Nd+, p, n, Q
+Уровень Ферми в полупроводнике, легированном акцепторами.
 
-Пусть ширина запрещенной зоны Eg = 1.12eV
-Jd = Ea - Ev = Ea = 50 meV, обычно устанавливаем Ev=0
+Ja = Ea - Ev - энергия ионизации акцепторов, обычно Ev = 0
 
 1) Уравнение электронейтральности:
-    n = Nd+ + p
+    p = n + Na^-
 
-2) Ef - уровень Ферми, 
-   Ec - дно зоны проводимости, 
-   Ev - потолок валентной зоны:
-   
+2) Ef - уровень Ферми, Ec - дно зоны проводимости, Ev - потолок валентной зоны:
     n = Nc * exp(- (Ec - Ef)/kT )
     p = Nv * exp(- (Ef - Ev)/kT )
+    Na^- = Na / (1 + 1/4 * exp((Ea - Ef)/kT ))
 
-    Получаем Nd+ = Nd/ (1 + 1/2 * exp((Ef - Ea)/kT ))
-
- Q = n - p - Nd+ - заряд в материале
-I. Предположим, что Nd+ = 0 -> полупроводник собственный, уровень ферми ушел глубоко,
-    т.е. находится высоко над валентной зоной:
-    Ef_+ = (Ec + Ev)/2 + 3/4 * kT * ln(me*/mh*)
-
-II. Уровень Ферми совпадает с границей валентной зоны при
-Nd=10^17 -> статистика не вырожденная:
-    Nc(Si, T=300K) ~ 10^19
-Т.о. на втором участке заряд гарантировано положительный,
-    Ef1 = (Ef_+ + Ef_-)/2
+ Q = n + Na^- - p - заряд в материале, монотонно растет с ростом Ef.
 
+Выбор метода, начальное приближение и отрезок со сменой знака - общие с донорами (ImpurityFermiLevel),
+основные носители - дырки у Ev, поэтому уровень Ферми отсчитывается от Ev вниз.
 """
 from typing import NamedTuple
 from pame.FermiLevelPinning.CalculateParticles import *
+from pame.FermiLevelPinning.ImpurityFermiLevel import initial_level, sign_change_bracket, find_level
+from pame.solvers import RootResult, dichotomy
 
 me_effective = float
 mh_effective = float
@@ -42,6 +30,26 @@ eV = float
 
 
 class Result(NamedTuple):
+    Ef: float
+    n: float
+    p: float
+    Ndneg: float
+    Q: float
+    ratio: float
+    Nv: float
+    Nc: float
+    iterations: int = 0
+    evaluations: int = 0
+
+    def __str__(self) -> str:
+        # концентрации переводим в строки вида 1.00e16 только при выводе
+        return f'Result(Ef={self.Ef}, n={convert_charges(self.n)}, p={convert_charges(self.p)}, ' \
+               f'Ndneg={convert_charges(self.Ndneg)}, Q={self.Q}, ratio={self.ratio}, ' \
+               f'Nv={convert_charges(self.Nv)}, Nc={convert_charges(self.Nc)}, ' \
+               f'iterations={self.iterations}, evaluations={self.evaluations})'
+
+
+class Result_xey(NamedTuple):
     Ef: float
     n: str
     p: str
@@ -52,40 +60,152 @@ class Result(NamedTuple):
     Nc: str
 
 
-def find_fermi_level(me: me_effective, mh: mh_effective, Jd: float, t: Kelvin, Efpl: eV, Efneg: eV, Ec: eV, Ev: eV, Na: float):
+def _make_result(nc: float, nv: float, na: float, t: Kelvin, e_a: eV, e_c: eV, e_v: eV,
+                 solution: RootResult, statistics='boltzmann') -> Result:
+    """
+    :param nc: concentration of electrons
+    :param nv: concentration of holes
+    :param na: concentration of acceptors
+    :param t: temperature in Kelvin
+    :param e_a: acceptors energy level in eV
+    :param e_c: conduction band energy level in eV
+    :param e_v: valence band energy level in eV
+    :param solution: root found by a solver
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: charges for the found Fermi level
+    """
+    e_f = solution.root
+    n = calc_n(nc=nc, Ef=e_f, Ec=e_c, t=t, statistics=statistics)
+    p = calc_p(nv=nv, Ef=e_f, Ev=e_v, t=t, statistics=statistics)
+    naneg = calc_Naneg(Na=na, Ef=e_f, Ea=e_a, t=t)
+    q = count_Q(n=n, p=p, Naneg=naneg)
+    return Result(Ef=e_f, n=n, p=p, Ndneg=naneg, Q=q, ratio=q/(n + naneg), Nv=nv, Nc=nc,
+                  iterations=solution.iterations, evaluations=solution.evaluations)
+
+
+def _balance(nc: float, nv: float, na: float, t: Kelvin, e_a: eV, e_c: eV, e_v: eV, statistics='boltzmann') -> tuple:
+    """
+    :return: charge balance function of the Fermi level and its derivative
+    """
+    def f(e_f):
+        return acceptor_balance_function(nc=nc, nv=nv, na=na, t=t, e_f=e_f, e_c=e_c, e_v=e_v, e_a=e_a,
+                                         statistics=statistics)
+
+    def df(e_f):
+        return diff_acceptor_balance_function(nc=nc, nv=nv, na=na, t=t, e_f=e_f, e_c=e_c, e_v=e_v, e_a=e_a,
+                                              statistics=statistics)
+    return f, df
+
+
+def initial_fermi_level(nc: float, nv: float, na: float, t: Kelvin, e_c: eV, e_a: eV, e_v: eV) -> eV:
+    """
+    Начальное приближение уровня Ферми (ImpurityFermiLevel.initial_level) для дырок,
+    $p_1 = 4 N_v exp(-\frac{E_a - E_v}{kT})$.
+
+    :param nc: concentration of electrons
+    :param nv: concentration of holes
+    :param na: concentration of acceptors
+    :param t: temperature in Kelvin
+    :param e_c: conduction band energy level in eV
+    :param e_a: acceptors energy level in eV
+    :param e_v: valence band energy level in eV
+    :return: Fermi level estimate in eV
+    """
+    kt = 1.38e-16 * 6.24e11 * t
+    ln_ni = 0.5 * (np.log(nc) + np.log(nv)) - (e_c - e_v) / (2 * kt)
+    return initial_level(band=e_v, n_band=nv, ln_n1=np.log(4 * nv) - (e_a - e_v) / kt, n_imp=na, ln_ni=ln_ni,
+                         kt=kt, sign=-1)
+
+
+def fermi_level_bracket(nc: float, nv: float, na: float, t: Kelvin, e_c: eV, e_a: eV, e_v: eV, guess=None,
+                        window=3., statistics='boltzmann') -> tuple:
+    """
+    Отрезок guess +- window * kT, который расширяем, пока заряд на его концах не будет разного знака.
+    Отрезок не выходит за [Ev - kT \eta, Ec + kT], \eta = eta_upper_bound(Na/Nv).
+
+    :param nc: concentration of electrons
+    :param nv: concentration of holes
+    :param na: concentration of acceptors
+    :param t: temperature in Kelvin
+    :param e_c: conduction band energy level in eV
+    :param e_a: acceptors energy level in eV
+    :param e_v: valence band energy level in eV
+    :param guess: Fermi level estimate in eV, if None initial_fermi_level is used
+    :param window: half width of the bracket in kT
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: bracket [Ef_low, Ef_upper] with a sign change of the charge
+    """
+    kt = 1.38e-16 * 6.24e11 * t
+    if guess is None:
+        guess = initial_fermi_level(nc=nc, nv=nv, na=na, t=t, e_c=e_c, e_a=e_a, e_v=e_v)
+    q, _ = _balance(nc=nc, nv=nv, na=na, t=t, e_a=e_a, e_c=e_c, e_v=e_v, statistics=statistics)
+    return sign_change_bracket(q=q, guess=guess, lowest=e_v - kt * eta_upper_bound(na / nv), highest=e_c + kt,
+                               width=window * kt)
+
+
+def calculate_fermi_level(me: me_effective, mh: mh_effective, t: Kelvin, Ja: eV, Ec: eV, Na: float,
+                          Ef0=None, result_format='numeric', method='brent', Ev=0., tolerance=1e-7,
+                          Ef1=None, delta=1e-3, max_iter=1000, statistics='boltzmann') -> tuple:
+    """
+    :param me: эффективная масса электрона
+    :param mh: эффективная масса дырки
+    :param t: температура
+    :param Ja: энергия ионизации акцепторов, Ea = Ev + Ja
+    :param Ec: дно зоны проводимости
+    :param Na: концентрация акцепторов
+    :param Ef0: нижняя граница или стартовое значение,
+    если не задано - берем initial_fermi_level, отрезок для 'brent' и 'dichotomy' строим fermi_level_bracket
+    :param result_format: 'numeric' - числа, 'xey' - концентрации строками вида 1.00e16
+    :param method: метод поиска уровня ферми, по умолчанию 'brent' - метод Ньютона с защитой отрезком
+    :param Ev: потолок валентной зоны
+    :param tolerance: acceptable error value
+    :param Ef1: верхняя граница, если не задана - отрезок строим вокруг Ef0
+    :param delta: x_1 - x_0 difference for a first iteration of the secant method
+    :param max_iter: iterations limit
+    :param statistics: 'boltzmann' or 'fermi-dirac' - для вырожденного полупроводника
+    :return: Fermi level in eV, charges and iterations steps amount
+    """
+    nc = calc_Nc(me, t)
+    nv = calc_Nv(mh, t)
+    f, df = _balance(nc=nc, nv=nv, na=Na, t=t, e_a=Ev + Ja, e_c=Ec, e_v=Ev, statistics=statistics)
+
+    def bracket(guess):
+        return fermi_level_bracket(nc=nc, nv=nv, na=Na, t=t, e_c=Ec, e_a=Ev + Ja, e_v=Ev, guess=guess,
+                                   statistics=statistics)
+
+    def initial():
+        return initial_fermi_level(nc=nc, nv=nv, na=Na, t=t, e_c=Ec, e_a=Ev + Ja, e_v=Ev)
+
+    def make_result(solution):
+        return _make_result(nc=nc, nv=nv, na=Na, t=t, e_a=Ev + Ja, e_c=Ec, e_v=Ev, solution=solution,
+                            statistics=statistics)
+
+    def to_xey(result):
+        return Result_xey(Ef=result.Ef, n=convert_charges(result.n), p=convert_charges(result.p),
+                          Ndneg=convert_charges(result.Ndneg), Q=result.Q, ratio=result.ratio,
+                          Nv=convert_charges(nv), Nc=convert_charges(nc))
+
+    return find_level(f=f, df=df, bracket=bracket, initial=initial, make_result=make_result, to_xey=to_xey,
+                      Ef0=Ef0, Ef1=Ef1, result_format=result_format, method=method, delta=delta,
+                      tolerance=tolerance, max_iter=max_iter)
+
+
+def find_fermi_level(me: me_effective, mh: mh_effective, Jd: float, t: Kelvin, Efpl: eV, Efneg: eV, Ec: eV, Ev: eV,
+                     Na: float) -> Result:
     """
     Расчет делаем методом дихотомии
 
     :param me: эффективная масса плотности состояний электронов
     :param mh: эффективная масса плотности состояний дырок
+    :param Jd: энергия ионизации акцепторов, Ea = Ev + Jd
     :param t: температура
-    :param Efpl: уровень Ферми совпадает с дном зоны проводимости,
+    :param Efpl: уровень Ферми близок к потолку валентной зоны
+    :param Efneg: уровень Ферми совпадает с дном зоны проводимости,
     все электроны в зоне проводимости, а дырки в валентной
-    :param Efng: уровень Ферми близок к потолку валентной зоны
-    :return:
+    :return: Fermi level in eV and charges, numbers are formatted only when printed
     """
-
-    # nc = calc_Nc(me, t)
-    # nv = calc_Nv(mh, t)
     nc = count_nc_nv(me, t)
     nv = count_nc_nv(mh, t)
-
-    a, b = Efpl, Efneg
-
-    Ef = (a + b)*0.5
-
-    n = calc_n(nc=nc, Ef=Ef, Ec=Ec, t=t)
-    p = calc_p(nv=nv, Ef=Ef, Ev=Ev, t=t)
-    naneg = calc_Naneg(Na=Na, Ef=Ef, Ea=Jd + Ev, t=t)
-    # print(n, p, naneg)
-    q = count_Q(n=n, p=p, Naneg=naneg)
-
-    if np.abs(q/(n + naneg)) < 0.0001:
-        # print(f'Na={Na}     nc={nv}')
-        return Result(Ef=Ef, n=convert_charges(n), p=convert_charges(p), Ndneg=convert_charges(naneg),
-                      Q=q, ratio=(q/(n + naneg)), Nv=convert_charges(nv), Nc=convert_charges(nc))
-    else:
-        if q > 0:
-            return find_fermi_level(me=me, mh=mh, t=t, Jd=Jd, Ec=Ec, Ev=Ev, Na=Na, Efneg=Ef, Efpl=Efpl)
-        elif q < 0:
-            return find_fermi_level(me=me, mh=mh, t=t, Jd=Jd, Ec=Ec, Ev=Ev, Na=Na, Efneg=Efneg, Efpl=Ef)
+    f, _ = _balance(nc=nc, nv=nv, na=Na, t=t, e_a=Ev + Jd, e_c=Ec, e_v=Ev)
+    solution = dichotomy(f=f, a=Efpl, b=Efneg, tolerance=0.0001)
+    return _make_result(nc=nc, nv=nv, na=Na, t=t, e_a=Ev + Jd, e_c=Ec, e_v=Ev, solution=solution)
@@ -1,4 +1,5 @@
 import numpy as np
+from pame.exceptions import CantMatchMethod
 
 me_effective = float
 mh_effective = float
@@ -10,36 +11,179 @@ eV = float
 
 def count_Q(n: float, p: float, Ndpl=None, Naneg=None) -> float:
     """
+    :math: $Q = n + N_a^- - p - N_d^+$
+
     :param n: кол-во негативных носителей
     :param p: кол-во положительных носителей
-    :param Ndpl: кол-во ионизированных атомов
+    :param Ndpl: кол-во ионизированных доноров
+    :param Naneg: кол-во ионизированных акцепторов
     :return: Q - заряд полупроводника
     """
-
+    q = n - p
     if Ndpl is not None:
-        return n - p - Ndpl
+        q = q - Ndpl
     if Naneg is not None:
-        return n + Naneg - p
+        q = q + Naneg
+    return q
+
+
+def fermi_statistics() -> list:
+    return ['boltzmann', 'fermi-dirac']
+
+
+_fd_table = {}
+
+
+def _fermi_dirac_table(eta_min=-10., eta_max=60., step=0.05) -> dict:
+    """
+    Табулируем F_{1/2} и его производную F_{-1/2} один раз, при первом обращении.
+    Интегралы считаем заменой x = t^2, подынтегральные функции четные по t и
+    быстро убывают, поэтому формула трапеций дает экспоненциальную точность.
+
+    :math: $F_{1/2}(\eta) = \frac{4}{\sqrt{\pi}}\int_0^{\infty}\frac{t^2 dt}{1 + exp(t^2 - \eta)}$
+    :math: $F_{-1/2}(\eta) = \frac{2}{\sqrt{\pi}}\int_0^{\infty}\frac{dt}{1 + exp(t^2 - \eta)}$
+    """
+    if not _fd_table:
+        eta = np.arange(eta_min, eta_max + step / 2, step)
+        dt = 0.02
+        nodes = np.arange(0., np.sqrt(eta_max + 40.), dt)
+        weights = np.full_like(nodes, dt)
+        weights[0] = dt / 2
+        occupation = 1. / (1. + np.exp(nodes[None, :] ** 2 - eta[:, None]))
+        f = 4 / np.sqrt(np.pi) * (occupation * nodes ** 2) @ weights
+        df = 2 / np.sqrt(np.pi) * occupation @ weights * step
+        # коэффициенты кубического многочлена Эрмита на каждом отрезке по s = (\eta - \eta_i)/step
+        f0, f1, d0, d1 = f[:-1], f[1:], df[:-1], df[1:]
+        _fd_table['f'] = (f0, d0, 3 * (f1 - f0) - 2 * d0 - d1, 2 * (f0 - f1) + d0 + d1)
+        _fd_table['df'] = (d0 / step, (6 * (f1 - f0) - 4 * d0 - 2 * d1) / step, (6 * (f0 - f1) + 3 * d0 + 3 * d1) / step)
+        _fd_table['eta_min'], _fd_table['eta_max'], _fd_table['step'] = eta_min, eta_max, step
+    return _fd_table
+
+
+def _fermi_dirac_half(eta, derivative: bool, block=8192):
+    """
+    :param eta: reduced Fermi level (Ef - Ec)/kT
+    :param derivative: if True returns dF_{1/2}/d\eta instead of F_{1/2}
+    :param block: amount of points evaluated at once
+    """
+    table = _fermi_dirac_table()
+    eta = np.asarray(eta, dtype=float)
+    shape, eta = eta.shape, eta.ravel()
+    coefficients = table['df'] if derivative else table['f']
+    cells, shift, scale = len(coefficients[0]), -table['eta_min'], 1 / table['step']
+
+    # кубическая интерполяция Эрмита по значениям и производным в узлах таблицы;
+    # массив обходим блоками в заранее выделенных буферах, которые помещаются в кэш,
+    # иначе каждая из ~12 операций над массивом выделяет и заполняет новый массив в памяти
+    result = np.empty_like(eta)
+    size = min(block, len(eta))
+    x, buffer, index = np.empty(size), np.empty(size), np.empty(size, dtype=np.intp)
+    for start in range(0, len(eta), block):
+        e, out = eta[start:start + block], result[start:start + block]
+        s, b, i = x[:len(e)], buffer[:len(e)], index[:len(e)]
+        np.add(e, shift, out=s)
+        s *= scale
+        np.clip(s, 0, cells - 1e-9, out=s)
+        np.floor(s, out=b)
+        with np.errstate(invalid='ignore'):
+            np.copyto(i, b, casting='unsafe')
+        s -= b
+        np.take(coefficients[-1], i, out=out, mode='clip')
+        for c in coefficients[-2::-1]:
+            out *= s
+            out += np.take(c, i, out=b, mode='clip')
+
+        # хвосты считаем по всему блоку и копируем по маске: выборка по маске e[low] в разы дороже
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            if e.min() < table['eta_min']:
+                # ряд: F_{1/2} = \sum (-1)^{k+1} exp(k\eta) / k^{3/2}
+                z = np.exp(e)
+                if derivative:
+                    tail = z * (1 - z * (1 / 2 ** 0.5 - z / 3 ** 0.5))
+                else:
+                    tail = z * (1 - z * (1 / 2 ** 1.5 - z / 3 ** 1.5))
+                np.copyto(out, tail, where=e < table['eta_min'])
+
+            if e.max() > table['eta_max']:
+                # асимптотика Зоммерфельда
+                r = np.pi ** 2 / e ** 2
+                if derivative:
+                    tail = 2 / np.sqrt(np.pi) * np.sqrt(e) * (1 - r / 24 - 7 * r ** 2 / 384)
+                else:
+                    tail = 4 / (3 * np.sqrt(np.pi)) * e * np.sqrt(e) * (1 + r / 8 + 7 * r ** 2 / 640)
+                np.copyto(out, tail, where=e > table['eta_max'])
+    return result.reshape(shape)[()]
+
+
+def fermi_dirac_half(eta):
+    """
+    Интеграл Ферми-Дирака, нормированный так, что F_{1/2} -> exp(\eta) при \eta -> -inf:
+
+    :math: $F_{1/2}(\eta) = \frac{2}{\sqrt{\pi}}\int_0^{\infty}\frac{\sqrt{x}dx}{1 + exp(x - \eta)}$
+
+    По времени примерно в 10 раз дороже np.exp на массиве внутри таблицы -10 < \eta < 60
+    и до ~35 раз, если заметная доля точек попадает в ряд или асимптотику за ее краями.
+
+    :param eta: reduced Fermi level (Ef - Ec)/kT, scalar or numpy array
+    :return: F_{1/2}(eta) with relative error about 1e-8
+    """
+    return _fermi_dirac_half(eta, derivative=False)
+
+
+def fermi_dirac_half_derivative(eta):
+    """
+    :math: $\frac{dF_{1/2}}{d\eta} = F_{-1/2}(\eta)$
+
+    :param eta: reduced Fermi level (Ef - Ec)/kT, scalar or numpy array
+    :return: derivative of F_{1/2}(eta)
+    """
+    return _fermi_dirac_half(eta, derivative=True)
+
 
+def _occupation(eta, statistics: str):
+    if statistics == 'boltzmann':
+        return np.exp(eta)
+    elif statistics == 'fermi-dirac':
+        return fermi_dirac_half(eta)
+    raise CantMatchMethod(message=statistics, methods=fermi_statistics())
 
-def calc_n(nc: float, Ef: float, Ec: float, t: Kelvin) -> float:  # Nparticle:
+
+def _diff_occupation(eta, statistics: str):
+    if statistics == 'boltzmann':
+        return np.exp(eta)
+    elif statistics == 'fermi-dirac':
+        return fermi_dirac_half_derivative(eta)
+    raise CantMatchMethod(message=statistics, methods=fermi_statistics())
+
+
+def eta_upper_bound(ratio):
+    """
+    :param ratio: N_d / N_c
+    :return: \eta for which n > N_c + N_d both for the Boltzmann and the Fermi-Dirac statistics
+    """
+    return np.maximum(np.log1p(ratio), (3 * np.sqrt(np.pi) / 4 * (1 + ratio)) ** (2 / 3))
+
+
+def calc_n(nc: float, Ef: float, Ec: float, t: Kelvin, statistics='boltzmann') -> float:  # Nparticle:
     """
     n = Nc * exp(- (Ec - Ef)/kT)
+    n = Nc * F_{1/2}((Ef - Ec)/kT) - for the Fermi-Dirac statistics
     """
     k = 1.38e-16  # эрг/К
 
-    expl = np.exp((Ef - Ec)/(k * 6.24e11 * t))
+    expl = _occupation((Ef - Ec)/(k * 6.24e11 * t), statistics)
     n = nc * expl
     return n
 
 
-def calc_p(nv: float, Ef: float, Ev: float, t: Kelvin) -> float:  # Nparticle:
+def calc_p(nv: float, Ef: float, Ev: float, t: Kelvin, statistics='boltzmann') -> float:  # Nparticle:
     """
     p = Nv * exp((Ev - Ef)/kT)
+    p = Nv * F_{1/2}((Ev - Ef)/kT) - for the Fermi-Dirac statistics
     """
     k = 1.38e-16  # эрг/К
 
-    expl = np.exp((Ev - Ef) / (k * 6.24e11 * t))
+    expl = _occupation((Ev - Ef) / (k * 6.24e11 * t), statistics)
     p = nv * expl
     return p
 
@@ -99,7 +243,8 @@ def count_nc_nv(m_eff: float, t: float) -> float:
     return 2.51e19 * m_eff**1.5 * (t/300)**1.5
 
 
-def balance_function(nc: float, nv: float, nd: float, t: Kelvin, e_f: eV, e_c: eV, e_v: eV, e_d: eV) -> float:
+def balance_function(nc: float, nv: float, nd: float, t: Kelvin, e_f: eV, e_c: eV, e_v: eV, e_d: eV,
+                     statistics='boltzmann') -> float:
     """
     :math: $Q=n - (N_d^+ + p)$
     :math: $Q = N_c \factor exp(\frac{E_f - E_c}{kT}) - N_v \factor exp(\frac{E_v-E_f}{kT}) - N_d \factor
@@ -112,18 +257,20 @@ def balance_function(nc: float, nv: float, nd: float, t: Kelvin, e_f: eV, e_c: e
     :param e_c: Conduction band energy level in eV
     :param e_v: Valence band energy level in eV
     :param e_d: Ionization energy in eV
+    :param statistics: 'boltzmann' or 'fermi-dirac'
     :return: difference in positively and negatively charged particles number
     """
     k = 1.38e-16  # эрг/К
 
-    n = nc * np.exp((e_f - e_c) / (k * 6.24e11 * t))
-    p = nv * np.exp((e_v - e_f) / (k * 6.24e11 * t))
+    n = nc * _occupation((e_f - e_c) / (k * 6.24e11 * t), statistics)
+    p = nv * _occupation((e_v - e_f) / (k * 6.24e11 * t), statistics)
     nd_plus = nd / (1. + 0.5 * np.exp((e_f - e_d) / (k * 6.24e11 * t)))
     Q = n - nd_plus - p
     return Q/(p + nd_plus)
 
 
-def diff_balance_function(nc: float, nv: float, nd: float, t: Kelvin, e_f: eV, e_c: eV, e_v: eV, e_d: eV) -> float:
+def diff_balance_function(nc: float, nv: float, nd: float, t: Kelvin, e_f: eV, e_c: eV, e_v: eV, e_d: eV,
+                          statistics='boltzmann') -> float:
     """
     $\frac{Q}{p + N_d^+}$
     :param nc: concentration of electrons
@@ -134,16 +281,70 @@ def diff_balance_function(nc: float, nv: float, nd: float, t: Kelvin, e_f: eV, e
     :param e_c: Conduction band energy level in eV
     :param e_v: Valence band energy level in eV
     :param e_d: Ionized Donors energy level in eV
+    :param statistics: 'boltzmann' or 'fermi-dirac'
     :return: differential of difference in positively and
              negatively charged particles number for a specific fermi level
     """
     k = 1.38e-16  # эрг/К
-    n = nc * np.exp((e_f - e_c) / (k * 6.24e11 * t))
-    p = nv * np.exp((e_v - e_f) / (k * 6.24e11 * t))
+    n = nc * _occupation((e_f - e_c) / (k * 6.24e11 * t), statistics)
+    p = nv * _occupation((e_v - e_f) / (k * 6.24e11 * t), statistics)
     nd_plus = nd / (1. + 0.5 * np.exp((e_f - e_d) / (k * 6.24e11 * t)))
-    dn = nc * np.exp((e_f - e_c) / (k * 6.24e11 * t)) / (k * 6.24e11 * t)
-    dp = -nv * np.exp((e_v - e_f) / (k * 6.24e11 * t)) / (k * 6.24e11 * t)
+    dn = nc * _diff_occupation((e_f - e_c) / (k * 6.24e11 * t), statistics) / (k * 6.24e11 * t)
+    dp = -nv * _diff_occupation((e_v - e_f) / (k * 6.24e11 * t), statistics) / (k * 6.24e11 * t)
     dnd_plus = - nd / (1. + 0.5 * np.exp((e_f - e_d) / (k * 6.24e11 * t))) ** 2 * \
                0.5 * np.exp((e_f - e_d) / (k * 6.24e11 * t)) / (k * 6.24e11 * t)
 
     return (dn*(p + nd_plus) - (dp + dnd_plus)*n)/(p + nd_plus)**2
+
+
+def acceptor_balance_function(nc: float, nv: float, na: float, t: Kelvin, e_f: eV, e_c: eV, e_v: eV, e_a: eV,
+                              statistics='boltzmann') -> float:
+    """
+    :math: $Q = n + N_a^- - p$
+    :math: $Q = N_c \factor exp(\frac{E_f - E_c}{kT}) - N_v \factor exp(\frac{E_v-E_f}{kT}) + N_a \factor
+            \frac{1}{1+0.25exp(\frac{E_a - E_f}{kT})}$
+    :param nc: concentration of electrons
+    :param nv: concentration of holes
+    :param na: concentration of acceptors
+    :param t: temperature in Kelvin
+    :param e_f: Fermi energy level in eV
+    :param e_c: Conduction band energy level in eV
+    :param e_v: Valence band energy level in eV
+    :param e_a: Acceptors energy level in eV
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: difference in negatively and positively charged particles number divided by $n + N_a^-$
+    """
+    k = 1.38e-16  # эрг/К
+
+    n = nc * _occupation((e_f - e_c) / (k * 6.24e11 * t), statistics)
+    p = nv * _occupation((e_v - e_f) / (k * 6.24e11 * t), statistics)
+    na_neg = na / (1. + .25 * np.exp((e_a - e_f) / (k * 6.24e11 * t)))
+    Q = n + na_neg - p
+    return Q/(n + na_neg)
+
+
+def diff_acceptor_balance_function(nc: float, nv: float, na: float, t: Kelvin, e_f: eV, e_c: eV, e_v: eV, e_a: eV,
+                                   statistics='boltzmann') -> float:
+    """
+    $\frac{Q}{n + N_a^-}$
+    :param nc: concentration of electrons
+    :param nv: concentration of holes
+    :param na: concentration of acceptors
+    :param t: temperature in Kelvin
+    :param e_f: Fermi energy level in eV
+    :param e_c: Conduction band energy level in eV
+    :param e_v: Valence band energy level in eV
+    :param e_a: Acceptors energy level in eV
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: differential of acceptor_balance_function for a specific fermi level
+    """
+    k = 1.38e-16  # эрг/К
+    n = nc * _occupation((e_f - e_c) / (k * 6.24e11 * t), statistics)
+    p = nv * _occupation((e_v - e_f) / (k * 6.24e11 * t), statistics)
+    na_neg = na / (1. + .25 * np.exp((e_a - e_f) / (k * 6.24e11 * t)))
+    dn = nc * _diff_occupation((e_f - e_c) / (k * 6.24e11 * t), statistics) / (k * 6.24e11 * t)
+    dp = -nv * _diff_occupation((e_v - e_f) / (k * 6.24e11 * t), statistics) / (k * 6.24e11 * t)
+    dna_neg = na / (1. + .25 * np.exp((e_a - e_f) / (k * 6.24e11 * t))) ** 2 * \
+        .25 * np.exp((e_a - e_f) / (k * 6.24e11 * t)) / (k * 6.24e11 * t)
+
+    return ((dn + dna_neg - dp) * (n + na_neg) - (n + na_neg - p) * (dn + dna_neg)) / (n + na_neg) ** 2
@@ -0,0 +1,109 @@
+"""
+Компенсированный полупроводник: одновременно присутствуют доноры и акцепторы,
+возможно несколько уровней каждого типа.
+
+1) Уравнение электронейтральности:
+    n + \sum N_a^- = p + \sum N_d^+
+
+2) N_d^+ = N_d / (1 + 1/2 * exp((Ef - Ed)/kT)),  Ed = Ec - Jd
+   N_a^- = N_a / (1 + 1/4 * exp((Ea - Ef)/kT)),  Ea = Ev + Ja
+
+ Q = n + \sum N_a^- - p - \sum N_d^+ монотонно растет с ростом Ef, поэтому
+ корень ищем дихотомией сразу для всех точек на отрезке:
+    Ef_low = Ev - kT eta_upper_bound(\sum N_a / Nv), там Q < 0
+    Ef_upper = Ec + kT eta_upper_bound(\sum N_d / Nc), там Q > 0
+"""
+import numpy as np
+from pame.FermiLevelPinning.CalculateParticles import calc_n, calc_p, calc_Ndplus, calc_Naneg, calc_Nc, calc_Nv, \
+    count_Q, eta_upper_bound
+from pame.solvers import vectorized_dichotomy
+
+me_effective = float
+mh_effective = float
+Kelvin = float
+eV = float
+
+compensated_result_dtype = np.dtype([('Ef', float), ('n', float), ('p', float), ('Ndpl', float), ('Naneg', float),
+                                     ('Q', float), ('ratio', float), ('Nv', float), ('Nc', float),
+                                     ('converged', bool)])
+
+
+def _charges(Ef, nc, nv, t, Ec, Ev, donors, acceptors, statistics='boltzmann') -> tuple:
+    """
+    :param Ef: Fermi level in eV
+    :param nc: effective density of states in the conduction band
+    :param nv: effective density of states in the valence band
+    :param t: temperature in Kelvin
+    :param Ec: conduction band energy level in eV
+    :param Ev: valence band energy level in eV
+    :param donors: list of (Nd, Jd) pairs
+    :param acceptors: list of (Na, Ja) pairs
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: n, p, total Nd^+ and total Na^-
+    """
+    n = calc_n(nc=nc, Ef=Ef, Ec=Ec, t=t, statistics=statistics)
+    p = calc_p(nv=nv, Ef=Ef, Ev=Ev, t=t, statistics=statistics)
+    ndpl = sum(calc_Ndplus(Nd=nd, Ef=Ef, Ed=Ec - jd, t=t) for nd, jd in donors)
+    naneg = sum(calc_Naneg(Na=na, Ef=Ef, Ea=Ev + ja, t=t) for na, ja in acceptors)
+    return n, p, ndpl, naneg
+
+
+def calculate_fermi_level(me: me_effective, mh: mh_effective, t: Kelvin, Ec: eV, donors=(), acceptors=(),
+                          Ev=0., Ef_low=None, Ef_upper=None, tolerance=1e-7, max_iter=200,
+                          statistics='boltzmann') -> np.ndarray:
+    """
+    Решает уравнение электронейтральности n + Na^- = p + Nd^+ для компенсированного полупроводника.
+    Все параметры, в том числе концентрации и энергии ионизации уровней, могут быть
+    скалярами или массивами numpy, они приводятся к общей форме по правилам broadcasting.
+
+    :param me: эффективная масса электрона
+    :param mh: эффективная масса дырки
+    :param t: температура
+    :param Ec: дно зоны проводимости
+    :param donors: список пар (Nd, Jd) - концентрация и энергия ионизации каждого донорного уровня
+    :param acceptors: список пар (Na, Ja) - концентрация и энергия ионизации каждого акцепторного уровня
+    :param Ev: потолок валентной зоны
+    :param Ef_low: нижняя граница
+    :param Ef_upper: верхняя граница
+    :param tolerance: acceptable error value of Q / (n + p + Nd^+ + Na^-)
+    :param max_iter: iterations limit
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: structured array of compensated_result_dtype with Ef, n, p, Ndpl, Naneg, Q, ratio, Nv, Nc
+             and convergence flag
+    """
+    donors = [(np.asarray(nd, dtype=float), np.asarray(jd, dtype=float)) for nd, jd in donors]
+    acceptors = [(np.asarray(na, dtype=float), np.asarray(ja, dtype=float)) for na, ja in acceptors]
+    shape = np.broadcast_shapes(*[np.shape(x) for x in (me, mh, t, Ec, Ev)],
+                                *[np.shape(x) for level in donors + acceptors for x in level])
+
+    t = np.broadcast_to(np.asarray(t, dtype=float), shape)
+    Ec = np.broadcast_to(np.asarray(Ec, dtype=float), shape)
+    Ev = np.broadcast_to(np.asarray(Ev, dtype=float), shape)
+    kt = 1.38e-16 * 6.24e11 * t
+
+    nc = calc_Nc(np.asarray(me, dtype=float), t)
+    nv = calc_Nv(np.asarray(mh, dtype=float), t)
+
+    if Ef_low is None:
+        Ef_low = Ev - kt * eta_upper_bound(sum((na for na, _ in acceptors), np.zeros(shape)) / nv)
+    if Ef_upper is None:
+        Ef_upper = Ec + kt * eta_upper_bound(sum((nd for nd, _ in donors), np.zeros(shape)) / nc)
+
+    def ratio(ef):
+        n, p, ndpl, naneg = _charges(Ef=ef, nc=nc, nv=nv, t=t, Ec=Ec, Ev=Ev, donors=donors, acceptors=acceptors,
+                                 statistics=statistics)
+        return count_Q(n=n, p=p, Ndpl=ndpl, Naneg=naneg) / (n + p + ndpl + naneg)
+
+    solution = vectorized_dichotomy(f=ratio, a=Ef_low, b=Ef_upper, tolerance=tolerance, max_iter=max_iter)
+
+    ef = solution.root
+    n, p, ndpl, naneg = _charges(Ef=ef, nc=nc, nv=nv, t=t, Ec=Ec, Ev=Ev, donors=donors, acceptors=acceptors,
+                                 statistics=statistics)
+    result = np.empty(shape, dtype=compensated_result_dtype)
+    result['Ef'], result['n'], result['p'] = ef, n, p
+    result['Ndpl'], result['Naneg'] = ndpl, naneg
+    result['Q'] = count_Q(n=n, p=p, Ndpl=ndpl, Naneg=naneg)
+    result['ratio'] = result['Q'] / (n + p + ndpl + naneg)
+    result['Nv'], result['Nc'] = nv, nc
+    result['converged'] = solution.converged
+    return result
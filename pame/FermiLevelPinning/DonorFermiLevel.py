@@ -29,7 +29,8 @@ Nd=10^17 -> статистика не вырожденная:
 """
 from typing import NamedTuple
 from pame.FermiLevelPinning.CalculateParticles import *
-from pame.exceptions import CantMatchMethod, CatchZeroDelta, CantRunDichotomyMethod, CannotMatchResultFormat
+from pame.FermiLevelPinning.ImpurityFermiLevel import fermi_methods, initial_level, sign_change_bracket, find_level
+from pame.solvers import RootResult, dichotomy, vectorized_dichotomy
 
 me_effective = float
 mh_effective = float
@@ -48,6 +49,12 @@ class Result(NamedTuple):
     ratio: float
     Nv: float
     Nc: float
+    iterations: int = 0
+    evaluations: int = 0
+
+
+batch_result_dtype = np.dtype([('Ef', float), ('n', float), ('p', float), ('Ndpl', float), ('Q', float),
+                                ('ratio', float), ('Nv', float), ('Nc', float), ('converged', bool)])
 
 
 class Result_xey(NamedTuple):
@@ -61,208 +68,209 @@ class Result_xey(NamedTuple):
     Nc: str
 
 
-def _dichotomy_method(nc: float, nv: float, t: Kelvin, Jd: eV, Ef_low: eV, Ef_upper: eV, Ec: eV,
-                      Ev: eV, Nd: float, tolerance=1e-7):
+def _make_result(nc: float, nv: float, nd: float, t: Kelvin, e_d: eV, e_c: eV, e_v: eV,
+                 solution: RootResult, statistics='boltzmann') -> Result:
     """
     :param nc: concentration of electrons
     :param nv: concentration of holes
+    :param nd: concentration of donors
     :param t: temperature in Kelvin
-    :param Jd: ionization energy in eV
-    :param Ef_low: lowest Fermi energy level in eV
-    :param Ef_upper: upper Fermi energy level in eV
-    :param Ec: conduction band energy level in eV
-    :param Ev: valence band energy level in eV
-    :param Nd: concentration of donors
-    :param counter: counts iteration steps
-    :param tolerance: acceptable error value
-    :return: Fermi level  in eV and iterations steps amount
+    :param e_d: donors energy level in eV
+    :param e_c: conduction band energy level in eV
+    :param e_v: valence band energy level in eV
+    :param solution: root found by a solver
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: charges for the found Fermi level
     """
-    a, b = Ef_low, Ef_upper
+    e_f = solution.root
+    n = calc_n(nc=nc, Ef=e_f, Ec=e_c, t=t, statistics=statistics)
+    p = calc_p(nv=nv, Ef=e_f, Ev=e_v, t=t, statistics=statistics)
+    ndpl = calc_Ndplus(Nd=nd, Ef=e_f, Ed=e_d, t=t)
+    q = count_Q(n=n, p=p, Ndpl=ndpl)
+    return Result(Ef=e_f, n=n, p=p, Ndpl=ndpl, Q=q, ratio=q/(p + ndpl), Nv=nv, Nc=nc,
+                  iterations=solution.iterations, evaluations=solution.evaluations)
 
-    Ef = (a + b) / 2.
 
-    n = calc_n(nc=nc, Ef=Ef, Ec=Ec, t=t)
-    p = calc_p(nv=nv, Ef=Ef, Ev=Ev, t=t)
-    ndpl = calc_Ndplus(Nd=Nd, Ef=Ef, Ed=Ec - Jd, t=t)
-    q = count_Q(n=n, p=p, Ndpl=ndpl)
+def _balance(nc: float, nv: float, nd: float, t: Kelvin, e_d: eV, e_c: eV, e_v: eV, statistics='boltzmann') -> tuple:
+    """
+    :return: charge balance function of the Fermi level and its derivative
+    """
+    def f(e_f):
+        return balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_f, e_c=e_c, e_v=e_v, e_d=e_d, statistics=statistics)
 
-    if np.abs(q / (p + ndpl)) < tolerance:
-        return Result(Ef=Ef, n=n, p=p, Ndpl=ndpl, Q=q, ratio=q/(p + ndpl), Nv=nv, Nc=nc)
-    else:
-        if q > 0:
-            return _dichotomy_method(nc=nc, nv=nv, t=t, Jd=Jd, Ec=Ec, Ev=Ev, Nd=Nd, Ef_upper=Ef, Ef_low=Ef_low)
-        elif q < 0:
-            return _dichotomy_method(nc=nc, nv=nv, t=t, Jd=Jd, Ec=Ec, Ev=Ev, Nd=Nd, Ef_upper=Ef_upper, Ef_low=Ef)
+    def df(e_f):
+        return diff_balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_f, e_c=e_c, e_v=e_v, e_d=e_d,
+                                     statistics=statistics)
+    return f, df
 
 
-def _fixed_point_method(nc: float, nv: float, nd: float, t: Kelvin, e_d: eV, e_f: eV,
-                        e_c: eV, e_v: eV, e_f0: eV, tolerance=1e-7) -> tuple:
+def initial_fermi_level(nc: float, nv: float, nd: float, t: Kelvin, e_c: eV, e_d: eV, e_v: eV) -> eV:
     """
-    :math: $\phi(x)=f(x)+x$ : $x_{n+1}=x_n - \frac{f(x_n)}{f'(\ksi)}$
+    Начальное приближение уровня Ферми (ImpurityFermiLevel.initial_level) для электронов,
+    $n_1 = 2 N_c exp(-\frac{E_c - E_d}{kT})$.
 
     :param nc: concentration of electrons
     :param nv: concentration of holes
     :param nd: concentration of donors
     :param t: temperature in Kelvin
-    :param e_d: ionization energy in eV
-    :param e_f: current Fermi energy level in eV
     :param e_c: conduction band energy level in eV
+    :param e_d: donors energy level in eV
     :param e_v: valence band energy level in eV
-    :param e_f0: fixed level of Fermi energy in eV
-    :param counter: counts iteration steps
-    :param tolerance: acceptable error value
-    :return: Fermi level  in eV and iterations steps amount
+    :return: Fermi level estimate in eV
     """
-    if np.abs(balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_f, e_c=e_c, e_v=e_v, e_d=e_d)) < tolerance:
-        n = calc_n(nc=nc, Ef=e_f, Ec=e_c, t=t)
-        p = calc_p(nv=nv, Ef=e_f, Ev=e_v, t=t)
-        ndpl = calc_Ndplus(Nd=nd, Ef=e_f, Ed=e_d, t=t)
-        q = count_Q(n=n, p=p, Ndpl=ndpl)
-        return Result(Ef=e_f, n=n, p=p, Ndpl=ndpl, Q=q, ratio=q/(p + ndpl), Nv=nv, Nc=nc)
-    else:
-        diff = diff_balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_f0, e_c=e_c, e_v=e_v, e_d=e_d)
-        _lambda = 1/diff
-        ef_i = -_lambda * balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_f, e_c=e_c, e_v=e_v, e_d=e_d)
-        return _fixed_point_method(nc=nc, nv=nv, nd=nd, t=t, e_d=e_d, e_f=e_f+ef_i, e_c=e_c, e_v=e_v,
-                                   e_f0=e_f0, tolerance=tolerance)
-
-
-def _newtown_method(nc: float, nv: float, nd: float, t: Kelvin, e_d: eV, e_f: eV, e_c: eV, e_v: eV,
-                    tolerance=1e-7):
+    kt = 1.38e-16 * 6.24e11 * t
+    ln_ni = 0.5 * (np.log(nc) + np.log(nv)) - (e_c - e_v) / (2 * kt)
+    return initial_level(band=e_c, n_band=nc, ln_n1=np.log(2 * nc) - (e_c - e_d) / kt, n_imp=nd, ln_ni=ln_ni,
+                         kt=kt, sign=1)
+
+
+def fermi_level_bracket(nc: float, nv: float, nd: float, t: Kelvin, e_c: eV, e_d: eV, e_v: eV, guess=None,
+                        window=3., statistics='boltzmann') -> tuple:
     """
-    :math: $x_{n+1} = x_n - \frac{f(x_n)}{f'(x_n)}$
-    :param nc:  concentration of electrons
+    Отрезок guess +- window * kT, который расширяем, пока заряд на его концах не будет разного знака.
+    Отрезок не выходит за [Ev - kT, Ec + kT \eta], \eta = eta_upper_bound(Nd/Nc).
+
+    :param nc: concentration of electrons
     :param nv: concentration of holes
     :param nd: concentration of donors
     :param t: temperature in Kelvin
-    :param e_d: ionization energy in eV
-    :param e_f: current Fermi energy level in eV
     :param e_c: conduction band energy level in eV
+    :param e_d: donors energy level in eV
     :param e_v: valence band energy level in eV
-    :param counter: counts iteration steps
-    :param tolerance: acceptable error value
-    :return: Fermi level  in eV and iterations steps amount
+    :param guess: Fermi level estimate in eV, if None initial_fermi_level is used
+    :param window: half width of the bracket in kT
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: bracket [Ef_low, Ef_upper] with a sign change of the charge
     """
-    if np.abs(balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_f, e_c=e_c, e_v=e_v, e_d=e_d)) < tolerance:
-        n = calc_n(nc=nc, Ef=e_f, Ec=e_c, t=t)
-        p = calc_p(nv=nv, Ef=e_f, Ev=e_v, t=t)
-        ndpl = calc_Ndplus(Nd=nd, Ef=e_f, Ed=e_d, t=t)
-        q = count_Q(n=n, p=p, Ndpl=ndpl)
-        return Result(Ef=e_f, n=n, p=p, Ndpl=ndpl, Q=q, ratio=q/(p + ndpl), Nv=nv, Nc=nc)
-    else:
-        diff = diff_balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_f, e_c=e_c, e_v=e_v, e_d=e_d)
-        _lambda = balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_f, e_c=e_c, e_v=e_v, e_d=e_d) / diff
-        return _newtown_method(nc=nc, nv=nv, nd=nd, t=t, e_d=e_d, e_f=e_f-_lambda, e_c=e_c,
-                               e_v=e_v, tolerance=tolerance)
-
-
-def _secant_method(nc: float, nv: float, nd: float, t: Kelvin, e_d: eV, e_f: eV, e_c: eV, e_v: float,
-                   tolerance=1e-7, delta=0.1, e_fi=None):
+    kt = 1.38e-16 * 6.24e11 * t
+    if guess is None:
+        guess = initial_fermi_level(nc=nc, nv=nv, nd=nd, t=t, e_c=e_c, e_d=e_d, e_v=e_v)
+    q, _ = _balance(nc=nc, nv=nv, nd=nd, t=t, e_d=e_d, e_c=e_c, e_v=e_v, statistics=statistics)
+    return sign_change_bracket(q=q, guess=guess, lowest=e_v - kt, highest=e_c + kt * eta_upper_bound(nd / nc),
+                               width=window * kt)
+
+
+def calculate_fermi_level(me: me_effective, mh: mh_effective, t: Kelvin, Jd: eV, Ef0=None, Ec: eV = None,
+                          Nd: float = None, result_format='numeric', method='brent', Ev=0., tolerance=1e-7,
+                          Ef1=None, delta=1e-3, max_iter=1000, statistics='boltzmann') -> tuple:
     """
-    :param nc:  concentration of electrons
-    :param nv: concentration of holes
-    :param nd: concentration of donors
-    :param t: temperature in Kelvin
-    :param e_d: ionization energy in eV
-    :param e_f: fermi level value in eV for {n-1}-th iteration
-    :param e_c: conduction band energy level in eV
-    :param e_v: valence band energy level in eV
-    :param counter: counts iteration steps
-    :param tolerance: Fermi level  in eV and iterations steps amount
-    :param delta: x_1 - x_0 difference for a first iteration
-    :param e_fi: fermi level value in eV for n-th iteration
-    :return: Fermi level  in eV and iterations steps amount
+    :param result_format:
+    :param me: эффективная масса электрона
+    :param mh: эффективная масса дырки
+    :param t: температура
+    :param Jd: энергия ионизации
+    :param Ef0: $E_{f}^{+}$ - нижняя граница или стартовое значение,
+    если не задано - берем initial_fermi_level, отрезок для 'brent' и 'dichotomy' строим fermi_level_bracket
+    :param Ec: дно зоны проводимости, обязательный (None по умолчанию только чтобы Ef0 остался на своем месте)
+    :param Nd: концентрация доноров, обязательный, как и Ec
+    :param method: метод поиска уровня ферми, по умолчанию 'brent' - метод Ньютона с защитой отрезком
+    :param Ev: потолок валентной зоны
+    :param tolerance: acceptable error value
+    :param Ef1: $E_{f}^{-}$ - верхняя граница, если не задана - отрезок строим вокруг Ef0
+    :param delta: x_1 - x_0 difference for a first iteration of the secant method
+    :param max_iter: iterations limit
+    :param statistics: 'boltzmann' or 'fermi-dirac' - для вырожденного полупроводника
+    :return: Fermi level in eV and iterations steps amount
     """
-    if e_fi is not None:
-        if (balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_fi, e_c=e_c, e_v=e_v, e_d=e_d)) < tolerance:
-            n = calc_n(nc=nc, Ef=e_f, Ec=e_c, t=t)
-            p = calc_p(nv=nv, Ef=e_f, Ev=e_v, t=t)
-            ndpl = calc_Ndplus(Nd=nd, Ef=e_f, Ed=e_d, t=t)
-            q = count_Q(n=n, p=p, Ndpl=ndpl)
-            return Result(Ef=e_f, n=n, p=p, Ndpl=ndpl, Q=q, ratio=q/(p + ndpl), Nv=nv, Nc=nc)
-        else:
-            factor = delta / (balance_function(nc=nc, nv=nv, nd=nd,
-                                               t=t, e_f=e_fi, e_c=e_c,
-                                               e_v=e_v, e_d=e_d) - balance_function(nc=nc, nv=nv, nd=nd, t=t,
-                                                                                    e_f=e_f, e_c=e_c, e_v=e_v,
-                                                                                    e_d=e_d))
-
-            ef_ = e_fi - balance_function(nc=nc, nv=nv, nd=nd, t=t, e_f=e_fi, e_c=e_c, e_v=e_v, e_d=e_d) * factor
-            return _secant_method(nc=nc, nv=nv, nd=nd, t=t, e_d=e_d, e_f=e_fi, e_c=e_c, e_v=e_v,
-                                  tolerance=tolerance, e_fi=ef_)
-    else:
-        if delta != 0:
-            factor = delta / (balance_function(nc=nc, nv=nv, nd=nd,
-                                               t=t, e_f=e_f, e_c=e_c,
-                                               e_v=e_v, e_d=e_d) - balance_function(nc=nc, nv=nv, nd=nd,
-                                                                                    t=t, e_f=e_f-delta, e_c=e_c,
-                                                                                    e_v=e_v, e_d=e_d))
-            ef_ = e_f - balance_function(nc=nc, nv=nv, nd=nd,
-                                         t=t, e_f=e_f, e_c=e_c,
-                                         e_v=e_v, e_d=e_d) * factor
-            return _secant_method(nc=nc, nv=nv, nd=nd, t=t, e_f=e_f, e_fi=ef_, e_c=e_c, e_v=e_v, e_d=e_d,
-                                  tolerance=tolerance)
-        else:
-            raise CatchZeroDelta
-
-
-def fermi_methods() -> list:
-    return ['dichotomy', 'newtown', 'fixed-point', 'secant']
-
-
-def calculate_fermi_level(me: me_effective, mh: mh_effective, t: Kelvin, Jd: eV, Ef0: eV, Ec: eV,
-                          Nd: float, result_format='numeric', method='dichotomy', Ev=0., tolerance=1e-7,
-                          Ef1=None, delta=1e-3) -> tuple:
+    if Ec is None or Nd is None:
+        raise TypeError("calculate_fermi_level() missing required arguments: 'Ec' and 'Nd'")
+    nc = calc_Nc(me, t)
+    nv = calc_Nv(mh, t)
+    f, df = _balance(nc=nc, nv=nv, nd=Nd, t=t, e_d=Ec - Jd, e_c=Ec, e_v=Ev, statistics=statistics)
+
+    def bracket(guess):
+        return fermi_level_bracket(nc=nc, nv=nv, nd=Nd, t=t, e_c=Ec, e_d=Ec - Jd, e_v=Ev, guess=guess,
+                                   statistics=statistics)
+
+    def initial():
+        return initial_fermi_level(nc=nc, nv=nv, nd=Nd, t=t, e_c=Ec, e_d=Ec - Jd, e_v=Ev)
+
+    def make_result(solution):
+        return _make_result(nc=nc, nv=nv, nd=Nd, t=t, e_d=Ec - Jd, e_c=Ec, e_v=Ev, solution=solution,
+                            statistics=statistics)
+
+    def to_xey(result):
+        return Result_xey(Ef=result.Ef, n=convert_charges(result.n), p=convert_charges(result.p),
+                          Ndpl=convert_charges(result.Ndpl), Q=result.Q, ratio=result.ratio,
+                          Nv=convert_charges(nv), Nc=convert_charges(nc))
+
+    return find_level(f=f, df=df, bracket=bracket, initial=initial, make_result=make_result, to_xey=to_xey,
+                      Ef0=Ef0, Ef1=Ef1, result_format=result_format, method=method, delta=delta,
+                      tolerance=tolerance, max_iter=max_iter)
+
+
+def calculate_fermi_level_batch(me, mh, t, Jd, Ec, Nd, Ev=0., Ef_low=None, Ef_upper=None,
+                                tolerance=1e-7, max_iter=200, statistics='boltzmann') -> np.ndarray:
     """
-    :param result_format:
+    Решает уравнение электронейтральности n = Nd^+ + p сразу для всех точек (Nd, T, ...)
+    методом дихотомии над массивами. Все параметры могут быть скалярами или массивами numpy,
+    они приводятся к общей форме по правилам broadcasting.
+
+    По умолчанию нижняя граница отрезка Ev, верхняя Ec + kT \eta, где \eta = eta_upper_bound(Nd/Nc) -
+    на ней n > Nc + Nd и заряд гарантированно положительный.
+
     :param me: эффективная масса электрона
     :param mh: эффективная масса дырки
     :param t: температура
     :param Jd: энергия ионизации
-    :param Ef_low: $E_{f}^{+}$ - нижняя граница
-    :param Ef_upper: $E_{f}^{-}$ - верхняя граница
     :param Ec: дно зоны проводимости
-    :param Ev: потолок валентной зоны
     :param Nd: концентрация доноров
-    :param method: метод поиска уровня ферми
-    :return: Fermi level in eV and iterations steps amount
+    :param Ev: потолок валентной зоны
+    :param Ef_low: $E_{f}^{+}$ - нижняя граница
+    :param Ef_upper: $E_{f}^{-}$ - верхняя граница
+    :param tolerance: acceptable error value of Q / (p + Nd^+)
+    :param max_iter: iterations limit
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: structured array of batch_result_dtype with Ef, n, p, Ndpl, Q, ratio, Nv, Nc and convergence flag
     """
-    methods = ['dichotomy', 'newtown', 'fixed-point', 'secant']
-    result = None
+    me, mh, t, Jd, Ec, Nd, Ev = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (me, mh, t, Jd, Ec, Nd, Ev)])
+    kt = 1.38e-16 * 6.24e11 * t
 
     nc = calc_Nc(me, t)
     nv = calc_Nv(mh, t)
-    try:
-        if method == 'dichotomy':
-            if Ef1 is not None and Ef1 > Ef0:
-                result = _dichotomy_method(nc=nc, nv=nv, t=t, Jd=Jd, Ef_low=Ef0, Ef_upper=Ef1,
-                                                         Ec=Ec, Ev=Ev, Nd=Nd, tolerance=tolerance)
-            else:
-                raise CantRunDichotomyMethod(phi0=Ef0, phi1=Ef1)
-        elif method == 'fixed-point':
-            result = _fixed_point_method(nc=nc, nv=nv, nd=Nd, t=t, e_d=Ec-Jd, e_f=Ef0,
-                                                       e_f0=Ef0, e_c=Ec, e_v=Ev, tolerance=tolerance)
-        elif method == 'newtown':
-            result = _newtown_method(nc=nc, nv=nv, nd=Nd, t=t, e_d=Ec-Jd,
-                                                   e_f=Ef0, e_c=Ec, e_v=Ev, tolerance=tolerance)
-        elif method == 'secant':
-            result = _secant_method(nc=nc, nv=nv, nd=Nd, t=t, e_d=Ec-Jd, e_f=Ef0, e_c=Ec, e_v=Ev,
-                                                  tolerance=tolerance, delta=delta)
-        else:
-            raise CantMatchMethod(message=method, methods=methods)
-
-        if result_format is 'numeric':
-            return result
-        elif result_format is 'xey':
-            return Result_xey(Ef=result.Ef, n=convert_charges(result.n), p=convert_charges(result.p),
-                      Ndpl=convert_charges(result.Ndpl), Q=result.Q, ratio=result.ratio,
-                      Nv=convert_charges(nv), Nc=convert_charges(nc))
-        else:
-            raise CannotMatchResultFormat(available_formats=['numeric', 'xey'])
-
-    except CantMatchMethod as e:
-        print(e.args)
-    except CantRunDichotomyMethod as e:
-        print(e.args)
-    except CatchZeroDelta as e:
-        print('Delta equals zero')
+    ed = Ec - Jd
+
+    if Ef_low is None:
+        Ef_low = Ev
+    if Ef_upper is None:
+        Ef_upper = Ec + kt * eta_upper_bound(Nd / nc)
+
+    def ratio(ef):
+        n = calc_n(nc=nc, Ef=ef, Ec=Ec, t=t, statistics=statistics)
+        p = calc_p(nv=nv, Ef=ef, Ev=Ev, t=t, statistics=statistics)
+        ndpl = calc_Ndplus(Nd=Nd, Ef=ef, Ed=ed, t=t)
+        return count_Q(n=n, p=p, Ndpl=ndpl) / (p + ndpl)
+
+    solution = vectorized_dichotomy(f=ratio, a=Ef_low, b=Ef_upper, tolerance=tolerance, max_iter=max_iter)
+
+    ef = solution.root
+    result = np.empty(ef.shape, dtype=batch_result_dtype)
+    result['Ef'] = ef
+    result['n'] = calc_n(nc=nc, Ef=ef, Ec=Ec, t=t, statistics=statistics)
+    result['p'] = calc_p(nv=nv, Ef=ef, Ev=Ev, t=t, statistics=statistics)
+    result['Ndpl'] = calc_Ndplus(Nd=Nd, Ef=ef, Ed=ed, t=t)
+    result['Q'] = count_Q(n=result['n'], p=result['p'], Ndpl=result['Ndpl'])
+    result['ratio'] = result['Q'] / (result['p'] + result['Ndpl'])
+    result['Nv'], result['Nc'] = nv, nc
+    result['converged'] = solution.converged
+    return result
+
+
+def find_fermi_level(me: me_effective, mh: mh_effective, Jd: float, t: Kelvin, Efpl: eV, Efneg: eV, Ec: eV, Ev: eV,
+                     Nd: float) -> Result:
+    """
+    Расчет делаем методом дихотомии, как AcceptorFermiLevel.find_fermi_level
+
+    :param me: эффективная масса плотности состояний электронов
+    :param mh: эффективная масса плотности состояний дырок
+    :param Jd: энергия ионизации доноров, Ed = Ec - Jd
+    :param t: температура
+    :param Efpl: нижняя граница, например середина запрещенной зоны
+    :param Efneg: верхняя граница, например дно зоны проводимости
+    :return: Fermi level in eV and charges, numbers are formatted only when printed
+    """
+    nc = count_nc_nv(me, t)
+    nv = count_nc_nv(mh, t)
+    f, _ = _balance(nc=nc, nv=nv, nd=Nd, t=t, e_d=Ec - Jd, e_c=Ec, e_v=Ev)
+    solution = dichotomy(f=f, a=Efpl, b=Efneg, tolerance=0.0001)
+    return _make_result(nc=nc, nv=nv, nd=Nd, t=t, e_d=Ec - Jd, e_c=Ec, e_v=Ev, solution=solution)
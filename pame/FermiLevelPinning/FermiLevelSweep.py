@@ -0,0 +1,96 @@
+"""
+Построение кривых Ef(T), n(T) (или Ef(Nd), n(Nd)) для полупроводника, легированного донорами.
+
+Точки сетки решаем по порядку методом 'brent'. Каждое следующее решение ищем на узком отрезке
+Ef_prev +- window * kT вокруг предыдущего решения (при необходимости отрезок расширяем, пока на его концах
+заряд не будет разного знака), поэтому на точку уходит всего несколько итераций.
+
+Там, где решение меняется быстро (вымораживание примеси, переход к собственной проводимости),
+между соседними точками добавляем новые, пока |dEf| < max_step и |d lg(n)| < max_log_step.
+"""
+import numpy as np
+from typing import NamedTuple
+from pame.FermiLevelPinning.CalculateParticles import calc_Nc, calc_Nv
+from pame.FermiLevelPinning.DonorFermiLevel import calculate_fermi_level, fermi_level_bracket
+
+me_effective = float
+mh_effective = float
+eV = float
+
+
+class SweepResult(NamedTuple):
+    t: np.ndarray
+    Nd: np.ndarray
+    Ef: np.ndarray
+    n: np.ndarray
+    p: np.ndarray
+    Ndpl: np.ndarray
+    iterations: np.ndarray
+    converged: np.ndarray
+
+
+def sweep_fermi_level(me: me_effective, mh: mh_effective, t, Jd: eV, Ec: eV, Nd, Ev=0., tolerance=1e-7,
+                      max_iter=1000, window=3., max_step=0.02, max_log_step=0.5, max_depth=6,
+                      statistics='boltzmann') -> SweepResult:
+    """
+    Проходит по сетке температур и/или концентраций доноров, начиная каждое решение с предыдущего.
+
+    :param me: эффективная масса электрона
+    :param mh: эффективная масса дырки
+    :param t: температура - число или массив точек сетки
+    :param Jd: энергия ионизации
+    :param Ec: дно зоны проводимости
+    :param Nd: концентрация доноров - число или массив точек сетки
+    :param Ev: потолок валентной зоны
+    :param tolerance: acceptable error value
+    :param max_iter: iterations limit for each point
+    :param window: half width of the warm start bracket in kT
+    :param max_step: max Fermi level change between neighbour points in eV
+    :param max_log_step: max change of lg(n) between neighbour points
+    :param max_depth: max number of refinement passes
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: grid points (including added ones) with Fermi levels, charges, iterations and convergence flags
+    """
+    t, Nd = np.broadcast_arrays(np.atleast_1d(np.asarray(t, dtype=float)),
+                                np.atleast_1d(np.asarray(Nd, dtype=float)))
+    points = [[t_i, nd_i, None] for t_i, nd_i in zip(t, Nd)]
+
+    def solve(point, guess):
+        nc, nv = calc_Nc(me, point[0]), calc_Nv(mh, point[0])
+        low, upper = fermi_level_bracket(nc=nc, nv=nv, nd=point[1], t=point[0], e_c=Ec, e_d=Ec - Jd, e_v=Ev,
+                                         guess=guess, window=window, statistics=statistics)
+        point[2] = calculate_fermi_level(me=me, mh=mh, t=point[0], Jd=Jd, Ec=Ec, Nd=point[1], Ef0=low, Ef1=upper,
+                                         Ev=Ev, method='brent', tolerance=tolerance, max_iter=max_iter,
+                                         statistics=statistics)
+
+    guess = None
+    for point in points:
+        solve(point, guess)
+        if point[2] is not None:
+            guess = point[2].Ef
+
+    for _ in range(max_depth):
+        refined = []
+        for left, right in zip(points[:-1], points[1:]):
+            refined.append(left)
+            if left[2] is None or right[2] is None:
+                continue
+            if np.abs(right[2].Ef - left[2].Ef) > max_step or \
+                    np.abs(np.log10(right[2].n / left[2].n)) > max_log_step:
+                middle = [(left[0] + right[0]) / 2, np.sqrt(left[1] * right[1]), None]
+                solve(middle, (left[2].Ef + right[2].Ef) / 2)
+                refined.append(middle)
+        refined.append(points[-1])
+        if len(refined) == len(points):
+            break
+        points = refined
+
+    solved = [point[2] for point in points]
+    return SweepResult(t=np.array([point[0] for point in points]),
+                       Nd=np.array([point[1] for point in points]),
+                       Ef=np.array([r.Ef if r is not None else np.nan for r in solved]),
+                       n=np.array([r.n if r is not None else np.nan for r in solved]),
+                       p=np.array([r.p if r is not None else np.nan for r in solved]),
+                       Ndpl=np.array([r.Ndpl if r is not None else np.nan for r in solved]),
+                       iterations=np.array([r.iterations if r is not None else 0 for r in solved]),
+                       converged=np.array([r is not None for r in solved]))
@@ -0,0 +1,124 @@
+"""
+Таблица уровня Ферми Ef(Nd, T) для полупроводника, легированного донорами.
+
+Уровень Ферми - гладкая функция lg(Nd) и T, поэтому его один раз считаем на равномерной сетке
+lg(Nd) x T (calculate_fermi_level_batch), а дальше значения получаем билинейной интерполяцией.
+Ошибку интерполяции оцениваем по точным решениям в центрах ячеек сетки.
+
+Таблицу можно сохранить на диск: сама поверхность Ef хранится в .npy и при загрузке отображается
+в память (np.load(mmap_mode='r')), оси сетки, оценка ошибки и параметры материала - в .npz.
+
+Отсчет энергии от потолка валентной зоны: Ev = 0, Ec = Eg.
+"""
+import numpy as np
+from pame.FermiLevelPinning.DonorFermiLevel import calculate_fermi_level_batch
+from pame.Semiconductors.models import Model
+
+Kelvin = float
+
+
+class FermiLevelTable(object):
+    def __init__(self, Ef, lg_nd, t, error, me, mh, Jd, Eg, statistics='boltzmann'):
+        """
+        :param Ef: Fermi level surface in eV, shape (len(lg_nd), len(t))
+        :param lg_nd: uniform grid of lg(Nd), Nd in cm^-3
+        :param t: uniform grid of temperatures in Kelvin
+        :param error: interpolation error estimate in eV for each cell, shape (len(lg_nd) - 1, len(t) - 1)
+        :param me: effective mass of density of states in the conduction band in m0
+        :param mh: effective mass of density of states in the valence band in m0
+        :param Jd: ionization energy of donors in eV
+        :param Eg: energy gap in eV
+        :param statistics: 'boltzmann' or 'fermi-dirac'
+        """
+        self.Ef, self.lg_nd, self.t, self.error = Ef, np.asarray(lg_nd), np.asarray(t), np.asarray(error)
+        self.me, self.mh, self.Jd, self.Eg = me, mh, Jd, Eg
+        self.statistics = statistics
+
+    @property
+    def max_error(self) -> float:
+        return float(self.error.max())
+
+    def exact(self, Nd, t):
+        """
+        :param Nd: donors concentration in cm^-3
+        :param t: temperature in Kelvin
+        :return: Fermi level in eV from the batch solver
+        """
+        return calculate_fermi_level_batch(me=self.me, mh=self.mh, t=t, Jd=self.Jd, Ec=self.Eg, Nd=Nd, Ev=0.,
+                                           statistics=self.statistics)['Ef']
+
+    def __call__(self, Nd, t):
+        """
+        Билинейная интерполяция по (lg(Nd), T). Точки вне таблицы считаются точно.
+
+        :param Nd: donors concentration in cm^-3, number or array
+        :param t: temperature in Kelvin, number or array
+        :return: Fermi level in eV with the broadcast shape of Nd and t
+        """
+        lg_nd, t = np.broadcast_arrays(np.log10(np.asarray(Nd, dtype=float)), np.asarray(t, dtype=float))
+        step_nd = (self.lg_nd[-1] - self.lg_nd[0]) / (len(self.lg_nd) - 1)
+        step_t = (self.t[-1] - self.t[0]) / (len(self.t) - 1)
+        x = (lg_nd - self.lg_nd[0]) / step_nd
+        y = (t - self.t[0]) / step_t
+        inside = (x >= 0) & (x <= len(self.lg_nd) - 1) & (y >= 0) & (y <= len(self.t) - 1)
+
+        i = np.clip(np.where(inside, x, 0).astype(np.intp), 0, len(self.lg_nd) - 2)
+        j = np.clip(np.where(inside, y, 0).astype(np.intp), 0, len(self.t) - 2)
+        u, v = np.where(inside, x - i, 0.), np.where(inside, y - j, 0.)
+        ef = self.Ef
+        result = np.array(ef[i, j] * (1 - u) * (1 - v) + ef[i + 1, j] * u * (1 - v) +
+                           ef[i, j + 1] * (1 - u) * v + ef[i + 1, j + 1] * u * v, dtype=float)
+
+        if not inside.all():
+            outside = ~inside
+            result[outside] = self.exact(Nd=10 ** lg_nd[outside], t=t[outside])
+        return result[()]
+
+    def save(self, path: str) -> None:
+        """
+        :param path: path without extension, path.npy and path.npz are written
+        """
+        np.save(path + '.npy', np.asarray(self.Ef))
+        np.savez(path + '.npz', lg_nd=self.lg_nd, t=self.t, error=self.error, me=self.me, mh=self.mh,
+                 Jd=self.Jd, Eg=self.Eg, statistics=self.statistics)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode='r'):
+        """
+        :param path: path without extension
+        :param mmap_mode: mode of np.load for the Fermi level surface, None to read it into memory
+        :return: FermiLevelTable
+        """
+        with np.load(path + '.npz') as meta:
+            return cls(Ef=np.load(path + '.npy', mmap_mode=mmap_mode), lg_nd=meta['lg_nd'], t=meta['t'],
+                       error=meta['error'], me=float(meta['me']), mh=float(meta['mh']), Jd=float(meta['Jd']),
+                       Eg=float(meta['Eg']), statistics=str(meta['statistics']))
+
+
+def build_fermi_table(material: Model, nd_min=1e12, nd_max=1e20, nd_points=161, t_min: Kelvin = 4.,
+                      t_max: Kelvin = 600., t_points=150, statistics='boltzmann') -> FermiLevelTable:
+    """
+    :param material: model from pame.Semiconductors.models, e.g. Si()
+    :param nd_min: lower donors concentration in cm^-3
+    :param nd_max: upper donors concentration in cm^-3
+    :param nd_points: amount of grid points of lg(Nd)
+    :param t_min: lower temperature in Kelvin
+    :param t_max: upper temperature in Kelvin
+    :param t_points: amount of grid points of temperature
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: FermiLevelTable with the interpolation error estimate
+    """
+    lg_nd = np.linspace(np.log10(nd_min), np.log10(nd_max), nd_points)
+    t = np.linspace(t_min, t_max, t_points)
+
+    def solve(lg, temperature):
+        return calculate_fermi_level_batch(me=material.me, mh=material.mh, t=temperature[None, :],
+                                           Jd=material.Jd, Ec=material.Eg, Nd=10 ** lg[:, None], Ev=0.,
+                                           statistics=statistics)['Ef']
+
+    ef = solve(lg_nd, t)
+    # точное решение в центрах ячеек против среднего по четырем углам
+    exact = solve((lg_nd[:-1] + lg_nd[1:]) / 2, (t[:-1] + t[1:]) / 2)
+    interpolated = (ef[:-1, :-1] + ef[1:, :-1] + ef[:-1, 1:] + ef[1:, 1:]) / 4
+    return FermiLevelTable(Ef=ef, lg_nd=lg_nd, t=t, error=np.abs(exact - interpolated), me=material.me,
+                           mh=material.mh, Jd=material.Jd, Eg=material.Eg, statistics=statistics)
@@ -0,0 +1,148 @@
+"""
+Общая часть расчета уровня Ферми в полупроводнике с одним типом примеси (DonorFermiLevel, AcceptorFermiLevel).
+
+Модули отличаются только уравнением электронейтральности и знаком: для доноров основные носители - электроны
+у дна зоны проводимости Ec, уровень Ферми отсчитывается вверх (sign = +1), для акцепторов - дырки у потолка
+валентной зоны Ev, отсчет вниз (sign = -1). Заряд Q(Ef) в обоих случаях монотонно растет с ростом Ef,
+поэтому выбор метода, построение отрезка и обработка ошибок одни и те же.
+"""
+import numpy as np
+from pame.exceptions import CantMatchMethod, CatchZeroDelta, CantRunDichotomyMethod, CannotMatchResultFormat, \
+    CantReachTolerance, CantFindSignChange
+from pame.solvers import RootResult, dichotomy, newton, fixed_point, secant, brent
+
+Kelvin = float
+eV = float
+
+
+def fermi_methods() -> list:
+    return ['brent', 'dichotomy', 'newtown', 'fixed-point', 'secant']
+
+
+def initial_level(band: eV, n_band: float, ln_n1: float, n_imp: float, ln_ni: float, kt: eV, sign: int) -> eV:
+    """
+    Начальное приближение уровня Ферми из асимптотик уравнения электронейтральности (статистика Больцмана).
+
+    Вымораживание и истощение примеси (неосновных носителей нет), n_1 - плотность основных носителей,
+    при которой половина примеси ионизована:
+    :math: $n^2 + n_1 n - n_1 N = 0$, $n_{ext} = \frac{2 N}{1 + \sqrt{1 + 4 N / n_1}}$
+    при $N \gg n_1$ - вымораживание $n = \sqrt{n_1 N}$, при $N \ll n_1$ - истощение $n = N$.
+
+    Собственная проводимость (вся примесь ионизована):
+    :math: $n^2 - n_{ext} n - n_i^2 = 0$, $n = \frac{n_{ext}}{2} + \sqrt{\frac{n_{ext}^2}{4} + n_i^2}$
+
+    Все считаем в логарифмах, чтобы при низких температурах ничего не обнулялось.
+
+    :param band: edge of the majority carriers band in eV, Ec for donors and Ev for acceptors
+    :param n_band: effective density of states of this band, Nc or Nv
+    :param ln_n1: log of n_1
+    :param n_imp: concentration of the impurity
+    :param ln_ni: log of the intrinsic concentration
+    :param kt: kT in eV
+    :param sign: +1 for donors, -1 for acceptors
+    :return: Fermi level estimate in eV
+    """
+    if n_imp <= 0:
+        return band + sign * kt * (ln_ni - np.log(n_band))
+
+    ln_ext = np.log(2 * n_imp) - np.logaddexp(0., 0.5 * np.logaddexp(0., np.log(4 * n_imp) - ln_n1))
+    ln_n = ln_ext - np.log(2.) + np.logaddexp(0., 0.5 * np.logaddexp(0., np.log(4.) + 2 * (ln_ni - ln_ext)))
+    return band + sign * kt * (ln_n - np.log(n_band))
+
+
+def sign_change_bracket(q, guess: eV, lowest: eV, highest: eV, width: eV) -> tuple:
+    """
+    Отрезок guess +- width, который расширяем, пока заряд на его концах не будет разного знака.
+
+    :param q: charge as a function of the Fermi level, grows with it
+    :param guess: Fermi level estimate in eV
+    :param lowest: the bracket does not go below it
+    :param highest: the bracket does not go above it
+    :param width: initial half width in eV
+    :return: bracket [Ef_low, Ef_upper] with a sign change of the charge
+    """
+    low, upper = max(guess - width, lowest), min(guess + width, highest)
+    while low > lowest and q(low) > 0:
+        width *= 2
+        low = max(guess - width, lowest)
+    while upper < highest and q(upper) < 0:
+        width *= 2
+        upper = min(guess + width, highest)
+    return low, upper
+
+
+def solve_balance(f, df, method: str, Ef0: eV, Ef1: eV, delta: eV, tolerance: float,
+                  max_iter: int) -> RootResult:
+    """
+    :param f: charge balance function of the Fermi level
+    :param df: its derivative
+    :param method: one of fermi_methods()
+    :param Ef0: lower border of the bracket for 'brent' and 'dichotomy', start point for the rest
+    :param Ef1: upper border of the bracket
+    :param delta: x_1 - x_0 difference for a first iteration of the secant method
+    :param tolerance: acceptable error value
+    :param max_iter: iterations limit
+    :return: the solver's result
+    """
+    if method in ('brent', 'dichotomy') and not Ef1 > Ef0:
+        raise CantRunDichotomyMethod(phi0=Ef0, phi1=Ef1)
+    if method == 'brent':
+        return brent(f=f, a=Ef0, b=Ef1, df=df, tolerance=tolerance, max_iter=max_iter)
+    elif method == 'dichotomy':
+        return dichotomy(f=f, a=Ef0, b=Ef1, tolerance=tolerance, max_iter=max_iter)
+    elif method == 'fixed-point':
+        return fixed_point(f=f, df=df, x0=Ef0, x_fixed=Ef0, tolerance=tolerance, max_iter=max_iter)
+    elif method == 'newtown':
+        return newton(f=f, df=df, x0=Ef0, tolerance=tolerance, max_iter=max_iter)
+    elif method == 'secant':
+        return secant(f=f, x0=Ef0, delta=delta, tolerance=tolerance, max_iter=max_iter)
+    raise CantMatchMethod(message=method, methods=fermi_methods())
+
+
+def find_level(f, df, bracket, initial, make_result, to_xey, Ef0=None, Ef1=None, result_format='numeric',
+               method='brent', delta=1e-3, tolerance=1e-7, max_iter=1000):
+    """
+    :param f: charge balance function of the Fermi level
+    :param df: its derivative
+    :param bracket: function (guess) -> (Ef_low, Ef_upper), guess may be None
+    :param initial: function () -> Fermi level estimate
+    :param make_result: function (solution) -> Result
+    :param to_xey: function (Result) -> Result_xey
+    :param Ef0: lower border or start point, bracket / initial if None
+    :param Ef1: upper border, the bracket is built around Ef0 if None
+    :param result_format: 'numeric' or 'xey'
+    :param method: one of fermi_methods()
+    :param delta: x_1 - x_0 difference for a first iteration of the secant method
+    :param tolerance: acceptable error value
+    :param max_iter: iterations limit
+    :return: result of make_result or to_xey, None with a printed message if the level is not found
+    """
+    try:
+        if method in ('brent', 'dichotomy') and (Ef0 is None or Ef1 is None):
+            Ef0, Ef1 = bracket(Ef0)
+        elif Ef0 is None:
+            Ef0 = initial()
+
+        solution = solve_balance(f=f, df=df, method=method, Ef0=Ef0, Ef1=Ef1, delta=delta, tolerance=tolerance,
+                                 max_iter=max_iter)
+        if not solution.converged:
+            raise CantReachTolerance(max_iter=max_iter, residual=solution.residual)
+
+        result = make_result(solution)
+        if result_format == 'numeric':
+            return result
+        elif result_format == 'xey':
+            return to_xey(result)
+        else:
+            raise CannotMatchResultFormat(available_formats=['numeric', 'xey'])
+
+    except CantMatchMethod as e:
+        print(e.args)
+    except CantRunDichotomyMethod as e:
+        print(e.args)
+    except CantFindSignChange as e:
+        print(e.args)
+    except CatchZeroDelta as e:
+        print('Delta equals zero')
+    except CantReachTolerance as e:
+        print(e.args)
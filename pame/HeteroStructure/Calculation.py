@@ -1,6 +1,7 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from typing import NamedTuple
+from pame.Semiconductors.models import Model
+from pame.plotting import render
 
 """
 Модель кронекера-пелли
@@ -26,41 +27,54 @@ def _plasm_freq(a: lattice) -> float:
 
 
 def _energy(a: lattice, epsilon: float) -> float:
+    return _plasm_energy(w_p=_plasm_freq(a), epsilon=epsilon)
+
+
+def _plasm_energy(w_p: float, epsilon: float) -> float:
     h = 4.135e-15  # Planck's constant, Ev * c
     erg = 1.6e-12  # 1 eV
-    return h * _plasm_freq(a) / np.sqrt(epsilon - 1) * erg / 1e-11
+    return h * w_p / np.sqrt(epsilon - 1) * erg / 1e-11
 
 
 def _plot_contact_zone(delta_Eg_model: float, Eg_outer: float, Eg_inner: float,
                        delta0_outer: float, delta0_inner: float, path: str) -> None:
+    print(f'Ev slim band { -delta0_outer / 3 + delta_Eg_model + delta0_inner / 3}')
+    render(draw_contact_zone, path + 'model.png', delta_Eg_model=delta_Eg_model, Eg_outer=Eg_outer,
+           Eg_inner=Eg_inner, delta0_outer=delta0_outer, delta0_inner=delta0_inner)
+
+
+def draw_contact_zone(fig, delta_Eg_model: float, Eg_outer: float, Eg_inner: float,
+                      delta0_outer: float, delta0_inner: float) -> None:
+    """
+    :param fig: matplotlib Figure, see pame.plotting
+    """
+    ax = fig.add_subplot()
     x = np.linspace(0, 10, 10)
-    plt.plot(x, np.zeros_like(x), color='blue')
-    plt.plot(x, np.zeros_like(x) + Eg_outer, color='blue', label='Ec и Ev широкозонный')
-    plt.plot(x, np.zeros_like(x) - delta0_outer / 3, 'r--')
+    ax.plot(x, np.zeros_like(x), color='blue')
+    ax.plot(x, np.zeros_like(x) + Eg_outer, color='blue', label='Ec и Ev широкозонный')
+    ax.plot(x, np.zeros_like(x) - delta0_outer / 3, 'r--')
     x = np.linspace(10, 20, 10)
-    plt.plot(x, np.zeros_like(x) - delta0_outer / 3 + delta_Eg_model, 'g-.')
-    plt.plot(x, np.zeros_like(x) - delta0_outer / 3 + delta_Eg_model + delta0_inner / 3, color='green',
+    ax.plot(x, np.zeros_like(x) - delta0_outer / 3 + delta_Eg_model, 'g-.')
+    ax.plot(x, np.zeros_like(x) - delta0_outer / 3 + delta_Eg_model + delta0_inner / 3, color='green',
              label='Ec и Ev узкозонный')
-    print(f'Ev slim band { -delta0_outer / 3 + delta_Eg_model + delta0_inner / 3}')
-    plt.plot(x, np.zeros_like(x) - delta0_outer / 3 + delta_Eg_model + delta0_inner / 3 + Eg_inner, color='green')
+    ax.plot(x, np.zeros_like(x) - delta0_outer / 3 + delta_Eg_model + delta0_inner / 3 + Eg_inner, color='green')
 
     if - delta0_outer / 3 + delta_Eg_model + delta0_inner / 3 < 0:
         z = np.linspace(- delta0_outer / 3 + delta_Eg_model + delta0_inner / 3, 0, 10)
     else:
         z = np.linspace(0, - delta0_outer / 3 + delta_Eg_model + delta0_inner / 3, 10)
-    plt.plot(np.zeros_like(z) + 10, z, color='orange')
+    ax.plot(np.zeros_like(z) + 10, z, color='orange')
 
     if - delta0_outer / 3 + delta_Eg_model + delta0_inner / 3 + Eg_inner < Eg_outer:
         z = np.linspace(- delta0_outer / 3 + delta_Eg_model + delta0_inner / 3 + Eg_inner, Eg_outer, 10)
     else:
         z = np.linspace(Eg_outer, - delta0_outer / 3 + delta_Eg_model + delta0_inner / 3 + Eg_inner, 10)
-    plt.plot(np.zeros_like(z) + 10, z, color='orange')
+    ax.plot(np.zeros_like(z) + 10, z, color='orange')
 
-    plt.legend(fontsize=7,
-               ncol=1,
-               facecolor='oldlace',
-               edgecolor='r')
-    plt.savefig(path+'model.png')
+    ax.legend(fontsize=7,
+              ncol=1,
+              facecolor='oldlace',
+              edgecolor='r')
 
 
 def process_heterostructure(wide_band: SemiCond, slim_band: SemiCond, path=None) -> tuple:
@@ -96,3 +110,64 @@ def process_heterostructure(wide_band: SemiCond, slim_band: SemiCond, path=None)
                                             slim_band.spin_orbital_splitting / 3 + slim_band.E_g)
     delta_e_valence = delta_e_g_model + slim_band.spin_orbital_splitting/3 - wide_band.spin_orbital_splitting/3
     return delta_e_conductivity, delta_e_valence
+
+
+class OffsetTable(NamedTuple):
+    names: list
+    E_g: np.ndarray
+    E_g_model: np.ndarray  # [i, j] - material j with epsilon of material i
+    delta_Ec: np.ndarray
+    delta_Ev: np.ndarray
+
+    def pair(self, wide_band: str, slim_band: str) -> tuple:
+        """
+        :return: delta Ec and delta Ev for the wide_band / slim_band contact
+        """
+        i, j = self.names.index(wide_band), self.names.index(slim_band)
+        return self.delta_Ec[i, j], self.delta_Ev[i, j]
+
+
+def offset_matrices(lattice, epsilon, E_g, spin_orbital_splitting, wide_band=None) -> tuple:
+    """
+    Разрывы зон для всех пар материалов сразу: строка i - широкозонный (внешний) материал,
+    столбец j - узкозонный (внутренний), формулы те же, что в process_heterostructure.
+    Как и там, модельные ширины зон обоих материалов пары считаются с epsilon широкозонного,
+    поэтому плазменная частота считается один раз для каждого материала, а epsilon берется по строке.
+
+    :param lattice: lattice constants in cm, array of N materials (e.g. alloy compositions)
+    :param epsilon: dielectric constants
+    :param E_g: energy gaps in eV
+    :param spin_orbital_splitting: in eV
+    :param wide_band: indices of the materials to take as the wide band ones (rows), all N if None
+    :return: model energy gaps (M, N) of material j with epsilon of material wide_band[i], delta Ec (M, N)
+             and delta Ev (M, N) in eV
+    """
+    lattice, epsilon, E_g, spin_orbital_splitting = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(x, dtype=float)) for x in (lattice, epsilon, E_g, spin_orbital_splitting)])
+    rows = np.arange(len(lattice)) if wide_band is None else np.atleast_1d(wide_band)
+    w_p = _plasm_freq(a=lattice)
+    e_g_model = _plasm_energy(w_p=w_p[None, :], epsilon=epsilon[rows, None])
+    e_g_wide_model = _plasm_energy(w_p=w_p[rows], epsilon=epsilon[rows])
+    delta_e_g_model = np.abs(e_g_wide_model[:, None] - e_g_model) / 2.
+    split = spin_orbital_splitting / 3
+    delta_e_valence = delta_e_g_model + split[None, :] - split[rows, None]
+    delta_e_conductivity = E_g[rows, None] - (delta_e_valence + E_g[None, :])
+    return e_g_model, delta_e_conductivity, delta_e_valence
+
+
+def offset_table(materials=None) -> OffsetTable:
+    """
+    :param materials: SemiCond tuples or instances of pame.Semiconductors.models, all models with default
+                      parameters if None
+    :return: names, energy gaps, N x N model energy gaps (see offset_matrices) and delta Ec / delta Ev matrices,
+             nothing is printed or plotted
+    """
+    if materials is None:
+        materials = [model() for model in Model.__subclasses__()]
+    names = [getattr(material, 'name', type(material).__name__) for material in materials]
+    e_g = np.array([material.E_g if hasattr(material, 'E_g') else material.Eg
+                    for material in materials], dtype=float)
+    e_g_model, delta_ec, delta_ev = offset_matrices(
+        lattice=[material.lattice for material in materials], epsilon=[material.epsilon for material in materials],
+        E_g=e_g, spin_orbital_splitting=[material.spin_orbital_splitting for material in materials])
+    return OffsetTable(names=names, E_g=e_g, E_g_model=e_g_model, delta_Ec=delta_ec, delta_Ev=delta_ev)
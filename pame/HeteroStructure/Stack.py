@@ -0,0 +1,160 @@
+"""
+Равновесная зонная диаграмма многослойной гетероструктуры.
+
+1) Положение зон каждого слоя - по модели из process_heterostructure. Опорный материал - самый широкозонный
+   в структуре, его зоны (середина модельной запрещенной зоны в нуле, валентная сдвинута на delta_0 / 3):
+       Ev0 = -E_g_model / 2 + delta_0 / 3,   Ec0 = Ev0 + E_g
+   остальные слои сдвинуты от него на разрывы delta Ev, delta Ec из offset_matrices (с epsilon опорного).
+   Разрывы между двумя неопорными слоями при разных epsilon могут отличаться от их попарных разрывов.
+
+2) Изгиб зон phi(x) (Ec(x) = Ec0 + phi, Ef = 0) - из нелинейного уравнения Пуассона в форме потока,
+   epsilon и зоны кусочно-постоянные по слоям:
+       d/dx (epsilon dphi/dx) = e (p - n + Nd^+ - Na^-) / epsilon0,   phi'(0) = phi'(L) = 0
+   Узел на границе слоев получает половину ячейки от каждого слоя со своими зонами и легированием.
+   Начальное приближение - уровень Ферми каждого слоя из уравнения электронейтральности,
+   дальше метод Ньютона с трехдиагональной матрицей (solvers.tridiagonal_solve).
+
+Все параметры слоев собираются в массивы и раздаются по ячейкам индексами, поэтому
+расчет линеен по числу слоев и узлов сетки.
+"""
+import numpy as np
+from typing import NamedTuple
+import pame.constants as constants
+from pame.BandBend.PoissonSolver import _space_charge
+from pame.FermiLevelPinning.CalculateParticles import calc_Nc, calc_Nv
+from pame.FermiLevelPinning.CompensatedFermiLevel import calculate_fermi_level, _charges
+from pame.HeteroStructure.Calculation import offset_matrices
+from pame.solvers import tridiagonal_solve
+
+Kelvin = float
+cm = float
+
+
+class Layer(NamedTuple):
+    material: object
+    thickness: cm
+    Nd: float = 0.
+    Na: float = 0.
+    Jd: float = None
+    Ja: float = None
+    me: float = None
+    mh: float = None
+
+
+class StackResult(NamedTuple):
+    x: np.ndarray
+    Ec: np.ndarray
+    Ev: np.ndarray
+    Ef: float
+    phi: np.ndarray
+    n: np.ndarray
+    p: np.ndarray
+    layer: np.ndarray
+    iterations: int
+    converged: bool
+
+
+def _layer_parameter(layer: Layer, field: str) -> float:
+    value = getattr(layer, field)
+    if value is None:
+        value = getattr(layer.material, field)
+    return value
+
+
+def band_edges(materials) -> tuple:
+    """
+    :param materials: SemiCond tuples or instances of pame.Semiconductors.models
+    :return: Ec0 and Ev0 of each material in eV relative to the common reference
+    """
+    e_g = np.array([material.E_g if hasattr(material, 'E_g') else material.Eg for material in materials],
+                   dtype=float)
+    split = np.array([material.spin_orbital_splitting for material in materials], dtype=float)
+    wide = int(np.argmax(e_g))
+    e_g_model, delta_ec, delta_ev = offset_matrices(
+        lattice=[material.lattice for material in materials], epsilon=[material.epsilon for material in materials],
+        E_g=e_g, spin_orbital_splitting=split, wide_band=wide)
+    ev = -e_g_model[0, wide] / 2 + split[wide] / 3 + delta_ev[0]
+    return ev + e_g, ev
+
+
+def calculate_stack(layers, t: Kelvin = 300., nodes_per_layer=200, tolerance=1e-8, max_iter=100,
+                    statistics='boltzmann') -> StackResult:
+    """
+    :param layers: list of Layer, from x = 0; Jd, Ja, me, mh are taken from the material if None
+    :param t: temperature in Kelvin
+    :param nodes_per_layer: amount of uniform mesh nodes in each layer including its borders
+    :param tolerance: max Newton correction of phi in eV
+    :param max_iter: iterations limit
+    :param statistics: 'boltzmann' or 'fermi-dirac'
+    :return: mesh with interface points repeated for both layers, Ec(x), Ev(x), Ef = 0, phi(x), n(x), p(x),
+             layer index of each point and convergence info
+    """
+    count = len(layers)
+    ec0, ev0 = band_edges([layer.material for layer in layers])
+    epsilon = np.array([layer.material.epsilon for layer in layers], dtype=float)
+    thickness = np.array([layer.thickness for layer in layers], dtype=float)
+    nd, na = np.array([layer.Nd for layer in layers], dtype=float), np.array([layer.Na for layer in layers], dtype=float)
+    jd = np.array([_layer_parameter(layer, 'Jd') for layer in layers], dtype=float)
+    ja = np.array([_layer_parameter(layer, 'Ja') for layer in layers], dtype=float)
+    me = np.array([_layer_parameter(layer, 'me') for layer in layers], dtype=float)
+    mh = np.array([_layer_parameter(layer, 'mh') for layer in layers], dtype=float)
+    nc, nv = calc_Nc(me, t), calc_Nv(mh, t)
+    kt = 1.38e-16 * 6.24e11 * t
+    c = constants.e / constants.epsilon0
+
+    # сетка: nodes_per_layer - 1 ячеек в каждом слое, узлы на границах общие
+    cells = nodes_per_layer - 1
+    borders = np.concatenate([[0.], np.cumsum(thickness)])
+    s = np.linspace(0., 1., nodes_per_layer)[:-1]
+    x = np.append((borders[:-1, None] + thickness[:, None] * s).ravel(), borders[-1])
+    h = np.diff(x)
+    cell_layer = np.repeat(np.arange(count), cells)
+
+    # начальное приближение - электронейтральность в каждом слое
+    bulk = calculate_fermi_level(me=me, mh=mh, t=t, Ec=ec0, donors=[(nd, jd)], acceptors=[(na, ja)], Ev=ev0,
+                                 statistics=statistics)
+    phi = np.append(-bulk['Ef'][cell_layer], -bulk['Ef'][-1])
+
+    def half_cells(values):
+        # заряд половин ячеек слева и справа от каждого узла
+        left, right = np.zeros(len(x)), np.zeros(len(x))
+        left[1:], right[:-1] = values[1] * h / 2, values[0] * h / 2
+        return left + right
+
+    params = dict(nc=nc[cell_layer], nv=nv[cell_layer], t=t, Ec=ec0[cell_layer], Ev=ev0[cell_layer],
+                  donors=[(nd[cell_layer], jd[cell_layer])], acceptors=[(na[cell_layer], ja[cell_layer])],
+                  statistics=statistics)
+    flux = epsilon[cell_layer] / h
+
+    iterations, converged = 0, False
+    with np.errstate(over='ignore'):
+        for iterations in range(1, max_iter + 1):
+            # каждая ячейка считает заряд в своих двух узлах со своими зонами
+            rho_left, drho_left = _space_charge(phi[:-1], 0., **params)
+            rho_right, drho_right = _space_charge(phi[1:], 0., **params)
+            charge = half_cells((rho_left, rho_right))
+            dcharge = half_cells((drho_left, drho_right))
+
+            residual = -c * charge
+            residual[:-1] += flux * (phi[1:] - phi[:-1])
+            residual[1:] -= flux * (phi[1:] - phi[:-1])
+            diag = -c * dcharge
+            diag[:-1] -= flux
+            diag[1:] -= flux
+            lower, upper = np.zeros(len(x)), np.zeros(len(x))
+            lower[1:], upper[:-1] = flux, flux
+
+            delta = tridiagonal_solve(lower=lower, diag=diag, upper=upper, rhs=-residual)
+            delta = np.sign(delta) * kt * np.log1p(np.abs(delta) / kt)
+            phi += delta
+            if np.max(np.abs(delta)) < tolerance:
+                converged = True
+                break
+
+    # точки вывода: каждый слой со своими границами, граничные x повторяются
+    node = (np.arange(count)[:, None] * cells + np.arange(nodes_per_layer)).ravel()
+    layer = np.repeat(np.arange(count), nodes_per_layer)
+    n, p, _, _ = _charges(Ef=-phi[node], nc=nc[layer], nv=nv[layer], t=t, Ec=ec0[layer], Ev=ev0[layer],
+                          donors=[], acceptors=[], statistics=statistics)
+    return StackResult(x=x[node], Ec=ec0[layer] + phi[node], Ev=ev0[layer] + phi[node], Ef=0., phi=phi[node],
+                       n=n, p=p, layer=layer, iterations=iterations, converged=converged)
@@ -1,7 +1,7 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 from pame.constants import epsilon0, e
+from pame.plotting import render
 
 
 def Ip(z: float, a: float, L: float, mu: float, epsilon: float, nd: float) -> float:
@@ -52,7 +52,7 @@ def Id(I_p: float, ud: float, vp: float, ug: float) -> float:
     return I_p * (3 * ud / vp - 2 * ((ud + ug) ** 1.5) / (vp ** 1.5) - (ug / vp) ** 1.5)
 
 
-def volt_amper_characteristics(I_p: float, ug: np.array, vp: float, path=None, ud_steps=100) -> None:
+def volt_amper_characteristics(I_p: float, ug: np.array, vp: float, path=None, ud_steps=100) -> tuple:
     """
     :ru:    Вольт-Амперная характеристика полевого транзистора.
 
@@ -72,10 +72,12 @@ def volt_amper_characteristics(I_p: float, ug: np.array, vp: float, path=None, u
     :param vp: saturation voltage
     :param: ud_steps: number of steps to divide U_d
 
-    :if the path is not None returns a picture of a VAC
+    :return: drain voltages and currents for each gate voltage, shape (len(ug), ud_steps),
+             if the path is not None saves a picture of a VAC, see draw_volt_amper_characteristics
     """
     ud = np.linspace(0, vp*1.2, ud_steps)
 
+    currents = []
     for i in range(len(ug)):
         Id_array = []
         for j in range(len(ud)):
@@ -85,16 +87,30 @@ def volt_amper_characteristics(I_p: float, ug: np.array, vp: float, path=None, u
                 Id_array.append(id)
             else:
                 Id_array.append(Id_array[j-1])
-        plt.plot(ud, Id_array, label=f'Ug={ug[i]}')
-    plt.xlabel('Ug[V]')
-    plt.ylabel('Id[A]')
-    plt.legend(fontsize=7,
-                  ncol=1,
-                  facecolor='oldlace',
-                  edgecolor='r')
+        currents.append(Id_array)
 
     if path is not None:
-        plt.savefig(path + 'volt_amper_characteristic.png')
+        render(draw_volt_amper_characteristics, path + 'volt_amper_characteristic.png', ud=ud, ug=ug,
+               currents=currents)
+    return ud, np.array(currents)
+
+
+def draw_volt_amper_characteristics(fig, ud, ug, currents) -> None:
+    """
+    :param fig: matplotlib Figure, see pame.plotting
+    :param ud: drain voltages in Volts
+    :param ug: gate voltages in Volts
+    :param currents: drain currents for each gate voltage
+    """
+    ax = fig.add_subplot()
+    for i in range(len(ug)):
+        ax.plot(ud, currents[i], label=f'Ug={ug[i]}')
+    ax.set_xlabel('Ug[V]')
+    ax.set_ylabel('Id[A]')
+    ax.legend(fontsize=7,
+              ncol=1,
+              facecolor='oldlace',
+              edgecolor='r')
 
 
 def g_m(Ip: float, ud: float, vp: float, ug: float) -> float:
@@ -0,0 +1,76 @@
+"""
+Минизонный спектр E(k) сверхрешетки в модели Кронига-Пенни.
+
+Энергия отсчитывается от верха барьера: яма -u0 < E < 0 - уравнение с гиперболическими функциями (_cp_shch),
+над барьером E > 0 - классическое (_cp). Оба уравнения умножены на 2 alpha betta > 0, поэтому знак
+невязки везде совпадает со знаком D(E) - cos(k(a + b)), и одну функцию можно искать на всей сетке.
+
+1) Невязка считается сразу на всей сетке энергия x волновой вектор.
+2) Смены знака по энергии в каждом столбце k дают отрезки с корнями, все корни уточняются
+   одной векторной дихотомией.
+3) n-й по возрастанию корень в столбце k - это E_n(k) n-й минизоны. Сетка k включает 0 и pi / (a + b),
+   поэтому края минизон - минимум и максимум по строке.
+"""
+import numpy as np
+from typing import NamedTuple
+from pame.solvers import vectorized_dichotomy
+
+eV = float
+
+
+class BandStructure(NamedTuple):
+    k: np.ndarray
+    bands: np.ndarray
+    bottom: np.ndarray
+    top: np.ndarray
+    width: np.ndarray
+    gaps: np.ndarray
+    converged: bool
+
+
+def _characteristic(model, energy, k):
+    """
+    :return: residual of the dispersion equation, _cp_shch in the well and _cp above the barrier
+    """
+    with np.errstate(over='ignore', invalid='ignore'):
+        return np.where(energy < 0, model._cp_shch(energy, k), model._cp(energy, k))
+
+
+def calculate_band_structure(model, k_points=101, e_min: eV = None, e_max: eV = None, energy_points=4000,
+                             xtolerance: eV = 1e-12, max_iter=100) -> BandStructure:
+    """
+    :param model: pame.KronigPenney.model.Model, a and b in meters
+    :param k_points: amount of wave vectors in [0, pi / (a + b)]
+    :param e_min: lower border of the energy window in eV, bottom of the well -u0 by default
+    :param e_max: upper border of the energy window in eV, u0 above the barrier by default
+    :param energy_points: energy grid size, two roots closer than its step can be lost
+    :param xtolerance: accuracy of the energies in eV
+    :param max_iter: bisection iterations limit
+    :return: wave vectors in 1/m, E_n(k) in eV with shape (bands, k_points), NaN where the band leaves the window
+             or a root is missed,
+             band bottoms, tops and widths and gaps between neighbouring minibands
+    """
+    e_min = -model.u0 if e_min is None else e_min
+    e_max = model.u0 if e_max is None else e_max
+    k = np.linspace(0., np.pi / (model.a + model.b), k_points)
+    energy = np.linspace(e_min, e_max, energy_points)
+    # при E = 0 и E = -u0 множитель 2 alpha betta обращается в ноль, это не корни
+    energy = energy[(energy != 0) & (energy != -model.u0)]
+
+    values = _characteristic(model, energy[:, None], k[None, :])
+    i, j = np.nonzero(np.sign(values[:-1]) * np.sign(values[1:]) < 0)
+    result = vectorized_dichotomy(lambda e: _characteristic(model, e, k[j]), a=energy[i], b=energy[i + 1],
+                                  tolerance=0., xtolerance=xtolerance, max_iter=max_iter)
+
+    # корни по столбцам k и по возрастанию энергии внутри столбца, номер корня в столбце - номер минизоны
+    order = np.lexsort((i, j))
+    i, j, roots = i[order], j[order], result.root[order]
+    starts = np.searchsorted(j, np.arange(k_points))
+    band = np.arange(len(j)) - starts[j]
+    bands = np.full((band.max() + 1 if len(band) else 0, k_points), np.nan)
+    bands[band, j] = roots
+
+    with np.errstate(all='ignore'):
+        bottom, top = np.nanmin(bands, axis=1), np.nanmax(bands, axis=1)
+    return BandStructure(k=k, bands=bands, bottom=bottom, top=top, width=top - bottom, gaps=bottom[1:] - top[:-1],
+                         converged=bool(result.converged.all()))
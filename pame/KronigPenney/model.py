@@ -1,7 +1,6 @@
 import numpy as np
-from pame.exceptions import CantMatchMethod
-from fompy.models import KronigPenneyModel
-from fompy.util.zeros import find_nth_function_zero
+from pame.exceptions import CantMatchMethod, CantFindSignChange, CantReachTolerance
+from pame.solvers import vectorized_dichotomy, VectorRootResult
 
 import pame.constants as const
 
@@ -68,47 +67,98 @@ class Model(object):
         p = self.m * self.u0 * const.eV_to_J * self.b * summ / const.h_bar**2
         return (np.cosh(alpha * summ) - np.cos(k * summ)) * (alpha * summ) + p * np.sinh(alpha * summ)
 
-    def _dichotomy(self, f, a, b, k=0, n=300) -> float:
+    def _dichotomy(self, f, a, b, k=0, tolerance=1e-12, max_iter=300) -> VectorRootResult:
         """
-        returns an energy of a free particle on the k_th mode
+        returns energies of a free particle on the k_th modes, all brackets are bisected at once
         :param f: function of linear equilibrium
-        :param a: length of an area where u=-u0
-        :param b: length of ab area where u=0
-        :param k: a mode number
-        :param n: iterations
-        :return: energy of a free particle on the specific mode
-        """
-        f_a = f(a, k)
-        ab2 = (a + b) / 2
-        for i in range(n):
-            f_2 = f(ab2, k)
-            if f_a * f_2 < 0:
-                b = ab2
-                ab2 = (a + b) / 2
-            else:
-                a = ab2
-                ab2 = (a + b) / 2
-                f_a = f(a, k)
-        return ab2
-
-    def calculate_energy_levels(self, method: str, level=0):
-        methods = ['classic', 'classic_simple', 'shch', 'shch_simple']
-        if method in methods:
-            if method == 'classic':
-                e_level = self._dichotomy(f=self._cp, a=-0.3, b=0, k=level)
-                print(f'Kronig-Penney classic model: {e_level}')
-                return e_level
-            elif method == 'classic_simple':
-                e_level = self._dichotomy(f=self._cp_simply, a=-0.3, b=0, k=level)
-                print(f'Kroning-Penney classic simple: {e_level}')
-                return e_level
-            elif method == 'shch':
-                e_level = self._dichotomy(f=self._cp_shch, a=-0.3, b=0, k=level)
-                print(f'Kroning-Penney shch model: {e_level}')
-                return e_level
-            elif method == 'shch_simple':
-                e_level = self._dichotomy(f=self._cp_shch_simpy, a=-0.3, b=0, k=level)
-                print(f'Kroning-Penney shch simple: {e_level}')
-                return e_level
+        :param a: lower borders of energy brackets in eV, number or array
+        :param b: upper borders of energy brackets in eV, number or array
+        :param k: a mode number, number or array broadcast with a and b
+        :param tolerance: energy precision in eV, bisection stops when a bracket is narrower
+        :param max_iter: iterations limit
+        :return: energies, per-bracket iterations amount and convergence flags
+        """
+        a, b, k = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float), np.asarray(k))
+        return vectorized_dichotomy(lambda energy: f(energy, k), a=a, b=b, tolerance=0., xtolerance=tolerance,
+                                    max_iter=max_iter)
+
+    _methods = {'classic': ('_cp', 'Kronig-Penney classic model'),
+                'classic_simple': ('_cp_simply', 'Kroning-Penney classic simple'),
+                'shch': ('_cp_shch', 'Kroning-Penney shch model'),
+                'shch_simple': ('_cp_shch_simpy', 'Kroning-Penney shch simple')}
+
+    # у упрощенных моделей нет sqrt(E + u0) и ложного корня на дне ямы, для них остается прежнее окно
+    _simple_window = (-0.3, 0.)
+
+    def _well_bracket(self, f, k, grid_points=512) -> tuple:
+        """
+        Bracket of the lowest root in the well -u0 < E < 0 from the sign changes of f on a grid of cells' midpoints,
+        which are never E = -u0 or E = 0, where the factor 2 alpha betta is zero and both methods have a spurious root.
+
+        :return: lower and upper borders in eV, NaN if f does not change its sign in the well
+        """
+        energy = -np.asarray(self.u0, dtype=float)[..., None] * (1 - (np.arange(grid_points) + 0.5) / grid_points)
+        values = f(energy, np.asarray(k)[..., None])
+        change = np.sign(values[..., :-1]) * np.sign(values[..., 1:]) < 0
+        energy = np.broadcast_to(energy, values.shape)
+        i = np.argmax(change, axis=-1)[..., None]
+        found = change.any(axis=-1)
+        low, high = np.take_along_axis(energy, i, axis=-1)[..., 0], np.take_along_axis(energy, i + 1, axis=-1)[..., 0]
+        return np.where(found, np.minimum(low, high), np.nan), np.where(found, np.maximum(low, high), np.nan)
+
+    def solve_energy_levels(self, method: str, level=0, a=None, b=None, tolerance=1e-12,
+                            max_iter=300) -> VectorRootResult:
+        """
+        :param method: 'classic', 'classic_simple', 'shch' or 'shch_simple'
+        :param level: a mode number, number or array
+        :param a: lower borders of energy brackets in eV
+        :param b: upper borders of energy brackets in eV,
+                  if a or b is None - the bracket of the lowest root in the well -u0 < E < 0, see _well_bracket,
+                  for '*_simple' methods the missing border is taken from the window [-0.3, 0]
+        :param tolerance: energy precision in eV
+        :param max_iter: iterations limit
+        :return: energies, iterations and convergence flags, e.g. to compare methods by iterations;
+                 brackets without a sign change are not converged
+        """
+        if method not in self._methods:
+            raise CantMatchMethod(message=method, methods=list(self._methods))
+        f = getattr(self, self._methods[method][0])
+        with np.errstate(over='ignore', invalid='ignore'):
+            if method.endswith('_simple'):
+                a = self._simple_window[0] if a is None else a
+                b = self._simple_window[1] if b is None else b
+            elif a is None or b is None:
+                a, b = self._well_bracket(f=f, k=level)
+            return self._dichotomy(f=f, a=a, b=b, k=level, tolerance=tolerance, max_iter=max_iter)
+
+    def calculate_energy_levels(self, method: str, level=0, tolerance=1e-12, max_iter=300):
+        """
+        :param method: 'classic', 'classic_simple', 'shch' or 'shch_simple'
+        :param level: a mode number, number or array
+        :param tolerance: energy precision in eV
+        :param max_iter: iterations limit
+        :return: energies in eV from the default brackets of solve_energy_levels; a failed number is None and
+                 failed entries of an array are NaN, in both cases with a printed message
+        """
+        # неизвестный метод - ошибка вызова, CantMatchMethod из solve_energy_levels не перехватываем
+        result = self.solve_energy_levels(method=method, level=level, tolerance=tolerance, max_iter=max_iter)
+        failed = ~np.asarray(result.converged)
+        try:
+            if np.any(failed & (np.asarray(result.iterations) == 0)):
+                a, b = self._simple_window if method.endswith('_simple') else (-self.u0, 0.)
+                raise CantFindSignChange(phi0=a, phi1=b)
+            if np.any(failed):
+                raise CantReachTolerance(max_iter=max_iter, residual=np.nan)
+        except CantFindSignChange as e:
+            print(e.args)
+        except CantReachTolerance as e:
+            print(e.args)
+
+        if result.root.ndim == 0:
+            if failed:
+                return None
+            e_level = float(result.root)
         else:
-            raise CantMatchMethod(message=method, methods=methods)
\ No newline at end of file
+            e_level = np.where(failed, np.nan, result.root)
+        print(f'{self._methods[method][1]}: {e_level} ({result.iterations} iterations)')
+        return e_level
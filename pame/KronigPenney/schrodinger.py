@@ -0,0 +1,116 @@
+"""
+Уравнение Шредингера в приближении эффективной массы на одномерной сетке с массой, зависящей от координаты
+(BenDaniel-Duke):
+    -h_bar^2 / 2 d/dx (1 / m(x) dpsi/dx) + U(x) psi = E psi,   psi = 0 на краях сетки
+
+Конечные объемы: U и m заданы в ячейках между узлами, узел получает половину каждой соседней ячейки,
+поток через ячейку h_bar^2 / (2 m h) (psi_{i+1} - psi_i). На неравномерной сетке задача обобщенная
+A psi = E W psi с диагональной W, замена phi = sqrt(W) psi делает ее обычной симметричной трехдиагональной.
+
+Нижние состояния - scipy.linalg.eigh_tridiagonal с выбором по номерам, если scipy установлен,
+иначе обратные итерации подпространства со сдвигом ниже спектра (solvers.tridiagonal_solve),
+в обоих случаях O(N) на состояние.
+"""
+import numpy as np
+from typing import NamedTuple
+import pame.constants as const
+from pame.solvers import tridiagonal_solve
+
+try:
+    from scipy.linalg import eigh_tridiagonal
+except ImportError:
+    eigh_tridiagonal = None
+
+meter = float
+eV = float
+
+
+class SchrodingerResult(NamedTuple):
+    energy: np.ndarray
+    psi: np.ndarray
+    x: np.ndarray
+    iterations: int
+    converged: bool
+
+
+def layers_profile(layers, nodes_per_layer=1000) -> tuple:
+    """
+    :param layers: list of pame.KronigPenney.transfer_matrix.Layer (thickness in m, u in eV, m in m0), e.g.
+                   barrier / well / barrier with u from delta_E_c of process_heterostructure
+    :param nodes_per_layer: amount of uniform cells in each layer
+    :return: mesh x in meters and u, m in its cells
+    """
+    thickness = np.array([layer.thickness for layer in layers], dtype=float)
+    borders = np.concatenate([[0.], np.cumsum(thickness)])
+    s = np.arange(nodes_per_layer) / nodes_per_layer
+    x = np.append((borders[:-1, None] + thickness[:, None] * s).ravel(), borders[-1])
+    u = np.repeat([layer.u for layer in layers], nodes_per_layer).astype(float)
+    m = np.repeat([layer.m for layer in layers], nodes_per_layer).astype(float)
+    return x, u, m
+
+
+def _lowest_states(flux, potential, weight, states, tolerance, max_iter) -> tuple:
+    """
+    Shift-invert subspace iteration with Rayleigh-Ritz for the lowest states of A psi = E W psi,
+    psi^T A psi = sum flux (psi_{i+1} - psi_i)^2 + sum potential psi^2, in the variables phi = sqrt(W) psi.
+    The shift is the lower bound of U, so A - shift W is diagonally dominant for tridiagonal_solve.
+    """
+    n = len(weight)
+    block = min(n, 2 * states + 8)
+    diag, off = flux[:-1] + flux[1:] + potential, -flux[1:-1]
+    sigma = np.min(potential / weight)
+    root = np.sqrt(weight)[:, None]
+
+    def rayleigh(phi):
+        # разности вместо A psi: сумма положительных слагаемых без потери точности на больших flux
+        psi = np.concatenate([np.zeros((1, phi.shape[1])), phi / root, np.zeros((1, phi.shape[1]))])
+        gradient = np.diff(psi, axis=0) * np.sqrt(flux)[:, None]
+        return gradient.T @ gradient + (psi[1:-1] * potential[:, None]).T @ psi[1:-1]
+
+    vectors = np.random.RandomState(0).standard_normal((n, block))
+    energy = np.full(block, np.inf)
+    for iterations in range(1, max_iter + 1):
+        psi = tridiagonal_solve(lower=np.append(0., off), diag=diag - sigma * weight, upper=np.append(off, 0.),
+                                rhs=vectors * root)
+        vectors, _ = np.linalg.qr(psi * root)
+        ritz, rotation = np.linalg.eigh(rayleigh(vectors))
+        vectors = vectors @ rotation
+        if np.max(np.abs(ritz[:states] - energy[:states])) < tolerance:
+            return ritz[:states], vectors[:, :states], iterations, True
+        energy = ritz
+    return energy[:states], vectors[:, :states], max_iter, False
+
+
+def solve_schrodinger(x, u, m, states=1, tolerance: eV = 1e-12, max_iter=500) -> SchrodingerResult:
+    """
+    :param x: mesh in meters, psi = 0 at x[0] and x[-1]
+    :param u: potential energy in eV in the cells between nodes, len(x) - 1 values or a number
+    :param m: effective mass in m0 in the cells, len(x) - 1 values or a number
+    :param states: amount of the lowest states
+    :param tolerance: energy precision in eV for the numpy fallback
+    :param max_iter: iterations limit for the numpy fallback
+    :return: energies in eV, psi with shape (len(x), states) normalized to int |psi|^2 dx = 1,
+             mesh and convergence info (one iteration with scipy)
+    """
+    x = np.asarray(x, dtype=float)
+    h = np.diff(x)
+    u = np.broadcast_to(np.asarray(u, dtype=float), h.shape)
+    m = np.broadcast_to(np.asarray(m, dtype=float), h.shape)
+
+    # ищем psi только во внутренних узлах 1..N-2: A psi = E W psi
+    flux = const.h_bar ** 2 / (2 * m * const.m0 * h) / const.eV_to_J
+    weight = (h[:-1] + h[1:]) / 2
+    potential = (h[:-1] * u[:-1] + h[1:] * u[1:]) / 2
+
+    if eigh_tridiagonal is not None:
+        energy, vectors = eigh_tridiagonal((flux[:-1] + flux[1:] + potential) / weight,
+                                           -flux[1:-1] / np.sqrt(weight[:-1] * weight[1:]),
+                                           select='i', select_range=(0, states - 1))
+        iterations, converged = 1, True
+    else:
+        energy, vectors, iterations, converged = _lowest_states(flux, potential, weight, states, tolerance,
+                                                                max_iter)
+
+    psi = np.zeros((len(x), states))
+    psi[1:-1] = vectors / np.sqrt(weight)[:, None]
+    return SchrodingerResult(energy=energy, psi=psi, x=x, iterations=iterations, converged=converged)
@@ -0,0 +1,70 @@
+"""
+Перебор параметров сверхрешетки (a, b, u0, m) для нижних минизон в модели Кронига-Пенни.
+
+Параметры - массивы, которые транслируются друг с другом (broadcasting), и одна модель Model
+с массивами вместо чисел считает сразу все точки.
+
+Края минизоны - корни дисперсионного уравнения при k = 0 и k = pi / (a + b): у каждой минизоны ровно один
+край на каждой из этих границ зоны Бриллюэна, поэтому n-я минизона - n-й корень при k = 0 и n-й при pi / (a + b).
+1) Невязка считается на сетке энергий внутри ямы -u0 < E < 0 для всех точек и обеих границ сразу.
+2) Первые levels смен знака по энергии дают отрезки, все отрезки уточняются одной векторной дихотомией.
+"""
+import numpy as np
+from pame.KronigPenney.band_structure import _characteristic
+from pame.KronigPenney.model import Model
+from pame.solvers import vectorized_dichotomy
+
+
+def superlattice_result_dtype(levels: int) -> np.dtype:
+    return np.dtype([('a', float), ('b', float), ('u0', float), ('m', float), ('bottom', float, (levels,)),
+                     ('top', float, (levels,)), ('width', float, (levels,)), ('converged', bool)])
+
+
+def superlattice_sweep(a, b, u0, m, levels=1, grid_points=512, tolerance=1e-12, max_iter=100) -> np.ndarray:
+    """
+    :param a: barrier widths in meters, number or array
+    :param b: well widths in meters
+    :param u0: well depths in eV
+    :param m: effective masses in m0
+    :param levels: amount of minibands to find in the well
+    :param grid_points: energy grid size in the well, two edges closer than u0 / grid_points can be lost
+    :param tolerance: energy precision in eV
+    :param max_iter: bisection iterations limit
+    :return: structured array of superlattice_result_dtype(levels) with the broadcast shape of the parameters:
+             parameters, miniband bottoms and tops in eV relative to the barrier top (bottom[..., 0] is the ground
+             state, calculate_energy_levels at level=0), widths, NaN for minibands which are not in the well;
+             a miniband which crosses the barrier top keeps its bottom with NaN top and width
+    """
+    a, b, u0, m = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (a, b, u0, m)))
+    shape = a.shape
+    # оси: (...точки, граница зоны Бриллюэна k = 0 и pi / (a + b), энергия)
+    model = Model(m=m[..., None, None], u0=u0[..., None, None], a=a[..., None, None], b=b[..., None, None])
+    k = np.stack([np.zeros(shape), np.pi / (a + b)], axis=-1)[..., None]
+    # середины ячеек сетки не попадают на E = -u0 и E = 0, где множитель 2 alpha betta равен нулю
+    energy = -model.u0 * (1 - (np.arange(grid_points) + 0.5) / grid_points)
+
+    values = _characteristic(model, energy, k)
+    change = np.sign(values[..., :-1]) * np.sign(values[..., 1:]) < 0
+    rank = np.cumsum(change, axis=-1)
+    low, high = np.full(shape + (2, levels), np.nan), np.full(shape + (2, levels), np.nan)
+    energy = np.broadcast_to(energy, values.shape)
+    for n in range(levels):
+        edge = change & (rank == n + 1)
+        found = edge.any(axis=-1)
+        i = np.argmax(edge, axis=-1)[..., None]
+        low[..., n] = np.where(found, np.take_along_axis(energy, i, axis=-1)[..., 0], np.nan)
+        high[..., n] = np.where(found, np.take_along_axis(energy, i + 1, axis=-1)[..., 0], np.nan)
+
+    with np.errstate(invalid='ignore'):
+        solution = vectorized_dichotomy(lambda e: _characteristic(model, e, k), a=low, b=high, tolerance=0.,
+                                        xtolerance=tolerance, max_iter=max_iter)
+    edges = np.where(np.isnan(low), np.nan, solution.root)
+
+    result = np.empty(shape, dtype=superlattice_result_dtype(levels))
+    result['a'], result['b'], result['u0'], result['m'] = a, b, u0, m
+    # если минизона выходит за барьер, в яме только ее нижний край: дно есть, верх - NaN
+    result['bottom'] = np.fmin(edges[..., 0, :], edges[..., 1, :])
+    result['top'] = np.maximum(edges[..., 0, :], edges[..., 1, :])
+    result['width'] = result['top'] - result['bottom']
+    result['converged'] = (solution.converged | np.isnan(low)).all(axis=(-2, -1))
+    return result
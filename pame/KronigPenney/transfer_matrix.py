@@ -0,0 +1,156 @@
+"""
+Метод матриц переноса для произвольного кусочно-постоянного одномерного потенциала.
+
+В каждом слое (толщина d, потенциал U, масса m) k = sqrt(2 m (E - U)) / h_bar, мнимое под барьером.
+Сшивка по BenDaniel-Duke: непрерывны psi и psi' / m, поэтому вектор (psi, psi' / m) переносится через слой матрицей
+    M = | cos(k d)          m sin(k d) / k |
+        | -k sin(k d) / m   cos(k d)       |,   det M = 1
+Матрица структуры - произведение матриц слоев справа налево. Все матрицы - массивы (..., 2, 2) по энергиям,
+цикл только по слоям.
+
+1) Сверхрешетка (слои - один период длины L): cos(k L) = tr M / 2, минизоны там, где |tr M| / 2 <= 1.
+2) Конечная структура: первый и последний слои - полубесконечные контакты (их толщина не используется),
+   коэффициент прохождения T(E) и связанные состояния ниже обоих контактов.
+
+Единицы как в Model: толщины в метрах, энергии и потенциалы в eV, массы в m0.
+"""
+import numpy as np
+from typing import NamedTuple
+import pame.constants as const
+from pame.solvers import vectorized_dichotomy
+
+meter = float
+eV = float
+
+
+class Layer(NamedTuple):
+    thickness: meter
+    u: eV
+    m: float
+
+
+class Dispersion(NamedTuple):
+    energy: np.ndarray
+    k: np.ndarray
+    half_trace: np.ndarray
+    bottom: np.ndarray
+    top: np.ndarray
+
+
+def _wave_number(energy, layer: Layer):
+    """
+    :return: complex wave number in 1/m, imaginary when energy < layer.u
+    """
+    return np.sqrt(2 * layer.m * const.m0 * (np.asarray(energy) - layer.u) * const.eV_to_J + 0j) / const.h_bar
+
+
+def _layer_matrix(energy, layer: Layer) -> np.ndarray:
+    """
+    :return: transfer matrices of (psi, psi' / m) through the layer, shape energy.shape + (2, 2)
+    """
+    k = _wave_number(energy, layer)
+    m = layer.m * const.m0
+    phase = k * layer.thickness
+    cos = np.cos(phase)
+    # sin(k d) / k = d sinc(k d / pi) остается конечным при k = 0
+    sin_k = layer.thickness * np.sinc(phase / np.pi)
+    return np.stack([np.stack([cos, m * sin_k], axis=-1),
+                     np.stack([-k ** 2 * sin_k / m, cos], axis=-1)], axis=-2)
+
+
+def transfer_matrix(layers, energy) -> np.ndarray:
+    """
+    :param layers: list of Layer from left to right
+    :param energy: energies in eV, number or array
+    :return: product of the layers' matrices, shape energy.shape + (2, 2)
+    """
+    energy = np.asarray(energy, dtype=float)
+    total = np.broadcast_to(np.eye(2, dtype=complex), energy.shape + (2, 2))
+    with np.errstate(over='ignore', invalid='ignore'):
+        for layer in layers:
+            total = _layer_matrix(energy, layer) @ total
+    return total
+
+
+def dispersion(layers, energy, tolerance: eV = 1e-12, max_iter=100) -> Dispersion:
+    """
+    :param layers: one period of a superlattice
+    :param energy: ascending energy grid in eV
+    :param tolerance: accuracy of the miniband edges in eV
+    :param max_iter: bisection iterations limit
+    :return: energies, Bloch wave numbers k(E) in [0, pi / L] 1/m (NaN in gaps), tr M / 2, and miniband bottoms and
+             tops inside the grid refined from the sign changes of |tr M| / 2 - 1
+    """
+    energy = np.asarray(energy, dtype=float)
+    period = sum(layer.thickness for layer in layers)
+
+    def excess(e):
+        return np.abs(np.trace(transfer_matrix(layers, e), axis1=-2, axis2=-1).real / 2) - 1
+
+    half_trace = np.trace(transfer_matrix(layers, energy), axis1=-2, axis2=-1).real / 2
+    with np.errstate(invalid='ignore'):
+        k = np.where(np.abs(half_trace) <= 1, np.arccos(np.clip(half_trace, -1, 1)) / period, np.nan)
+        inside = np.abs(half_trace) <= 1
+
+        i = np.nonzero(inside[:-1] != inside[1:])[0]
+        edges = vectorized_dichotomy(excess, a=energy[i], b=energy[i + 1], tolerance=0., xtolerance=tolerance,
+                                     max_iter=max_iter).root
+    # начало минизоны - переход из щели в зону; если сетка начинается внутри минизоны, ее низ - край сетки
+    opening = ~inside[i]
+    bottom, top = edges[opening], edges[~opening]
+    if inside[0]:
+        bottom = np.concatenate([[energy[0]], bottom])
+    if inside[-1]:
+        top = np.concatenate([top, [energy[-1]]])
+    return Dispersion(energy=energy, k=k, half_trace=half_trace, bottom=bottom, top=top)
+
+
+def transmission(layers, energy) -> np.ndarray:
+    """
+    :param layers: list of Layer, the first and the last are semi-infinite leads
+    :param energy: energies in eV, number or array
+    :return: transmission coefficient T(E), zero where a lead has no propagating states
+    """
+    energy = np.asarray(energy, dtype=float)
+    left, right = layers[0], layers[-1]
+    q_left = _wave_number(energy, left) / (left.m * const.m0)
+    q_right = _wave_number(energy, right) / (right.m * const.m0)
+    m = transfer_matrix(layers[1:-1], energy)
+    # (t, i q_r t) = M (1 + r, i q_l (1 - r))
+    incident = m[..., 0, 0] + 1j * q_left * m[..., 0, 1], m[..., 1, 0] + 1j * q_left * m[..., 1, 1]
+    reflected = m[..., 0, 0] - 1j * q_left * m[..., 0, 1], m[..., 1, 0] - 1j * q_left * m[..., 1, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = (1j * q_right * incident[0] - incident[1]) / (reflected[1] - 1j * q_right * reflected[0])
+        t = incident[0] + r * reflected[0]
+        flux = np.where((q_left.real > 0) & (q_right.real > 0), q_right.real / q_left.real, 0.)
+    return np.nan_to_num(flux * np.abs(t) ** 2)
+
+
+def bound_states(layers, grid_points=2000, tolerance: eV = 1e-12, max_iter=100) -> np.ndarray:
+    """
+    :param layers: list of Layer, the first and the last are semi-infinite leads
+    :param grid_points: energy grid size between the lowest potential and the lower lead,
+                        two levels closer than its step can be lost
+    :param tolerance: energy precision in eV
+    :param max_iter: bisection iterations limit
+    :return: ascending bound state energies in eV
+    """
+    left, right = layers[0], layers[-1]
+    low, high = min(layer.u for layer in layers), min(left.u, right.u)
+    energy = low + (high - low) * (np.arange(grid_points) + 0.5) / grid_points
+
+    def mismatch(e):
+        # решение, затухающее влево, переносится слоями с нормировкой (без переполнения cosh в толстых барьерах),
+        # связанное состояние - когда справа оно тоже затухает: psi' / m = -kappa_r / m_r psi
+        kappa_left = np.abs(_wave_number(e, left))
+        kappa_right = np.abs(_wave_number(e, right))
+        vector = np.stack([np.ones_like(kappa_left), kappa_left / (left.m * const.m0)], axis=-1)
+        for layer in layers[1:-1]:
+            vector = (_layer_matrix(e, layer) @ vector[..., None])[..., 0].real
+            vector = vector / np.max(np.abs(vector), axis=-1, keepdims=True)
+        return vector[..., 1] + kappa_right / (right.m * const.m0) * vector[..., 0]
+
+    values = mismatch(energy)
+    i = np.nonzero(np.sign(values[:-1]) * np.sign(values[1:]) < 0)[0]
+    return vectorized_dichotomy(mismatch, a=energy[i], b=energy[i + 1], tolerance=0., xtolerance=tolerance,
+                                max_iter=max_iter).root
@@ -1,8 +1,8 @@
-import matplotlib.pyplot as plt
 import numpy as np
 from typing import NamedTuple
 from pame.FermiLevelPinning.CalculateParticles import calc_Nv, calc_Nc, calc_n, calc_p
 from pame.constants import k, e
+from pame.plotting import render
 
 me_effective = float
 mh_effective = float
@@ -40,21 +40,31 @@ def count_n_p(ni2: float, nv: float, Ef_p: float, t: float) -> float:
     return ni2 / (nv * np.exp((-Ef_p)/(k * t)))
 
 
-def count_ni(t: float, me: float, mh: float, Eg: float) -> float:
-    Nc = calc_Nc(me=me, t=t)
-    Nv = calc_Nv(mh=mh, t=t)
-    # k = 1.38e-16  # эрг/К
-
-    return (Nc*Nv * np.exp(-1. * Eg/(2 * k * t)))**0.5
+def count_ni(t: float, me: float, mh: float, Eg: float, nc=None, nv=None) -> float:
+    """
+    :math: $n_i = \sqrt{N_c N_v} exp(-\frac{E_g}{2kT})$
+    :param t: temperature in Kelvin
+    :param me: effective mass of electron
+    :param mh: effective mass of proton
+    :param Eg: energy gap in eV
+    :param nc: effective density of states in the conduction band, calculated if None
+    :param nv: effective density of states in the valence band, calculated if None
+    :return: intrinsic carriers concentration in cm^-3
+    """
+    Nc = calc_Nc(me=me, t=t) if nc is None else nc
+    Nv = calc_Nv(mh=mh, t=t) if nv is None else nv
+    return np.sqrt(Nc * Nv) * np.exp(-Eg / (2 * k * t))
 
 
-def count_pi(t: float, me: float, mh: float, Eg: float) -> float:
-    Nc = calc_Nc(me=me, t=t)
-    Nv = calc_Nv(mh=mh, t=t)
-    return (Nc * Nv * np.exp(-1. * Eg / (2 * k * t)))**0.5  # 10^3
+def count_pi(t: float, me: float, mh: float, Eg: float, nc=None, nv=None) -> float:
+    """
+    :math: $p_i = n_i$
+    """
+    return count_ni(t=t, me=me, mh=mh, Eg=Eg, nc=nc, nv=nv)
 
 
-def _count_Jp(me: float, mh: float, Eg: float, Ef_n: float, t: float, Dp: float, Lp: float) -> float:
+def _count_Jp(me: float, mh: float, Eg: float, Ef_n: float, t: float, Dp: float, Lp: float,
+              nc=None, nv=None, ni=None) -> float:
     """
     :param me: effective mass of electron
     :param mh: effective mass of proton
@@ -63,13 +73,19 @@ def _count_Jp(me: float, mh: float, Eg: float, Ef_n: float, t: float, Dp: float,
     :param t: temperature in Kelvin
     :param Dp: protons diffusion coefficient
     :param Lp: protons diffusion length
+    :param nc: effective density of states in the conduction band, calculated if None
+    :param nv: effective density of states in the valence band, calculated if None
+    :param ni: intrinsic carriers concentration, calculated if None
     :return: current density
     """
-    pn0 = count_p_n(ni2=count_pi(t=t, me=me, mh=mh, Eg=Eg)**2, nc=calc_Nc(me=me, t=t), Ef_n=Ef_n, Eg=Eg, t=t)
+    nc = calc_Nc(me=me, t=t) if nc is None else nc
+    pi = count_pi(t=t, me=me, mh=mh, Eg=Eg, nc=nc, nv=nv) if ni is None else ni
+    pn0 = count_p_n(ni2=pi**2, nc=nc, Ef_n=Ef_n, Eg=Eg, t=t)
     return (e * Dp * pn0) / Lp
 
 
-def _count_Jn(me: float, mh: float, Eg: float, Ef_p: float, t: float, Dn: float, Ln: float) -> float:
+def _count_Jn(me: float, mh: float, Eg: float, Ef_p: float, t: float, Dn: float, Ln: float,
+              nc=None, nv=None, ni=None) -> float:
     """
     :param me: effective mass of electron
     :param mh: effective mass of proton
@@ -78,18 +94,30 @@ def _count_Jn(me: float, mh: float, Eg: float, Ef_p: float, t: float, Dn: float,
     :param t: temperature in Kelvin
     :param Dn: electrons diffusion coefficient
     :param Ln: electrons diffusion length
+    :param nc: effective density of states in the conduction band, calculated if None
+    :param nv: effective density of states in the valence band, calculated if None
+    :param ni: intrinsic carriers concentration, calculated if None
     :return: current density
     """
-    np0 = count_n_p(ni2=count_ni(t=t, me=me, mh=mh, Eg=Eg)**2, nv=calc_Nv(mh=mh, t=t), Ef_p=Ef_p, t=t)
+    nv = calc_Nv(mh=mh, t=t) if nv is None else nv
+    ni = count_ni(t=t, me=me, mh=mh, Eg=Eg, nc=nc, nv=nv) if ni is None else ni
+    np0 = count_n_p(ni2=ni**2, nv=nv, Ef_p=Ef_p, t=t)
 
     return (e * Dn * np0) / Ln
 
 
 def count_Js(me: float, mh: float, t: float, Eg: float,
-             Dn: float, Ln: float, Dp: float, Lp: float, Ef_n: float, Ef_p: float) -> Current:
-
-    Jn = _count_Jn(t=t, Dn=Dn, Ln=Ln, me=me, mh=mh, Eg=Eg, Ef_p=Ef_p)
-    Jp = _count_Jp(t=t, Dp=Dp, Lp=Lp, me=me, mh=mh, Eg=Eg, Ef_n=Ef_n)
+             Dn: float, Ln: float, Dp: float, Lp: float, Ef_n: float, Ef_p: float, nc=None, nv=None,
+             ni=None) -> Current:
+    """
+    Nc, Nv and ni are calculated once and shared by both currents,
+    pass them (e.g. Model.Nc(t), Model.Nv(t), Model.ni(t)) to skip the calculation at all.
+    """
+    nc = calc_Nc(me=me, t=t) if nc is None else nc
+    nv = calc_Nv(mh=mh, t=t) if nv is None else nv
+    ni = count_ni(t=t, me=me, mh=mh, Eg=Eg, nc=nc, nv=nv) if ni is None else ni
+    Jn = _count_Jn(t=t, Dn=Dn, Ln=Ln, me=me, mh=mh, Eg=Eg, Ef_p=Ef_p, nc=nc, nv=nv, ni=ni)
+    Jp = _count_Jp(t=t, Dp=Dp, Lp=Lp, me=me, mh=mh, Eg=Eg, Ef_n=Ef_n, nc=nc, nv=nv, ni=ni)
     Js = Jn + Jp
     return Current(js=Js, jn=Jn, jp=Jp)
 
@@ -104,23 +132,31 @@ def calclate_I_amper(js: float, s: float) -> float:
     return js * s
 
 
-def volt_amper_characteristic(js: float, s: float, t: float, path: str):
+def volt_amper_characteristic(js: float, s: float, t: float, path=None):
     """
 
     :param js: current density in A/cm^2
     :param s: area in cm^2
     :param t: temperature in Kelvin
-    :param path: path to a directory to save a VAC image into
-    :return: max current
+    :param path: path to a directory to save a VAC image into, matplotlib is imported only if it is given
+    :return: voltages and currents
     """
     k = 1.38e-23  # J/K
     u = np.linspace(-1, 0.0, 1000)
     J = []
     for i in range(len(u)):
         J.append(js * s * (np.exp(u[i]*e/(k*t)) - 1))
-    # plt.yscale('log')
-    plt.plot(u, J, color='blue')
-    plt.savefig(path+'vac')
+    if path is not None:
+        render(draw_volt_amper_characteristic, path + 'vac', u=u, J=J)
     return u, J
 
 
+def draw_volt_amper_characteristic(fig, u, J) -> None:
+    """
+    :param fig: matplotlib Figure, see pame.plotting
+    :param u: voltages in V
+    :param J: currents in A
+    """
+    ax = fig.add_subplot()
+    # ax.set_yscale('log')
+    ax.plot(u, J, color='blue')
@@ -0,0 +1,64 @@
+"""
+Параметры тройного твердого раствора A_{1-x}B_x по закону Вегарда с параметром изгиба (bowing):
+    P(x) = (1 - x) P_A + x P_B - b_P x (1 - x)
+
+Результат - структура массивов: каждое поле - массив по всем составам x, поэтому его можно сразу
+отдавать в offset_matrices и другие векторизованные расчеты, не собирая SemiCond для каждого x.
+"""
+import numpy as np
+from typing import NamedTuple
+from pame.HeteroStructure.Calculation import SemiCond
+
+_fields = ('lattice', 'epsilon', 'E_g', 'spin_orbital_splitting', 'electron_affinity',
+           'me', 'mh', 'me_light', 'mh_heavy')
+
+
+class AlloyParameters(NamedTuple):
+    name: str
+    x: np.ndarray
+    lattice: np.ndarray
+    epsilon: np.ndarray
+    E_g: np.ndarray
+    spin_orbital_splitting: np.ndarray
+    electron_affinity: np.ndarray
+    me: np.ndarray
+    mh: np.ndarray
+    me_light: np.ndarray
+    mh_heavy: np.ndarray
+
+    def semicond(self, i: int):
+        """
+        :return: SemiCond for the i-th composition, e.g. for process_heterostructure
+        """
+        return SemiCond(name=f'{self.name}(x={self.x[i]:g})', lattice=float(self.lattice[i]),
+                        epsilon=float(self.epsilon[i]), E_g=float(self.E_g[i]),
+                        spin_orbital_splitting=float(self.spin_orbital_splitting[i]))
+
+
+def _parameter(material, field: str):
+    if field == 'E_g' and not hasattr(material, 'E_g'):
+        field = 'Eg'
+    return getattr(material, field, None)
+
+
+def alloy(a, b, x, bowing=None, name=None) -> AlloyParameters:
+    """
+    :param a: material at x = 0, SemiCond or instance of pame.Semiconductors.models
+    :param b: material at x = 1
+    :param x: composition, number or array
+    :param bowing: {field: bowing parameter}, e.g. {'E_g': 0.37}, zero for the rest
+    :param name: alloy name, 'A-B' by default
+    :return: parameters for each composition, fields missing in any of endpoints are None
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    bowing = bowing or {}
+    values = {}
+    for field in _fields:
+        p_a, p_b = _parameter(a, field), _parameter(b, field)
+        if p_a is None or p_b is None:
+            values[field] = None
+        else:
+            values[field] = (1 - x) * p_a + x * p_b - bowing.get(field, 0.) * x * (1 - x)
+    if name is None:
+        name = '-'.join(getattr(material, 'name', type(material).__name__) for material in (a, b))
+    return AlloyParameters(name=name, x=x, **values)
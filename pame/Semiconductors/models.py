@@ -1,5 +1,15 @@
 
+from collections import OrderedDict
+import numpy as np
+from pame.FermiLevelPinning.CalculateParticles import calc_Nc, calc_Nv
+from pame.constants import k
+from pame.SemiconCurrent.CurrentCalculus import count_ni, count_Js, Current
+
+
 class Model(object):
+    cache_size = 256  # max amount of cached (quantity, T) values per material
+    _cache_depends_on = ('me', 'mh', 'Eg')  # attributes the cached quantities are calculated from
+
     def __init__(self, lattice, epsilon, electron_affinity, Eg, Jd, Ja, me, mh, me_light, mh_heavy,
                  spin_orbital_splitting, mu_electrons, mu_holes, Dn, Dp, Ln, Lp, Nd, Na):
         """
@@ -31,24 +41,106 @@ class Model(object):
         self.Dn, self.Dp, self.Ln, self.Lp = Dn, Dp, Ln, Lp
         self.Jd, self.Ja = Jd, Ja
         self.Nd, self.Na = Nd, Na
+        self._cache = OrderedDict()
+
+    def __setattr__(self, name, value) -> None:
+        object.__setattr__(self, name, value)
+        if name in self._cache_depends_on and '_cache' in self.__dict__:
+            self._cache.clear()
+
+    def _cached(self, name: str, t: float, count) -> float:
+        """
+        LRU cache of derived quantities keyed on (name, T), the oldest value is evicted
+        when there are more than cache_size of them.
+
+        :param name: quantity name
+        :param t: temperature in Kelvin, arrays are calculated without caching
+        :param count: function of t which calculates the quantity
+        :return: cached or calculated value
+        """
+        if not np.isscalar(t):
+            return count(t)
+        key = (name, t)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        value = count(t)
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def clear_cache(self) -> None:
+        """
+        Drops cached values. Assigning me, mh or Eg and the reset_* methods do it themselves.
+        """
+        self._cache.clear()
+
+    def kT(self, t: float) -> float:
+        """
+        :param t: temperature in Kelvin
+        :return: kT in eV
+        """
+        return self._cached('kT', t, lambda x: k * x)
+
+    def Nc(self, t: float) -> float:
+        """
+        :param t: temperature in Kelvin
+        :return: effective density of states in the conduction band in cm^-3
+        """
+        return self._cached('Nc', t, lambda x: calc_Nc(me=self.me, t=x))
+
+    def Nv(self, t: float) -> float:
+        """
+        :param t: temperature in Kelvin
+        :return: effective density of states in the valence band in cm^-3
+        """
+        return self._cached('Nv', t, lambda x: calc_Nv(mh=self.mh, t=x))
+
+    def ni(self, t: float) -> float:
+        """
+        count_ni with cached Nc and Nv
+        :param t: temperature in Kelvin
+        :return: intrinsic carriers concentration in cm^-3
+        """
+        return self._cached('ni', t, lambda x: count_ni(t=x, me=self.me, mh=self.mh, Eg=self.Eg, nc=self.Nc(x),
+                                                        nv=self.Nv(x)))
+
+    def Js(self, t: float, Ef_n: float, Ef_p: float) -> Current:
+        """
+        count_Js with this material's parameters and cached Nc, Nv and ni.
+
+        :param t: temperature in Kelvin
+        :param Ef_n: fermi energy of n-type in eV
+        :param Ef_p: fermi energy of p-type in eV
+        :return: saturation current density and its electron and hole parts
+        """
+        return count_Js(me=self.me, mh=self.mh, t=t, Eg=self.Eg, Dn=self.Dn, Ln=self.Ln, Dp=self.Dp, Lp=self.Lp,
+                        Ef_n=Ef_n, Ef_p=Ef_p, nc=self.Nc(t), nv=self.Nv(t), ni=self.ni(t))
 
     def reset_Lp(self, Lp: float) -> None:
         self.Lp = Lp
+        self.clear_cache()
 
     def reset_Ln(self, Ln: float) -> None:
         self.Ln = Ln
+        self.clear_cache()
 
     def reset_Nd(self, Nd: float) -> None:
         self.Nd = Nd
+        self.clear_cache()
 
     def reset_Na(self, Na: float) -> None:
         self.Na = Na
+        self.clear_cache()
 
     def reset_Jd(self, Jd: float) -> None:
         self.Jd = Jd
+        self.clear_cache()
 
     def reset_Ja(self, Ja: float) -> None:
         self.Ja = Ja
+        self.clear_cache()
 
 
 class Si(Model):
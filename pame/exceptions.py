@@ -15,6 +15,14 @@ class CantRunDichotomyMethod(Exception):
         )
 
 
+class CantFindSignChange(Exception):
+    def __init__(self, phi0, phi1):
+        super().__init__(
+            f'Function has the same sign \t'
+            f'on both borders: [{phi0}, {phi1}]'
+        )
+
+
 class CatchZeroDelta(Exception):
     def __init__(self, phi0, phi1):
         super().__init__(
@@ -28,3 +36,11 @@ class CannotMatchResultFormat(Exception):
             f'cannot math format.\n'
             f'choose one from {available_formats}'
         )
+
+
+class CantReachTolerance(Exception):
+    def __init__(self, max_iter, residual):
+        super().__init__(
+            f'Cannot reach the tolerance in {max_iter} iterations, '
+            f'residual: {residual}'
+        )
@@ -0,0 +1,65 @@
+"""
+Построение графиков без глобального состояния pyplot.
+
+Каждый график - отдельный объект matplotlib.figure.Figure с холстом Agg: он не регистрируется в pyplot,
+не копит линии от предыдущих вызовов и очищается сразу после сохранения. matplotlib импортируется
+только при построении графика.
+
+Функции рисования принимают фигуру и готовые числа: fig, **data. Сами расчеты возвращают числа
+отдельно, а графики можно строить по одному (render) или пачкой в пуле процессов (render_batch).
+"""
+import contextlib
+import os
+from multiprocessing import Pool
+
+
+@contextlib.contextmanager
+def figure(path=None, figsize=None, dpi=100):
+    """
+    :param path: file to save the figure into on exit, nothing is saved if None
+    :param figsize: size in inches
+    :param dpi: resolution
+    :return: context manager with an Agg Figure which is cleared on exit
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    try:
+        yield fig
+        if path is not None:
+            fig.savefig(path)
+    finally:
+        fig.clear()
+
+
+def render(draw, path: str, figsize=None, dpi=100, **data) -> str:
+    """
+    :param draw: function (fig, **data) which draws on the figure
+    :param path: file to save the figure into
+    :param data: numbers to draw
+    :return: path
+    """
+    with figure(path=path, figsize=figsize, dpi=dpi) as fig:
+        draw(fig, **data)
+    return path
+
+
+def _render_job(job: tuple) -> str:
+    draw, path, data = job
+    return render(draw, path, **data)
+
+
+def render_batch(jobs, processes=None) -> list:
+    """
+    :param jobs: list of (draw, path, data) - module level draw function, file and {name: value} to draw
+    :param processes: pool size, os.cpu_count() if None, 1 renders in the current process
+    :return: paths in the order of jobs
+    """
+    jobs = list(jobs)
+    processes = processes or os.cpu_count()
+    if processes == 1 or len(jobs) <= 1:
+        return [_render_job(job) for job in jobs]
+    with Pool(processes=min(processes, len(jobs))) as pool:
+        return pool.map(_render_job, jobs)
@@ -0,0 +1,356 @@
+import numpy as np
+from typing import NamedTuple
+from pame.exceptions import CatchZeroDelta, CantFindSignChange
+
+
+class RootResult(NamedTuple):
+    root: float
+    iterations: int
+    evaluations: int
+    residual: float
+    converged: bool
+
+
+class VectorRootResult(NamedTuple):
+    root: np.ndarray
+    iterations: np.ndarray
+    converged: np.ndarray
+
+
+def dichotomy(f, a: float, b: float, tolerance=1e-7, max_iter=1000) -> RootResult:
+    """
+    :param f: residual function
+    :param a: lower border of the bracket
+    :param b: upper border of the bracket
+    :param tolerance: acceptable residual error |f(x)| < tolerance
+    :param max_iter: iterations limit
+    :return: root, iterations and evaluations amount, final residual and convergence flag
+    """
+    f_a = f(a)
+    evaluations = 1
+    x, f_x = (a + b) / 2., f_a
+
+    for iteration in range(1, max_iter + 1):
+        x = (a + b) / 2.
+        f_x = f(x)
+        evaluations += 1
+        if np.abs(f_x) < tolerance:
+            return RootResult(root=x, iterations=iteration, evaluations=evaluations, residual=f_x, converged=True)
+        if f_a * f_x > 0:  # нет нулей
+            a, f_a = x, f_x
+        else:
+            b = x
+
+    return RootResult(root=x, iterations=max_iter, evaluations=evaluations, residual=f_x, converged=False)
+
+
+def newton(f, df, x0: float, tolerance=1e-7, max_iter=1000) -> RootResult:
+    """
+    :math: $x_{n+1} = x_n - \frac{f(x_n)}{f'(x_n)}$
+
+    :param f: residual function
+    :param df: derivative of the residual function
+    :param x0: starter point
+    :param tolerance: acceptable residual error |f(x)| <= tolerance
+    :param max_iter: iterations limit
+    :return: root, iterations and evaluations amount, final residual and convergence flag
+    """
+    x = x0
+    for iteration in range(max_iter + 1):
+        f_x = f(x)
+        if np.abs(f_x) <= tolerance:
+            return RootResult(root=x, iterations=iteration, evaluations=iteration + 1, residual=f_x, converged=True)
+        if iteration < max_iter:
+            x = x - f_x / df(x)
+
+    return RootResult(root=x, iterations=max_iter, evaluations=max_iter + 1, residual=f_x, converged=False)
+
+
+def fixed_point(f, df, x0: float, x_fixed: float, tolerance=1e-7, max_iter=1000) -> RootResult:
+    """
+    :math: $\phi(x)=f(x)+x$ : $x_{n+1}=x_n - \frac{f(x_n)}{f'(\ksi)}$
+
+    :param f: residual function
+    :param df: derivative of the residual function
+    :param x0: starter point
+    :param x_fixed: ksi - fixed point where the derivative is taken once
+    :param tolerance: acceptable residual error |f(x)| <= tolerance
+    :param max_iter: iterations limit
+    :return: root, iterations and evaluations amount, final residual and convergence flag
+    """
+    _lambda = 1. / df(x_fixed)
+    x = x0
+    for iteration in range(max_iter + 1):
+        f_x = f(x)
+        if np.abs(f_x) <= tolerance:
+            return RootResult(root=x, iterations=iteration, evaluations=iteration + 1, residual=f_x, converged=True)
+        if iteration < max_iter:
+            x = x - _lambda * f_x
+
+    return RootResult(root=x, iterations=max_iter, evaluations=max_iter + 1, residual=f_x, converged=False)
+
+
+def secant(f, x0: float, x1=None, delta=1e-3, tolerance=1e-7, max_iter=1000) -> RootResult:
+    """
+    Метод секущих требует два последовательных значения, если x1 не задан, то
+    на первом этапе берем x1 = x0 - delta.
+
+    :math: $x_{n+1}=x_n - f(x_n)\frac{x_n-x_{n-1}}{f(x_n)-f(x_{n-1})}$
+
+    :param f: residual function
+    :param x0: starter point
+    :param x1: second starter point
+    :param delta: x_0 - x_1 difference for a first iteration
+    :param tolerance: acceptable residual error |f(x)| < tolerance
+    :param max_iter: iterations limit
+    :return: root, iterations and evaluations amount, final residual and convergence flag
+    """
+    if x1 is None:
+        if delta == 0:
+            raise CatchZeroDelta(phi0=x0, phi1=x0)
+        x1 = x0 - delta
+
+    x_prev, f_prev = x1, f(x1)
+    x = x0
+    evaluations = 1
+    for iteration in range(max_iter + 1):
+        f_x = f(x)
+        evaluations += 1
+        if np.abs(f_x) < tolerance:
+            return RootResult(root=x, iterations=iteration, evaluations=evaluations, residual=f_x, converged=True)
+        if iteration == max_iter or f_x == f_prev:
+            break
+        x, x_prev, f_prev = x - f_x * (x - x_prev) / (f_x - f_prev), x, f_x
+
+    return RootResult(root=x, iterations=iteration, evaluations=evaluations, residual=f_x, converged=False)
+
+
+def brent(f, a: float, b: float, df=None, tolerance=1e-7, max_iter=1000) -> RootResult:
+    """
+    Safeguarded hybrid method: keeps a bracket [a, b] with a sign change and takes
+    Newton steps (if the derivative is given) or inverse quadratic interpolation steps
+    (secant steps while only two points are known) inside it, the latter are used also
+    where the derivative is zero or infinite. A step is replaced with the
+    bisection when it leaves the bracket or does not halve the step taken two iterations ago.
+    Calculation stops when |f(x)| < tolerance or when the bracket shrinks to machine precision.
+
+    :param f: residual function
+    :param a: lower border of the bracket
+    :param b: upper border of the bracket
+    :param df: derivative of the residual function, optional
+    :param tolerance: acceptable residual error |f(x)| < tolerance
+    :param max_iter: iterations limit
+    :return: root, iterations and evaluations amount, final residual and convergence flag
+    """
+    f_a, f_b = f(a), f(b)
+    evaluations = 2
+    if np.sign(f_a) * np.sign(f_b) > 0:
+        raise CantFindSignChange(phi0=a, phi1=b)
+
+    if np.abs(f_a) < np.abs(f_b):
+        x, f_x, x_prev, f_prev = a, f_a, b, f_b
+    else:
+        x, f_x, x_prev, f_prev = b, f_b, a, f_a
+    x_prev2, f_prev2 = None, None
+    step, step_old = b - a, b - a
+
+    for iteration in range(max_iter + 1):
+        if np.abs(f_x) < tolerance or b - a <= 4 * np.finfo(float).eps * max(np.abs(a), np.abs(b), 1.):
+            return RootResult(root=x, iterations=iteration, evaluations=evaluations, residual=f_x, converged=True)
+        if iteration == max_iter:
+            break
+
+        derivative = None
+        if df is not None:
+            try:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    derivative = df(x)
+            except ZeroDivisionError:
+                derivative = None
+
+        if derivative is not None and derivative != 0 and np.isfinite(derivative):
+            candidate = x - f_x / derivative
+        elif x_prev2 is not None and f_x != f_prev and f_x != f_prev2 and f_prev != f_prev2:
+            # обратная квадратичная интерполяция по трем последним точкам
+            candidate = (x * f_prev * f_prev2 / ((f_x - f_prev) * (f_x - f_prev2)) +
+                         x_prev * f_x * f_prev2 / ((f_prev - f_x) * (f_prev - f_prev2)) +
+                         x_prev2 * f_x * f_prev / ((f_prev2 - f_x) * (f_prev2 - f_prev)))
+        elif f_x != f_prev:
+            candidate = x - f_x * (x - x_prev) / (f_x - f_prev)
+        else:
+            candidate = (a + b) / 2.
+
+        if not a < candidate < b or np.abs(candidate - x) > 0.5 * np.abs(step_old):
+            candidate = (a + b) / 2.
+        min_step = 2 * np.finfo(float).eps * max(np.abs(x), 1.)
+        if np.abs(candidate - x) < min_step:
+            # шаг меньше машинной точности - шагаем на min_step к другому концу, чтобы стянуть отрезок
+            candidate = x + min_step if x == a else x - min_step
+
+        step_old, step = step, candidate - x
+        x_prev2, f_prev2, x_prev, f_prev = x_prev, f_prev, x, f_x
+        x = candidate
+        f_x = f(x)
+        evaluations += 1
+
+        if np.sign(f_x) == np.sign(f_a):
+            a, f_a = x, f_x
+        else:
+            b, f_b = x, f_x
+
+    return RootResult(root=x, iterations=max_iter, evaluations=evaluations, residual=f_x, converged=False)
+
+
+def vectorized_dichotomy(f, a, b, tolerance=1e-7, xtolerance=0., max_iter=200) -> VectorRootResult:
+    """
+    Bisects every bracket [a_i, b_i] at once. All points are updated by array operations,
+    the points which have already converged are frozen.
+
+    :param f: residual function, takes an array of points and returns an array of residuals
+    :param a: lower borders of brackets
+    :param b: upper borders of brackets
+    :param tolerance: acceptable residual error |f(x)| < tolerance
+    :param xtolerance: acceptable bracket width b - a < xtolerance
+    :param max_iter: iterations limit
+    :return: roots, per-point iterations amount and per-point convergence flags
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    a, b = a.copy(), b.copy()
+
+    f_a = np.asarray(f(a), dtype=float)
+    f_b = np.asarray(f(b), dtype=float)
+
+    root = (a + b) / 2.
+    iterations = np.zeros(a.shape, dtype=int)
+    converged = np.zeros(a.shape, dtype=bool)
+    # если на концах отрезка функция одного знака - корня нет, точку сразу исключаем
+    active = np.sign(f_a) * np.sign(f_b) <= 0
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        f_m = np.asarray(f(root), dtype=float)
+        iterations += active
+
+        done = active & ((np.abs(f_m) < tolerance) | (b - a < xtolerance))
+        converged |= done
+        active &= ~done
+
+        same_sign = np.sign(f_m) == np.sign(f_a)
+        move_a = active & same_sign
+        move_b = active & ~same_sign
+        a = np.where(move_a, root, a)
+        f_a = np.where(move_a, f_m, f_a)
+        b = np.where(move_b, root, b)
+        root = np.where(active, (a + b) / 2., root)
+
+    return VectorRootResult(root=root, iterations=iterations, converged=converged)
+
+
+def vectorized_newton(f, df, a, b, x0=None, tolerance=1e-7, max_iter=100) -> VectorRootResult:
+    """
+    Safeguarded Newton method over arrays: every point keeps its own sign-change bracket [a_i, b_i]
+    (f(a_i) <= 0 <= f(b_i)) and takes Newton steps inside it. A step which leaves the bracket,
+    has no finite derivative or does not halve the step taken two iterations ago is replaced with the bisection.
+    A point converges when |f(x)| < tolerance or when the step (the bracket) shrinks to machine precision,
+    converged points are frozen. Points with a_i >= b_i or without the sign change get NaN and are not converged.
+
+    :param f: residual function, takes an array of points and returns an array of residuals
+    :param df: derivative of the residual function, works on arrays too
+    :param a: lower borders of brackets, f(a) <= 0
+    :param b: upper borders of brackets, f(b) >= 0
+    :param x0: starter points inside brackets, midpoints if None
+    :param tolerance: acceptable residual error |f(x)| < tolerance
+    :param max_iter: iterations limit
+    :return: roots, per-point iterations amount and per-point convergence flags
+    """
+    a, b, x = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float),
+                                  np.asarray(np.nan if x0 is None else x0, dtype=float))
+    a, b = a.copy(), b.copy()
+
+    iterations = np.zeros(a.shape, dtype=int)
+    eps = np.finfo(float).eps
+    step, step_old = b - a, b - a
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        f_a = np.asarray(f(a), dtype=float)
+        f_b = np.asarray(f(b), dtype=float)
+        # отрезок перевернут или на концах нет смены знака - корня нет, точку сразу исключаем
+        at_a, at_b = (a < b) & (np.abs(f_a) < tolerance), (a < b) & (np.abs(f_b) < tolerance)
+        valid = ((a < b) & (f_a <= 0) & (f_b >= 0)) | at_a | at_b
+        converged = at_a | at_b
+        active = valid & ~converged
+        x = np.where(np.isnan(x), (a + b) / 2., np.clip(x, a, b))
+        x = np.where(at_a, a, np.where(at_b, b, np.where(valid, x, np.nan)))
+
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            f_x = np.asarray(f(x), dtype=float)
+            iterations += active
+
+            done = active & (np.abs(f_x) < tolerance)
+            converged |= done
+            active &= ~done
+
+            a = np.where(active & (f_x < 0), x, a)
+            b = np.where(active & (f_x > 0), x, b)
+
+            derivative = np.asarray(df(x), dtype=float)
+            candidate = x - f_x / derivative
+            finite = np.isfinite(derivative) & np.isfinite(candidate)
+
+            # шаг Ньютона или отрезок меньше машинной точности - дальше не сойдемся
+            min_step = 2 * eps * np.maximum(np.abs(x), 1.)
+            done = active & ((finite & (np.abs(candidate - x) <= min_step)) | (b - a <= 2 * min_step))
+            converged |= done
+            active &= ~done
+
+            bisect = ~finite | (candidate <= a) | (candidate >= b) | (np.abs(candidate - x) > 0.5 * np.abs(step_old))
+            candidate = np.where(bisect, (a + b) / 2., candidate)
+            step_old, step = step, candidate - x
+            x = np.where(active, candidate, x)
+
+    return VectorRootResult(root=x, iterations=iterations, converged=converged)
+
+
+def tridiagonal_solve(lower, diag, upper, rhs) -> np.ndarray:
+    """
+    Cyclic (odd-even) reduction for a tridiagonal system
+        lower_i x_{i-1} + diag_i x_i + upper_i x_{i+1} = rhs_i
+    Every level eliminates even unknowns from odd equations with array operations, so the system of N
+    equations is solved with O(N) work in log2(N) numpy passes. No pivoting: the matrix should be
+    diagonally dominant, as finite difference ones are.
+
+    :param lower: sub-diagonal, lower[0] is ignored
+    :param diag: main diagonal
+    :param upper: super-diagonal, upper[-1] is ignored
+    :param rhs: right hand side, shape (N,) or (N, K) for K right hand sides at once
+    :return: solution x of the shape of rhs
+    """
+    d = np.array(rhs, dtype=float)
+    # коэффициенты - столбцы, чтобы транслироваться на все правые части
+    a, b, c = (np.array(v, dtype=float).reshape((len(d),) + (1,) * (d.ndim - 1)) for v in (lower, diag, upper))
+    n = len(b)
+    if n == 1:
+        return d / b
+    a[0], c[-1] = 0., 0.
+    if n % 2 == 0:
+        # лишнее уравнение x_n = 0, чтобы крайние неизвестные были четными
+        a, c, d = (np.concatenate([v, np.zeros_like(v[:1])]) for v in (a, c, d))
+        b = np.concatenate([b, np.ones_like(b[:1])])
+
+    alpha = -a[1::2] / b[0:-1:2]
+    gamma = -c[1::2] / b[2::2]
+    odd = tridiagonal_solve(lower=alpha * a[0:-1:2],
+                            diag=b[1::2] + alpha * c[0:-1:2] + gamma * a[2::2],
+                            upper=gamma * c[2::2],
+                            rhs=d[1::2] + alpha * d[0:-1:2] + gamma * d[2::2])
+
+    x = np.empty(d.shape)
+    x[1::2] = odd
+    neighbours = np.zeros(d[0::2].shape)
+    neighbours[1:] += a[2::2] * odd
+    neighbours[:-1] += c[0:-1:2] * odd
+    x[0::2] = (d[0::2] - neighbours) / b[0::2]
+    return x[:n]
@@ -0,0 +1,155 @@
+"""
+Параллельный расчет по сетке параметров для скалярных решателей
+(calculate_fermi_level, calculate_band_bend, count_Js, ...).
+
+Сетка - декартово произведение одномерных массивов параметров, точки нумеруются в C-порядке.
+Точки делятся на куски, куски считаются в пуле процессов, результаты пишутся прямо в разделяемую
+память (multiprocessing.shared_memory) по номеру точки, поэтому порядок не зависит от порядка выполнения.
+
+Решатели при ошибке печатают сообщение и возвращают None - такая точка получает NaN и статус FAILED
+(FAILED и для результата с converged = False, значения при этом сохраняются),
+исключение внутри решателя - NaN и статус ERROR, остальные точки считаются дальше.
+"""
+import contextlib
+import io
+import os
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+import numpy as np
+
+OK, FAILED, ERROR = 0, 1, 2
+
+
+class SweepResult(NamedTuple):
+    grid: dict
+    values: dict
+    status: np.ndarray
+    errors: dict
+
+    @property
+    def ok(self) -> np.ndarray:
+        return self.status == OK
+
+
+def _extract(result, field):
+    """
+    :param result: value returned by the solver
+    :param field: int - index of a tuple, str - attribute of a NamedTuple or key of a dict / structured array,
+                  callable - applied to the result, a number is returned as it is for any other field
+    """
+    if callable(field):
+        return field(result)
+    if isinstance(result, (int, float, np.number)):
+        return result
+    if isinstance(field, int):
+        return result[field]
+    if hasattr(result, field):
+        return getattr(result, field)
+    return result[field]
+
+
+_worker = {}
+
+
+def _init_worker(solver, names, points, fixed, fields, values_name, status_name, quiet):
+    values_memory, status_memory = SharedMemory(name=values_name), SharedMemory(name=status_name)
+    _worker.update(solver=solver, names=names, points=points, fixed=fixed, fields=fields, quiet=quiet,
+                   memory=(values_memory, status_memory),
+                   values=np.ndarray((len(points[0]), len(fields)), dtype=float, buffer=values_memory.buf),
+                   status=np.ndarray(len(points[0]), dtype=np.int8, buffer=status_memory.buf))
+
+
+def _run_chunk(chunk: tuple) -> tuple:
+    start, stop = chunk
+    errors = {}
+    solver, fields, values, status = _worker['solver'], _worker['fields'], _worker['values'], _worker['status']
+    for i in range(start, stop):
+        kwargs = dict(_worker['fixed'])
+        kwargs.update((name, column[i].item()) for name, column in zip(_worker['names'], _worker['points']))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()) if _worker['quiet'] else contextlib.nullcontext():
+                result = solver(**kwargs)
+            if result is None:
+                values[i], status[i] = np.nan, FAILED
+            else:
+                values[i] = [float(_extract(result, field)) for field in fields]
+                status[i] = OK if getattr(result, 'converged', True) else FAILED
+        except Exception as e:
+            values[i], status[i] = np.nan, ERROR
+            errors[i] = repr(e)
+    return stop - start, errors
+
+
+def _print_progress(done: int, total: int) -> None:
+    print(f'\r{done}/{total} points', end='\n' if done == total else '', flush=True)
+
+
+def sweep(solver, grid: dict, fields=(0,), fixed=None, processes=None, chunk_size=None, progress=None,
+          quiet=True) -> SweepResult:
+    """
+    :param solver: module level function or bound method of a picklable object, called with keyword arguments
+    :param grid: {parameter name: 1-D array of values}, the sweep runs over the cartesian product
+    :param fields: what to take from each result, see _extract: (0,) for the (root, iterations) tuples
+                   and the solvers returning a number, ('Ef', 'n') for Result NamedTuples and so on
+    :param fixed: {parameter name: value} passed to every call
+    :param processes: pool size, os.cpu_count() if None, 1 runs in the current process without a pool
+    :param chunk_size: points per task, by default about 4 tasks per process
+    :param progress: callable(done, total) called after each chunk, True prints the counter
+    :param quiet: suppress the solvers' printing
+    :return: grid axes, {field: array of grid shape}, per-point status (OK, FAILED, ERROR)
+             and {grid index: exception} for the ERROR points
+    """
+    names = list(grid)
+    axes = [np.atleast_1d(np.asarray(grid[name])) for name in names]
+    shape = tuple(len(axis) for axis in axes)
+    points = [column.ravel() for column in np.meshgrid(*axes, indexing='ij')]
+    total = int(np.prod(shape))
+    fields = list(fields)
+    fixed = dict(fixed or {})
+    processes = processes or os.cpu_count()
+    chunk_size = chunk_size or max(1, -(-total // (4 * processes)))
+    chunks = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    if progress is True:
+        progress = _print_progress
+
+    values_memory = SharedMemory(create=True, size=max(total * len(fields), 1) * 8)
+    status_memory = SharedMemory(create=True, size=max(total, 1))
+    try:
+        initargs = (solver, names, points, fixed, fields, values_memory.name, status_memory.name, quiet)
+        done, errors = 0, {}
+        if processes == 1:
+            _init_worker(*initargs)
+            tasks = map(_run_chunk, chunks)
+        else:
+            pool = Pool(processes=processes, initializer=_init_worker, initargs=initargs)
+            tasks = pool.imap_unordered(_run_chunk, chunks)
+        try:
+            for count, chunk_errors in tasks:
+                done += count
+                errors.update(chunk_errors)
+                if progress:
+                    progress(done, total)
+        finally:
+            if processes == 1:
+                for memory in _worker['memory']:
+                    memory.close()
+                _worker.clear()
+            else:
+                pool.close()
+                pool.join()
+
+        values = np.ndarray((total, len(fields)), dtype=float, buffer=values_memory.buf).copy()
+        status = np.ndarray(total, dtype=np.int8, buffer=status_memory.buf).copy()
+    finally:
+        values_memory.close()
+        values_memory.unlink()
+        status_memory.close()
+        status_memory.unlink()
+
+    return SweepResult(grid=dict(zip(names, axes)),
+                       values={getattr(field, '__name__', str(field)): values[:, j].reshape(shape)
+                               for j, field in enumerate(fields)},
+                       status=status.reshape(shape),
+                       errors={tuple(int(j) for j in np.unravel_index(i, shape)): errors[i]
+                               for i in sorted(errors)})